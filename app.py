@@ -1,23 +1,45 @@
 from flask import Flask
 from config import app, db, api
+import identity  # Registers the JWT current_user loader
+import metrics  # Serves /metrics when METRICS_ENABLED
 from routes.auth_routes import Signup, Login, ProtectedUser
-from routes.deck_routes import DecksResource, DeckResource
-from routes.flashcard_routes import FlashcardResource, FlashcardDetailResource
+from routes.deck_routes import DecksResource, DeckSummaryResource, DeckResource, DeckImportResource
+from routes.flashcard_routes import FlashcardResource, FlashcardSearchResource, FlashcardDetailResource
 from routes.dashboard_routes import Dashboard
-from routes.progress_routes import ProgressResource
+from routes.progress_routes import ProgressResource, ProgressBatchResource
 from routes.stats_routes import UserStatsResource
+from routes.study_routes import StudyQueueResource
+from routes.export_routes import ExportResource
+from routes.default_deck_routes import DefaultDecksResource, DefaultDeckResource, DefaultFlashcardResource
+from routes.sync_routes import SyncResource
+from rollups import rollups_cli
+from jobs import jobs_cli
 
 # Register all routes
 api.add_resource(Signup, "/signup")
 api.add_resource(Login, "/login")
 api.add_resource(ProtectedUser, "/user")  # Add this line
 api.add_resource(DecksResource, "/decks")
+api.add_resource(DeckSummaryResource, "/decks/summary")
 api.add_resource(DeckResource, "/decks/<int:deck_id>")
+api.add_resource(DeckImportResource, "/decks/<int:deck_id>/import")
+api.add_resource(DefaultDecksResource, "/decks/defaults")
+api.add_resource(DefaultDeckResource, "/decks/defaults/<int:default_deck_id>")
+api.add_resource(DefaultFlashcardResource, "/decks/defaults/<int:default_deck_id>/flashcards/<int:default_flashcard_id>")
 api.add_resource(FlashcardResource, "/flashcards")
+api.add_resource(FlashcardSearchResource, "/flashcards/search")
 api.add_resource(FlashcardDetailResource, "/flashcards/<int:id>")
 api.add_resource(Dashboard, "/dashboard")
 api.add_resource(ProgressResource, "/progress", "/progress/<int:progress_id>", "/progress/deck/<int:deck_id>", "/progress/flashcard/<int:flashcard_id>")
+api.add_resource(ProgressBatchResource, "/progress/batch")
 api.add_resource(UserStatsResource, "/user/stats")
+api.add_resource(StudyQueueResource, "/study/next")
+api.add_resource(ExportResource, "/export")
+api.add_resource(SyncResource, "/sync")
+
+# CLI commands
+app.cli.add_command(rollups_cli)
+app.cli.add_command(jobs_cli)
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""GET /decks latency while a burst of logins hits the server.
+
+Runs the app under a threaded WSGI server and, for each hashing pool width,
+fires --logins concurrent login loops next to --readers GET /decks loops.
+With an effectively unbounded pool every login burns CPU at once and the
+readers' p99 climbs; with the bounded pool the excess logins are queued or
+turned away with 503 and the readers keep their latency.
+
+    python -m benchmarks.auth_burst_bench [--logins 32] [--readers 4] [--seconds 5] [--rounds 10]
+"""
+import argparse
+import http.client
+import json
+import logging
+import statistics
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database
+from benchmarks.seed import seed_account, seed_user
+from config import password_hasher
+from models import User
+
+PASSWORD = "correct horse battery staple"
+
+
+def create_login_user():
+    with app.app_context():
+        user = User(username="burst", email="burst@example.com")
+        user.password_hash = PASSWORD
+        db.session.add(user)
+        db.session.commit()
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    start = time.perf_counter()
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status, (time.perf_counter() - start) * 1000
+
+
+def run_case(port, headers, logins, readers, seconds):
+    stop = threading.Event()
+    read_latencies, login_statuses, login_latencies = [], [], []
+    login_body = json.dumps({"email": "burst@example.com", "password": PASSWORD})
+
+    def login_loop():
+        while not stop.is_set():
+            status, ms = request(port, "POST", "/login", login_body, {"Content-Type": "application/json"})
+            login_statuses.append(status)
+            if status == 200:
+                login_latencies.append(ms)
+            elif status == 503:
+                time.sleep(0.05)
+
+    def read_loop():
+        while not stop.is_set():
+            status, ms = request(port, "GET", "/decks", headers=headers)
+            assert status == 200, status
+            read_latencies.append(ms)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(logins)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return read_latencies, login_statuses, login_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login loops")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent GET /decks loops")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_LOG_ROUNDS for the run")
+    parser.add_argument("--workers", type=int, default=2, help="bounded pool width")
+    args = parser.parse_args()
+
+    app.config["BCRYPT_LOG_ROUNDS"] = args.rounds
+    password_hasher.init_app(app)
+    reset_database()
+    create_login_user()
+    user_id = seed_user()
+    seed_account(user_id, decks=50, cards_per_deck=10, progress_density=0.0)
+    headers = auth_headers(user_id)
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    baseline, _, _ = run_case(port, headers, 0, args.readers, min(args.seconds, 2.0))
+    print(f"bcrypt cost {args.rounds}, {args.logins} login loops, {args.readers} readers, {args.seconds:.0f}s per case")
+    print(f"{'idle':<22} GET /decks p50={percentile(baseline, 50):7.2f} ms  p99={percentile(baseline, 99):7.2f} ms")
+
+    for label, workers in (("unbounded pool", args.logins), (f"bounded pool ({args.workers})", args.workers)):
+        app.config["HASHING_MAX_WORKERS"] = workers
+        app.config["HASHING_MAX_PENDING"] = args.logins if workers >= args.logins else 4 * workers
+        password_hasher.init_app(app)
+        reads, statuses, login_ms = run_case(port, headers, args.logins, args.readers, args.seconds)
+        stats = password_hasher.stats()
+        print(
+            f"{label:<22} GET /decks p50={percentile(reads, 50):7.2f} ms  p99={percentile(reads, 99):7.2f} ms  "
+            f"logins ok={statuses.count(200)} busy={statuses.count(503)}  "
+            f"login mean={statistics.mean(login_ms) if login_ms else 0:7.1f} ms  "
+            f"queue max={stats['queue_seconds_max'] * 1000:6.1f} ms"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
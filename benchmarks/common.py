@@ -0,0 +1,82 @@
+"""Shared setup for the benchmark scripts.
+
+Every benchmark runs against a throwaway SQLite file (or BENCH_DATABASE_URL)
+and recreates its schema, so it never touches the configured database.
+Import this module before anything that imports ``config``.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+_DB_DIR = tempfile.mkdtemp(prefix="flashlearn-bench-")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///" + os.path.join(_DB_DIR, "bench.db"))
+
+from sqlalchemy import event  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+import app as app_module  # noqa: E402  (registers the routes)
+from config import app, db  # noqa: E402
+
+# Tokens carry a dict identity; newer PyJWT releases reject non-string subjects.
+app.config["JWT_VERIFY_SUB"] = False
+
+
+def reset_database():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def auth_headers(user_id, username="bench"):
+    with app.app_context():
+        token = create_access_token(identity={"id": user_id, "username": username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timed(results, key):
+    start = time.perf_counter()
+    yield
+    results[key] = (time.perf_counter() - start) * 1000
+
+
+def run_requests(client, method, url, headers, repeat, **kwargs):
+    """Issue the same request ``repeat`` times and return (latencies_ms, queries per call)."""
+    latencies = []
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = getattr(client, method)(url, headers=headers, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code < 400, response.get_data(as_text=True)
+    return latencies, counter.count / max(repeat, 1)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,67 @@
+"""GET /dashboard: per-deck Progress queries versus one grouped aggregate.
+
+Seeds one user with 500 decks and 50k progress rows, then compares the
+previous N+1 implementation (kept here as ``LegacyDashboard``) with the
+current route.
+
+    python -m benchmarks.dashboard_bench [--decks 500] [--cards 100] [--repeat 20]
+"""
+import argparse
+import statistics
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database, run_requests
+from benchmarks.seed import seed_account, seed_user
+
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import api
+from dashboard import dashboard_cache
+from models import User, Deck, Progress
+
+
+class LegacyDashboard(Resource):
+    """The pre-aggregate implementation: one Progress query per deck."""
+
+    @jwt_required()
+    def get(self):
+        user_id = get_jwt_identity().get("id")
+        user = User.query.filter_by(id=user_id).first()
+        total = 0
+        for deck in Deck.query.filter_by(user_id=user_id).all():
+            entries = Progress.query.filter_by(deck_id=deck.id, user_id=user_id).all()
+            total += sum(entry.study_count for entry in entries)
+        db.session.query(db.func.sum(Progress.correct_attempts)).filter_by(user_id=user_id).scalar()
+        db.session.query(db.func.sum(Progress.study_count)).filter_by(user_id=user_id).scalar()
+        db.session.query(db.func.sum(Progress.total_study_time)).filter_by(user_id=user_id).scalar()
+        return {"username": user.username, "total_flashcards_studied": total}, 200
+
+
+api.add_resource(LegacyDashboard, "/bench/legacy-dashboard")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=100, help="cards per deck")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=1.0)
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    dashboard_cache.maxsize = 0  # Measure the query path, not the payload cache
+
+    print(f"{args.decks} decks, {args.decks * args.cards} progress rows, {args.repeat} requests each")
+    for label, url in (("before (per-deck)", "/bench/legacy-dashboard"), ("after (aggregate)", "/dashboard")):
+        client.get(url, headers=headers)  # warm up
+        latencies, queries = run_requests(client, "get", url, headers, args.repeat)
+        print(
+            f"{label:<20} queries/request={queries:>6.0f}  "
+            f"mean={statistics.mean(latencies):8.2f} ms  p95={percentile(latencies, 95):8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
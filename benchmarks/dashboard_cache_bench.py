@@ -0,0 +1,123 @@
+"""GET /dashboard with no payload cache, the in-process LRU and a Redis-protocol backend.
+
+The Redis case uses FakeRedis below, a dict-backed stand-in for a Redis server
+(JSON round trip included), so it runs without a server. Each case runs a
+read-only loop and then a mixed loop with one POST /progress per --ratio
+GETs, so invalidation is part of the measurement. GET must issue no writes,
+and the GET after each write must count it; the script exits 1 when one
+does not (a stale payload).
+
+    python -m benchmarks.dashboard_cache_bench [--decks 500] [--cards 100] [--repeat 200] [--ratio 10]
+"""
+import argparse
+import fnmatch
+import statistics
+import sys
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database
+from benchmarks.seed import seed_account, seed_user
+from cache import LRUCache, RedisCache
+import dashboard
+
+
+class FakeRedis:
+    """Just enough of the redis-py client for RedisCache, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value.encode(), time.monotonic() + ex if ex else None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match="*"):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+
+def run(client, headers, repeat, ratio, cards, engine):
+    counts = {"statements": 0, "writes_on_get": 0, "stale": 0}
+    in_get = [False]
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+        if in_get[0] and statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            counts["writes_on_get"] += 1
+
+    latencies = []
+    studied = None
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        for i in range(repeat):
+            wrote = bool(ratio and i % ratio == 0)
+            if wrote:
+                flashcard_id, deck_id = cards[i % len(cards)]
+                client.post("/progress", headers=headers, json={
+                    "flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": True, "time_spent": 3,
+                })
+            in_get[0] = True
+            start = time.perf_counter()
+            response = client.get("/dashboard", headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            in_get[0] = False
+            assert response.status_code == 200, response.get_data(as_text=True)
+            total = response.get_json()["total_flashcards_studied"]
+            if studied is not None and total != studied + wrote:
+                counts["stale"] += 1
+            studied = total
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return latencies, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=100, help="cards per deck")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--ratio", type=int, default=10, help="GETs per progress write in the mixed loop")
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    deck_ids, flashcard_ids = seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=1.0)
+    cards = [(card_id, deck_ids[i // args.cards]) for i, card_id in enumerate(flashcard_ids)]
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+
+    backends = (
+        ("no cache", LRUCache("dashboard-off", maxsize=0)),
+        ("memory LRU", LRUCache("dashboard-memory", maxsize=1000, ttl=60)),
+        ("redis (fake)", RedisCache("dashboard-redis", FakeRedis(), ttl=60)),
+    )
+    print(f"{args.decks} decks, {len(cards)} progress rows, {args.repeat} GETs per loop")
+    stale = 0
+    for label, backend in backends:
+        dashboard.dashboard_cache = backend
+        for loop, ratio in (("read-only", 0), (f"1 write/{args.ratio}", args.ratio)):
+            latencies, counts = run(client, headers, args.repeat, ratio, cards, engine)
+            print(
+                f"{label:<13} {loop:<12} mean={statistics.mean(latencies):7.2f} ms  "
+                f"p95={percentile(latencies, 95):7.2f} ms  statements={counts['statements']:5d}  "
+                f"writes on GET={counts['writes_on_get']}  stale={counts['stale']}  hit rate={backend.stats()['hit_rate']:.0%}"
+            )
+            stale += counts["stale"]
+    sys.exit(1 if stale else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""DELETE /decks/<id> for a large deck: ORM cascade versus set-based and soft delete.
+
+Seeds one user with a --cards card deck (every card with a progress row)
+and a second user with a few small decks, then deletes a fresh copy of the
+big deck three ways:
+
+* orm cascade - the previous handler: db.session.delete(deck) loads every
+  card through the delete-orphan cascade and leaves progress behind
+* set-based   - the current handler with DECK_SOFT_DELETE off
+* soft delete - the handler with DECK_SOFT_DELETE on, then the purge job
+  drained with run_pending() in DECK_PURGE_CHUNK row transactions
+
+After the two current modes the script checks that no progress or
+flashcard row of the deck is left and that the rollups match the progress
+table, and exits 1 otherwise.
+
+    python -m benchmarks.deck_delete_bench [--cards 50000] [--chunk 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ["JOBS_WORKER_ENABLED"] = "0"
+
+from benchmarks.common import app, db, auth_headers, QueryCounter, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+from jobs import run_pending  # noqa: E402
+from models import Deck, DeckProgressRollup, Flashcard, Progress  # noqa: E402
+from rollups import check_rollups  # noqa: E402
+
+
+def seed(cards):
+    reset_database()
+    user_id = seed_user()
+    deck_ids, _ = seed_account(user_id, decks=1, cards_per_deck=cards, progress_density=1.0)
+    seed_account(seed_user("neighbour"), decks=5, cards_per_deck=100, progress_density=0.5, seed=1)
+    return user_id, deck_ids[0]
+
+
+def leftovers(deck_id):
+    with app.app_context():
+        return {
+            "flashcards": Flashcard.query.filter_by(deck_id=deck_id).count(),
+            "progress": Progress.query.filter_by(deck_id=deck_id).count(),
+            "decks": Deck.query.filter_by(id=deck_id).count(),
+            "rollup mismatches": len(check_rollups()),
+        }
+
+
+def orm_cascade(user_id, deck_id):
+    with app.app_context():
+        with QueryCounter(db.engine) as counter:
+            start = time.perf_counter()
+            deck = Deck.query.filter_by(id=deck_id, user_id=user_id).first()
+            DeckProgressRollup.query.filter_by(deck_id=deck.id).delete()
+            db.session.delete(deck)
+            db.session.commit()
+            seconds = time.perf_counter() - start
+        orphans = Progress.query.filter_by(deck_id=deck_id).count()
+    print(f"{'orm cascade':<12} {seconds * 1000:10.1f} ms  {counter.count:6d} statements  "
+          f"leaves {orphans} progress rows behind")
+
+
+def request_delete(user_id, deck_id, soft, chunk):
+    app.config["DECK_SOFT_DELETE"] = soft
+    app.config["DECK_PURGE_CHUNK"] = chunk
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        start = time.perf_counter()
+        response = client.delete(f"/decks/{deck_id}", headers=auth_headers(user_id))
+        seconds = time.perf_counter() - start
+    assert response.status_code == 200, response.get_data(as_text=True)
+    label = "soft delete" if soft else "set-based"
+    print(f"{label:<12} {seconds * 1000:10.1f} ms  {counter.count:6d} statements  (request)")
+
+    if soft:
+        with app.app_context():
+            hidden = client.get(f"/decks/{deck_id}", headers=auth_headers(user_id)).status_code == 404
+            start = time.perf_counter()
+            jobs = 0
+            while True:
+                ran = run_pending()
+                if not ran:
+                    break
+                jobs += ran
+            purge_seconds = time.perf_counter() - start
+        print(f"{'  purge':<12} {purge_seconds * 1000:10.1f} ms  {jobs:6d} jobs of up to {chunk} rows  "
+              f"(hidden before purge: {hidden})")
+    else:
+        with app.app_context():
+            run_pending()  # The stats refresh the delete queued
+
+    remaining = leftovers(deck_id)
+    if any(remaining.values()):
+        print(f"{'':<12} left behind: {remaining}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=50000)
+    parser.add_argument("--chunk", type=int, default=5000, help="DECK_PURGE_CHUNK for the soft delete")
+    args = parser.parse_args()
+
+    print(f"deck of {args.cards} cards, each with a progress row")
+    ok = True
+    orm_cascade(*seed(args.cards))
+    ok &= request_delete(*seed(args.cards), soft=False, chunk=args.chunk)
+    ok &= request_delete(*seed(args.cards), soft=True, chunk=args.chunk)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""GET /decks/summary for an account with 1,000 decks, against the per-deck fan-out it replaces.
+
+Seeds --decks decks of --cards cards with --progress-density of the cards
+studied, next to a few other accounts, then times:
+
+* summary   - one GET /decks/summary for every deck
+* page      - GET /decks/summary?limit=100, the first page
+* fan-out   - GET /decks plus GET /progress/deck/<id> and
+  GET /flashcards?deck_id=<id> per deck, the client-side way (--fanout-rounds)
+
+and exits 1 when the summary's p95 is above --max-p95-ms.
+
+    python -m benchmarks.deck_summary_bench [--decks 1000] [--cards 20] [--progress-density 0.5]
+        [--repeat 30] [--max-p95-ms 250]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+from benchmarks.common import app, db, auth_headers, percentile, QueryCounter, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+
+
+def timed_gets(client, headers, urls, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url in urls:
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, (url, response.status_code)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=20, help="cards per deck")
+    parser.add_argument("--progress-density", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--fanout-rounds", type=int, default=2)
+    parser.add_argument("--max-p95-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    deck_ids, _ = seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=args.progress_density)
+    for n in range(3):
+        seed_account(seed_user(f"other{n}"), decks=100, cards_per_deck=args.cards, progress_density=0.5, seed=n + 1)
+    with app.app_context():
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+        engine = db.engine
+
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    summary = client.get("/decks/summary", headers=headers).get_json()
+    assert len(summary) == args.decks, len(summary)
+
+    fanout_urls = ["/decks"] + [
+        url for deck_id in deck_ids for url in (f"/progress/deck/{deck_id}", f"/flashcards?deck_id={deck_id}")
+    ]
+    cases = (
+        ("summary", ["/decks/summary"], args.repeat),
+        ("page", ["/decks/summary?limit=100"], args.repeat),
+        ("fan-out", fanout_urls, args.fanout_rounds),
+    )
+    print(f"{args.decks} decks x {args.cards} cards, progress density {args.progress_density}")
+    print(f"{'case':<10}{'requests':>9}{'statements':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    results = {}
+    for label, urls, repeat in cases:
+        with QueryCounter(engine) as counter:
+            timed_gets(client, headers, urls, 1)
+        latencies = timed_gets(client, headers, urls, repeat)
+        results[label] = latencies
+        print(f"{label:<10}{len(urls):>9}{counter.count:>12}{statistics.median(latencies):>10.1f}"
+              f"{percentile(latencies, 95):>10.1f}")
+
+    p95 = percentile(results["summary"], 95)
+    if p95 > args.max_p95_ms:
+        sys.exit(f"summary p95 {p95:.1f} ms is above the {args.max_p95_ms:.0f} ms cap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Storage used by default decks: per-user copies versus shared rows.
+
+Signs up N users twice, once copying DEFAULT_DECKS_TEMPLATE into decks
+and flashcards for every user (the previous behaviour) and once linking
+the shared default decks through user_default_decks, then reports row
+counts and database size.
+
+    python -m benchmarks.default_decks_bench [--users 100000]
+"""
+import argparse
+import time
+
+from benchmarks.common import app, db, reset_database
+from config import DEFAULT_DECKS_TEMPLATE
+from helpers import ensure_default_decks
+from models import User, Deck, Flashcard, user_default_decks
+
+CHUNK = 10000
+
+
+def insert_users(count):
+    for start in range(0, count, CHUNK):
+        db.session.execute(db.insert(User), [
+            {"username": f"user{n}", "email": f"user{n}@example.com", "_password_hash": "x"}
+            for n in range(start, min(count, start + CHUNK))
+        ])
+
+
+def copy_per_user(count):
+    """The old create_default_decks_for_user, done with bulk inserts so only storage is compared."""
+    for deck_data in DEFAULT_DECKS_TEMPLATE:
+        fields = {key: deck_data[key] for key in ("title", "description", "subject", "category", "difficulty")}
+        for start in range(1, count + 1, CHUNK):
+            db.session.execute(db.insert(Deck), [
+                dict(fields, user_id=user_id, is_default=True)
+                for user_id in range(start, min(count + 1, start + CHUNK))
+            ])
+    deck_ids = [row[0] for row in db.session.query(Deck.id).order_by(Deck.id)]
+    per_template = len(deck_ids) // len(DEFAULT_DECKS_TEMPLATE)
+    for index, template_cards in enumerate(deck_data["flashcards"] for deck_data in DEFAULT_DECKS_TEMPLATE):
+        template_deck_ids = deck_ids[index * per_template:(index + 1) * per_template]
+        for start in range(0, per_template, CHUNK):
+            db.session.execute(db.insert(Flashcard), [
+                {"deck_id": deck_id, "front_text": card["front_text"], "back_text": card["back_text"]}
+                for deck_id in template_deck_ids[start:start + CHUNK]
+                for card in template_cards
+            ])
+
+
+def link_shared(count):
+    default_deck_ids = ensure_default_decks()
+    for start in range(1, count + 1, CHUNK):
+        db.session.execute(user_default_decks.insert(), [
+            {"user_id": user_id, "default_deck_id": default_deck_id}
+            for user_id in range(start, min(count + 1, start + CHUNK))
+            for default_deck_id in default_deck_ids
+        ])
+
+
+def measure(label, populate, users):
+    reset_database()
+    with app.app_context():
+        insert_users(users)
+        db.session.commit()
+        start = time.perf_counter()
+        populate(users)
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+        db.session.execute(db.text("VACUUM"))
+        counts = {
+            table: db.session.execute(db.text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            for table in ("decks", "flashcards", "default_decks", "default_flashcards", "user_default_decks")
+        }
+        page_size = db.session.execute(db.text("PRAGMA page_size")).scalar()
+        page_count = db.session.execute(db.text("PRAGMA page_count")).scalar()
+    print(f"{label:<18} {elapsed:6.2f} s  db size={page_size * page_count / 1024 / 1024:7.1f} MB  rows={counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.users} users, {len(DEFAULT_DECKS_TEMPLATE)} default decks")
+    measure("copy per user", copy_per_user, args.users)
+    measure("shared + links", link_shared, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Conditional GETs: 304 revalidation and cached bodies versus a full read.
+
+For GET /decks and GET /flashcards on a user with --decks x --cards cards,
+times three paths: a full read with the response cache off, a response-cache
+hit, and a 304 answered from If-None-Match. Also counts the statements that
+touch the flashcards table, which the 304 path must not do.
+
+    python -m benchmarks.etag_bench [--decks 200] [--cards 50] [--repeat 100]
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database
+from benchmarks.seed import seed_account, seed_user
+from etags import response_cache
+
+
+def measure(client, url, headers, repeat, engine, expected_status):
+    latencies = []
+    counts = {"statements": 0, "flashcards": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+        if "flashcards" in statement:
+            counts["flashcards"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == expected_status, response.status_code
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return latencies, counts["statements"] / repeat, counts["flashcards"] / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=200)
+    parser.add_argument("--cards", type=int, default=50, help="cards per deck")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=0.0)
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+
+    maxsize = response_cache.maxsize
+    print(f"{args.decks} decks, {args.decks * args.cards} flashcards, {args.repeat} requests per case")
+    for url in ("/decks", "/flashcards?limit=1000", "/flashcards"):
+        etag = client.get(url, headers=headers).headers["ETag"]
+        cases = (
+            ("full read", 0, headers, 200),
+            ("cached body", maxsize, headers, 200),
+            ("304", maxsize, {**headers, "If-None-Match": etag}, 304),
+        )
+        for label, size, request_headers, status in cases:
+            response_cache.maxsize = size
+            response_cache.clear()
+            client.get(url, headers=headers)
+            latencies, statements, flashcard_statements = measure(
+                client, url, request_headers, args.repeat, engine, status
+            )
+            print(
+                f"{url:<22} {label:<12} mean={statistics.mean(latencies):7.2f} ms  "
+                f"p95={percentile(latencies, 95):7.2f} ms  statements={statements:.0f}  "
+                f"flashcards-table={flashcard_statements:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
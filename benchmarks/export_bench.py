@@ -0,0 +1,57 @@
+"""GET /export memory profile for a large account.
+
+Seeds an account of roughly 200k rows (decks + flashcards + progress),
+streams the export through the test client without buffering and fails
+if the traced Python heap grows past a fixed bound while streaming.
+
+    python -m benchmarks.export_bench [--decks 1000] [--cards 100] [--bound-mb 32]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import app, auth_headers, reset_database
+from benchmarks.seed import seed_account, seed_user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=100, help="cards per deck")
+    parser.add_argument("--bound-mb", type=float, default=32.0)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=1.0)
+    total_rows = args.decks + 2 * args.decks * args.cards
+    headers = auth_headers(user_id)
+    client = app.test_client()
+
+    failed = False
+    for export_format in ("ndjson", "json"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(f"/export?format={export_format}", headers=headers, buffered=False)
+        size = 0
+        for chunk in response.response:
+            size += len(chunk)
+        response.close()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        peak_mb = peak / 1024 / 1024
+        failed = failed or peak_mb > args.bound_mb
+        print(
+            f"{export_format:<7} rows={total_rows}  bytes={size / 1024 / 1024:7.1f} MB  "
+            f"time={elapsed:6.2f} s  peak traced heap={peak_mb:6.2f} MB (bound {args.bound_mb:.0f} MB)"
+        )
+
+    if failed:
+        sys.exit("export memory exceeded the bound")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""POST /decks/<id>/import throughput.
+
+Uploads a generated CSV (and the same cards as TSV and JSON) into a
+fresh deck and reports rows per second.
+
+    python -m benchmarks.import_bench [--rows 50000]
+"""
+import argparse
+import io
+import json
+import time
+
+from benchmarks.common import app, auth_headers, reset_database
+from benchmarks.seed import seed_account, seed_user
+
+
+def build_upload(import_format, rows):
+    cards = [(f"Word {n}", f"Meaning of word {n}, with a comma") for n in range(rows)]
+    if import_format == "json":
+        return json.dumps([{"front_text": front, "back_text": back} for front, back in cards]).encode()
+    if import_format == "tsv":
+        lines = ["#separator:tab", "#html:false"] + [f"{front}\t{back}" for front, back in cards]
+        return "\n".join(lines).encode()
+    lines = ["front,back"] + [f'{front},"{back}"' for front, back in cards]
+    return "\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    deck_ids, _ = seed_account(user_id, decks=3, cards_per_deck=0)
+    headers = auth_headers(user_id)
+    client = app.test_client()
+
+    for deck_id, import_format in zip(deck_ids, ("csv", "tsv", "json")):
+        body = build_upload(import_format, args.rows)
+        start = time.perf_counter()
+        response = client.post(
+            f"/decks/{deck_id}/import?format={import_format}",
+            headers=headers,
+            data={"file": (io.BytesIO(body), f"cards.{import_format}")},
+            content_type="multipart/form-data",
+        )
+        elapsed = time.perf_counter() - start
+        result = response.get_json()
+        assert response.status_code == 201, result
+        print(
+            f"{import_format:<5} imported={result['imported']} failed={result['failed']}  "
+            f"{elapsed:6.2f} s  {result['imported'] / elapsed:10.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
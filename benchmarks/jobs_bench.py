@@ -0,0 +1,72 @@
+"""POST /progress with the stats recompute inline versus queued to the job worker.
+
+The inline case swaps the route's enqueue_stats_refresh for a direct
+refresh_user_stats call, which is what the route did before the outbox.
+The queued case reports the worker's metrics: queue depth after the burst,
+coalescing ratio and enqueue-to-done latency.
+
+    python -m benchmarks.jobs_bench [--users 20] [--reviews 50]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import app, auth_headers, percentile, reset_database
+from benchmarks.seed import seed_account, seed_user
+from rollups import refresh_user_stats
+import jobs
+import routes.progress_routes as progress_routes
+
+
+def burst(client, accounts, reviews):
+    latencies = []
+    for i in range(reviews):
+        for headers, cards in accounts:
+            flashcard_id, deck_id = cards[i % len(cards)]
+            start = time.perf_counter()
+            response = client.post("/progress", headers=headers, json={
+                "flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": i % 4 != 0, "time_spent": 4,
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.get_data(as_text=True)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=50, help="reviews per user")
+    args = parser.parse_args()
+
+    reset_database()
+    accounts = []
+    for n in range(args.users):
+        user_id = seed_user(f"jobs{n}")
+        deck_ids, flashcard_ids = seed_account(user_id, decks=50, cards_per_deck=20, progress_density=1.0, seed=n)
+        accounts.append((auth_headers(user_id), [(card_id, deck_ids[i // 20]) for i, card_id in enumerate(flashcard_ids)]))
+    client = app.test_client()
+
+    print(f"{args.users} users x {args.reviews} reviews")
+    queued = progress_routes.enqueue_stats_refresh
+    for label, refresh in (("inline recompute", refresh_user_stats), ("queued recompute", queued)):
+        progress_routes.enqueue_stats_refresh = refresh
+        latencies = burst(client, accounts, args.reviews)
+        print(
+            f"{label:<17} POST /progress mean={statistics.mean(latencies):6.2f} ms  "
+            f"p95={percentile(latencies, 95):6.2f} ms"
+        )
+    progress_routes.enqueue_stats_refresh = queued
+
+    with app.app_context():
+        depth = jobs.queue_depth()
+        jobs.worker.stop()
+        stats = jobs.job_stats()
+    print(
+        f"queue depth after burst={depth}  drained to {stats['queue_depth']}  "
+        f"coalescing ratio={stats['coalescing_ratio']:.0%}  jobs run={stats['processed']}  "
+        f"job latency avg={stats['latency_seconds_avg'] * 1000:.1f} ms max={stats['latency_seconds_max'] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Per-request cost of the /metrics instrumentation.
+
+Runs in one process with METRICS_ENABLED=1 and detaches/reattaches the
+request hooks and SQL listeners between batches, so instrumented and plain
+batches of --batch GETs alternate for --rounds rounds and drift on a busy
+machine hits both equally. The median per-request difference is reported
+per route, followed by the cost of the hooks alone for one request that
+sends five statements. Profiling sampling is left off.
+
+    python -m benchmarks.metrics_overhead_bench [--batch 200] [--rounds 25]
+"""
+import argparse
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+os.environ["METRICS_ENABLED"] = "1"
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from benchmarks.common import app, auth_headers, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+import metrics  # noqa: E402
+
+LISTENERS = (
+    (Engine, "before_cursor_execute", metrics._before_cursor_execute),
+    (Engine, "after_cursor_execute", metrics._after_cursor_execute),
+)
+HOOKS = (
+    (app.before_request_funcs, metrics._before_request),
+    (app.after_request_funcs, metrics._after_request),
+    (app.teardown_request_funcs, metrics._teardown_request),
+)
+
+
+def detach():
+    for target, name, fn in LISTENERS:
+        event.remove(target, name, fn)
+    for funcs, fn in HOOKS:
+        funcs[None].remove(fn)
+
+
+def attach():
+    for target, name, fn in LISTENERS:
+        event.listen(target, name, fn)
+    for funcs, fn in HOOKS:
+        funcs[None].append(fn)
+
+
+def batch_micros(client, url, headers, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, (url, response.status_code)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def hook_micros(iterations=20000, statements=5):
+    """Time the hooks and listeners alone, outside any real request or query."""
+    cursor = SimpleNamespace(description=(("id",),), rowcount=-1)
+    record_cursor = (None, cursor, "SELECT 1", (), None, False)
+    with app.test_request_context("/decks"):
+        response = app.response_class("{}")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            metrics._before_request()
+            for _ in range(statements):
+                metrics._before_cursor_execute(*record_cursor)
+                metrics._after_cursor_execute(*record_cursor)
+            metrics._after_request(response)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=25)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    deck_ids, _ = seed_account(user_id, decks=10, cards_per_deck=50, progress_density=0.5)
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    routes = ["/decks", f"/decks/{deck_ids[0]}", "/flashcards?limit=100", "/study/next?limit=20", "/dashboard"]
+
+    print(f"{'route':<24}{'plain':>12}{'metrics':>12}{'overhead':>12}")
+    for url in routes:
+        batch_micros(client, url, headers, 50)
+        plain, instrumented = [], []
+        for _ in range(args.rounds):
+            detach()
+            plain.append(batch_micros(client, url, headers, args.batch))
+            attach()
+            instrumented.append(batch_micros(client, url, headers, args.batch))
+        deltas = [on - off for on, off in zip(instrumented, plain)]
+        print(f"{url:<24}{statistics.median(plain):>9.1f} us{statistics.median(instrumented):>9.1f} us"
+              f"{statistics.median(deltas):>9.1f} us")
+    metrics.request_metrics.reset()
+    print(f"hooks alone, 5 statements: {hook_micros():.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
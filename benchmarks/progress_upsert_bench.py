@@ -0,0 +1,183 @@
+"""Concurrent answers to one card: atomic upsert versus read-modify-write.
+
+--threads clients of one user POST --answers answers each to the same card,
+which starts without a progress row, so the first answers race to create it.
+With the upsert ProgressResource.post now sends, the stored counters, the
+user rollup and the review log must account for every answer exactly, or the
+script exits 1. The same run against the previous read-modify-write path
+(``_review_in_python`` patched in) reports its lost updates and errors
+instead. A single-threaded pass over --cards cards then compares answers per
+second and statements per answer for both paths. Finally --streak correct
+answers at quality 5 go to one card, long enough to reach
+MAX_INTERVAL_DAYS; every one must succeed and leave next_review_at set with
+interval_days at most MAX_INTERVAL_DAYS, or the script exits 1.
+
+    python -m benchmarks.progress_upsert_bench [--threads 16] [--answers 50] [--cards 500] [--streak 60]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ["JOBS_WORKER_ENABLED"] = "0"
+
+from benchmarks.common import app, db, auth_headers, QueryCounter, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+from models import Progress, ReviewEvent, UserProgressRollup  # noqa: E402
+import routes.progress_routes as progress_routes  # noqa: E402
+from scheduler import MAX_INTERVAL_DAYS  # noqa: E402
+
+PATHS = {
+    "upsert": progress_routes.upsert_review,
+    "read-modify-write": progress_routes._review_in_python,
+}
+
+
+def seed():
+    reset_database()
+    user_id = seed_user()
+    deck_ids, flashcard_ids = seed_account(user_id, decks=5, cards_per_deck=200, progress_density=0.5)
+    with app.app_context():
+        studied = {row[0] for row in db.session.query(Progress.flashcard_id)}
+    per_deck = len(flashcard_ids) // len(deck_ids)
+    fresh = [(card, deck_ids[i // per_deck]) for i, card in enumerate(flashcard_ids) if card not in studied]
+    return user_id, fresh
+
+
+def user_totals(user_id):
+    with app.app_context():
+        rollup = db.session.get(UserProgressRollup, user_id)
+        return rollup.total_attempts, rollup.total_correct, rollup.mastered_count
+
+
+def hammer(user_id, headers, flashcard_id, deck_id, threads, answers):
+    """POST threads * answers answers to one card at once; return (sent, sent_correct, errors, seconds)."""
+    errors = []
+    start_gate = threading.Barrier(threads)
+
+    def client_thread(n):
+        client = app.test_client()
+        start_gate.wait()
+        for i in range(answers):
+            try:
+                response = client.post("/progress", headers=headers, json={
+                    "flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": (n + i) % 4 != 0, "time_spent": 2,
+                })
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+            except Exception as e:  # A lost race can surface as an IntegrityError or a locked database
+                errors.append(type(e).__name__)
+
+    workers = [threading.Thread(target=client_thread, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+    sent_correct = sum(1 for n in range(threads) for i in range(answers) if (n + i) % 4 != 0)
+    return threads * answers, sent_correct, errors, seconds
+
+
+def check_card(user_id, flashcard_id, before, sent, sent_correct):
+    """Differences between what was sent and what was stored, as ``{field: (expected, stored)}``."""
+    with app.app_context():
+        progress = Progress.query.filter_by(user_id=user_id, flashcard_id=flashcard_id).first()
+        logged = ReviewEvent.query.filter_by(user_id=user_id, flashcard_id=flashcard_id).count()
+    attempts, correct, mastered = user_totals(user_id)
+    expected = {
+        "study_count": (sent, progress.study_count if progress else 0),
+        "correct_attempts": (sent_correct, progress.correct_attempts if progress else 0),
+        "incorrect_attempts": (sent - sent_correct, progress.incorrect_attempts if progress else 0),
+        "total_study_time": (2.0 * sent, progress.total_study_time if progress else 0),
+        "review_events": (sent, logged),
+        "rollup attempts": (sent, attempts - before[0]),
+        "rollup correct": (sent_correct, correct - before[1]),
+        "rollup mastered": (1, mastered - before[2]),
+    }
+    return {field: values for field, values in expected.items() if values[0] != values[1]}
+
+
+def sequential(user_id, headers, cards):
+    """One answer to each card, then one more to each; return (answers per second, statements per answer)."""
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+    answers = [(card, deck) for _ in range(2) for card, deck in cards]
+    with QueryCounter(engine) as counter:
+        start = time.perf_counter()
+        for i, (flashcard_id, deck_id) in enumerate(answers):
+            response = client.post("/progress", headers=headers, json={
+                "flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": i % 3 != 0, "time_spent": 2,
+            })
+            assert response.status_code == 200, response.get_data(as_text=True)
+        seconds = time.perf_counter() - start
+    return len(answers) / seconds, counter.count / len(answers)
+
+
+def streak(user_id, headers, flashcard_id, deck_id, answers):
+    """Answer one card correctly ``answers`` times; return the problems found, empty when there are none."""
+    client = app.test_client()
+    for answer in range(1, answers + 1):
+        response = client.post("/progress", headers=headers, json={
+            "flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": True, "quality": 5, "time_spent": 1,
+        })
+        if response.status_code != 200:
+            return [f"answer {answer} returned {response.status_code}"]
+    with app.app_context():
+        progress = Progress.query.filter_by(user_id=user_id, flashcard_id=flashcard_id).first()
+        problems = []
+        if progress.study_count != answers:
+            problems.append(f"study_count {progress.study_count}, expected {answers}")
+        if progress.next_review_at is None:
+            problems.append("next_review_at is NULL")
+        if progress.interval_days != MAX_INTERVAL_DAYS:
+            problems.append(f"interval_days {progress.interval_days}, expected the {MAX_INTERVAL_DAYS} cap")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--answers", type=int, default=50, help="answers per thread")
+    parser.add_argument("--cards", type=int, default=500, help="cards in the single-threaded pass")
+    parser.add_argument("--streak", type=int, default=60, help="correct answers in a row to one card")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{args.threads} threads x {args.answers} answers to one card")
+    for label, review in PATHS.items():
+        progress_routes.upsert_review = review
+        user_id, fresh = seed()
+        headers = auth_headers(user_id)
+        flashcard_id, deck_id = fresh[0]
+        before = user_totals(user_id)
+        sent, sent_correct, errors, seconds = hammer(user_id, headers, flashcard_id, deck_id, args.threads, args.answers)
+        mismatches = check_card(user_id, flashcard_id, before, sent, sent_correct)
+        summary = ", ".join(f"{field} {expected} stored {stored}" for field, (expected, stored) in mismatches.items())
+        print(f"{label:<18} {sent / seconds:8.1f} answers/s  errors={len(errors):<4} {summary or 'all answers counted'}")
+        if label == "upsert" and (errors or mismatches):
+            failed = True
+
+    print(f"\nsingle thread, {args.cards} cards answered twice")
+    for label, review in PATHS.items():
+        progress_routes.upsert_review = review
+        user_id, fresh = seed()
+        rate, statements = sequential(user_id, auth_headers(user_id), fresh[:args.cards])
+        print(f"{label:<18} {rate:8.1f} answers/s  {statements:5.1f} statements/answer")
+
+    print(f"\n{args.streak} correct answers in a row to one card")
+    for label, review in PATHS.items():
+        progress_routes.upsert_review = review
+        user_id, fresh = seed()
+        problems = streak(user_id, auth_headers(user_id), *fresh[0], args.streak)
+        print(f"{label:<18} {'; '.join(problems) or 'interval capped, next_review_at set'}")
+        if label == "upsert" and problems:
+            failed = True
+    progress_routes.upsert_review = PATHS["upsert"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Fail when a route exceeds its query budget or repeats a statement N+1 style.
+
+Replays every (rule, method) registered on the app against a seeded SQLite
+database with the caches emptied before each request, so every count is the
+cold-cache worst case. For each request it records the statements the
+request thread sends and checks them against the Resource's
+``query_budget`` (a ``{"get": 3, ...}`` class attribute, DEFAULT_BUDGET when
+undeclared). The same statement sent REPEAT_LIMIT or more times with
+different parameters is reported as an N+1 loop whatever the budget. A
+registered route with no entry in ``route_cases`` fails as well, so new
+routes get checked.
+
+    python -m benchmarks.query_budget [-v]
+"""
+import argparse
+import os
+import sys
+import threading
+from collections import defaultdict
+
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")  # Signup/login hash for real; keep it quick
+os.environ["JOBS_WORKER_ENABLED"] = "0"
+
+from sqlalchemy import event  # noqa: E402
+
+from benchmarks.common import app, db, auth_headers, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+from cache import CACHES  # noqa: E402
+from helpers import create_default_decks_for_user, ensure_default_decks  # noqa: E402
+from models import DefaultFlashcard, Progress  # noqa: E402
+
+DEFAULT_BUDGET = 10
+REPEAT_LIMIT = 3
+IGNORED_RULES = {"/static/<path:filename>", "/metrics"}
+
+# Methods a rule accepts only because its Resource is registered under several URLs
+SKIPPED = {
+    ("GET", "/progress/<int:progress_id>"): "ProgressResource.get takes no progress_id",
+    ("POST", "/progress/<int:progress_id>"): "progress is posted to /progress",
+    ("POST", "/progress/deck/<int:deck_id>"): "progress is posted to /progress",
+    ("POST", "/progress/flashcard/<int:flashcard_id>"): "progress is posted to /progress",
+}
+
+
+class QueryLog:
+    """Statements sent by the current thread while active; an executemany counts once."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+    def repeated(self):
+        """``[(statement, times)]`` for statements sent REPEAT_LIMIT+ times with differing parameters."""
+        parameters = defaultdict(list)
+        for statement, params in self.statements:
+            parameters[statement].append(repr(params))
+        return [
+            (statement, len(sent))
+            for statement, sent in parameters.items()
+            if len(sent) >= REPEAT_LIMIT and len(set(sent)) > 1
+        ]
+
+
+def route_cases(ids):
+    """``(method, rule, url, json)`` for every route, in an order where deletes come last."""
+    deck, card, other_deck = ids["deck"], ids["card"], ids["other_deck"]
+    default_deck, default_card = ids["default_deck"], ids["default_card"]
+    credentials = {"username": "budgetuser", "email": "budget@example.com", "password": "Sup3r-secret!"}
+    review = {"flashcard_id": card, "deck_id": deck, "was_correct": True, "time_spent": 2}
+    return [
+        ("POST", "/signup", "/signup", credentials),
+        ("POST", "/login", "/login", {"email": credentials["email"], "password": credentials["password"]}),
+        ("GET", "/user", "/user", None),
+        ("GET", "/decks", "/decks", None),
+        ("POST", "/decks", "/decks", {"title": "Budget deck", "description": "d", "subject": "s", "category": "c", "difficulty": 1}),
+        ("GET", "/decks/summary", "/decks/summary", None),
+        ("GET", "/decks/<int:deck_id>", f"/decks/{deck}", None),
+        ("PUT", "/decks/<int:deck_id>", f"/decks/{deck}", {"title": "Renamed"}),
+        ("POST", "/decks/<int:deck_id>/import", f"/decks/{deck}/import", {"flashcards": [
+            {"front_text": f"Imported {n}", "back_text": f"Answer {n}"} for n in range(20)
+        ]}),
+        ("GET", "/decks/defaults", "/decks/defaults", None),
+        ("GET", "/decks/defaults/<int:default_deck_id>", f"/decks/defaults/{default_deck}", None),
+        ("PUT", "/decks/defaults/<int:default_deck_id>/flashcards/<int:default_flashcard_id>",
+         f"/decks/defaults/{default_deck}/flashcards/{default_card}", {"front_text": "Edited default"}),
+        ("GET", "/flashcards", "/flashcards", None),
+        ("POST", "/flashcards", "/flashcards", {"deck_id": deck, "front_text": "New", "back_text": "Card"}),
+        ("GET", "/flashcards/search", "/flashcards/search?q=question", None),
+        ("PUT", "/flashcards/<int:id>", f"/flashcards/{card}", {"front_text": "Updated"}),
+        ("GET", "/dashboard", "/dashboard", None),
+        ("GET", "/progress", "/progress", None),
+        ("POST", "/progress", "/progress", review),
+        ("GET", "/progress/deck/<int:deck_id>", f"/progress/deck/{deck}", None),
+        ("GET", "/progress/flashcard/<int:flashcard_id>", f"/progress/flashcard/{card}", None),
+        ("POST", "/progress/batch", "/progress/batch", {"events": [
+            {**review, "flashcard_id": flashcard_id, "was_correct": n % 2 == 0} for n, flashcard_id in enumerate(ids["batch_cards"])
+        ] + [{"default_flashcard_id": ids["batch_default_card"], "was_correct": True}]}),
+        ("PUT", "/user/stats", "/user/stats", {"weekly_goal": 50}),
+        ("GET", "/study/next", "/study/next?limit=20", None),
+        ("GET", "/export", "/export", None),
+        ("GET", "/sync", "/sync?since=1", None),
+        ("DELETE", "/flashcards/<int:id>", f"/flashcards/{card}", None),
+        ("DELETE", "/decks/<int:deck_id>", f"/decks/{other_deck}", None),
+    ]
+
+
+def seed():
+    reset_database()
+    user_id = seed_user()
+    deck_ids, flashcard_ids = seed_account(user_id, decks=10, cards_per_deck=20, progress_density=0.5)
+    with app.app_context():
+        create_default_decks_for_user(user_id)
+        default_deck, batch_default_deck = ensure_default_decks()[:2]
+        default_card = db.session.query(DefaultFlashcard.id).filter_by(default_deck_id=default_deck).first()[0]
+        # From another deck: the copy-on-write PUT unlinks default_deck before the batch runs
+        batch_default_card = db.session.query(DefaultFlashcard.id).filter_by(default_deck_id=batch_default_deck).first()[0]
+        # Studied, so the copy-on-write PUT moves progress and seeds a deck rollup: its worst case
+        db.session.add(Progress(user_id=user_id, deck_id=None, flashcard_id=None, default_flashcard_id=default_card, default_deck_id=default_deck))
+        db.session.commit()
+    ids = {
+        "deck": deck_ids[0], "card": flashcard_ids[0], "other_deck": deck_ids[-1],
+        "default_deck": default_deck, "default_card": default_card, "batch_cards": flashcard_ids[1:6],
+        "batch_default_card": batch_default_card,
+    }
+    return user_id, ids
+
+
+def budget_for(rule, method):
+    view_class = getattr(app.view_functions[rule.endpoint], "view_class", None)
+    return getattr(view_class, "query_budget", {}).get(method.lower(), DEFAULT_BUDGET)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every statement of failing routes")
+    args = parser.parse_args()
+
+    user_id, ids = seed()
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    rules = {rule.rule: rule for rule in app.url_map.iter_rules() if rule.rule not in IGNORED_RULES}
+    cases = route_cases(ids)
+
+    failures = 0
+    covered = {(method, rule) for method, rule, _, _ in cases} | set(SKIPPED)
+    for rule in rules.values():
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if (method, rule.rule) not in covered:
+                failures += 1
+                print(f"{method:<7}{rule.rule:<60} no case in route_cases()")
+
+    with app.app_context():
+        engine = db.engine
+    for method, rule, url, payload in cases:
+        for cache in CACHES.values():
+            cache.clear()
+        with QueryLog(engine) as log:
+            response = client.open(url, method=method, headers=headers, json=payload)
+            response.get_data()  # Streamed bodies run their queries while being read
+        assert response.status_code < 400, (method, url, response.status_code, response.get_data(as_text=True))
+
+        budget = budget_for(rules[rule], method)
+        count, repeated = len(log.statements), log.repeated()
+        ok = count <= budget and not repeated
+        print(f"{method:<7}{url:<60}{count:>3} / {budget:<3} {'ok' if ok else 'OVER BUDGET' if count > budget else 'N+1'}")
+        for statement, times in repeated:
+            print(f"       {times}x  {' '.join(statement.split())[:150]}")
+        if not ok:
+            failures += 1
+            if args.verbose:
+                for statement, _ in log.statements:
+                    print("       " + " ".join(statement.split())[:150])
+
+    for (method, rule), reason in sorted(SKIPPED.items()):
+        print(f"{method:<7}{rule:<60} skipped: {reason}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Check that every route's queries are served by an index.
+
+Replays one request per route against a seeded SQLite database, captures
+each SELECT it issues and runs EXPLAIN QUERY PLAN on it. Any full
+``SCAN <table>`` of an application table is reported and the script
+exits non-zero.
+
+    python -m benchmarks.query_plans
+"""
+import sys
+
+from sqlalchemy import event, text
+
+from benchmarks.common import app, db, auth_headers, reset_database
+from benchmarks.seed import seed_account, seed_user
+
+
+def route_requests(deck_ids, flashcard_ids):
+    deck_id, flashcard_id = deck_ids[0], flashcard_ids[0]
+    return [
+        ("get", "/decks", None),
+        ("get", "/decks/summary", None),
+        ("get", "/decks/summary?limit=5&after=3", None),
+        ("get", f"/decks/{deck_id}", None),
+        ("get", "/flashcards", None),
+        ("get", "/flashcards?limit=50&after=10", None),
+        ("get", f"/flashcards?deck_id={deck_id}&fields=front_text", None),
+        ("get", f"/flashcards/search?q=question+{deck_id}*", None),
+        ("get", f"/flashcards/search?q=answer&deck_id={deck_id}", None),
+        ("get", "/dashboard", None),
+        ("get", "/progress", None),
+        ("get", f"/progress?deck_id={deck_id}", None),
+        ("get", f"/progress/deck/{deck_id}", None),
+        ("get", f"/progress/flashcard/{flashcard_id}", None),
+        ("post", "/progress", {"flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": True, "time_spent": 1}),
+        ("post", "/progress/batch", {"events": [
+            {"flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": False, "time_spent": 1},
+        ]}),
+        ("put", f"/flashcards/{flashcard_id}", {"front_text": "Updated"}),
+        ("get", "/study/next?limit=20", None),
+        ("get", f"/study/next?limit=20&deck_id={deck_id}", None),
+        ("get", "/sync", None),
+        ("get", "/sync?since=0", None),
+    ]
+
+
+def full_scans(connection, statement, parameters, tables):
+    plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    offending = []
+    for row in plan:
+        detail = row[-1]
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in tables and "USING" not in detail:
+            offending.append(detail)
+    return offending
+
+
+def main():
+    reset_database()
+    user_id = seed_user()
+    deck_ids, flashcard_ids = seed_account(user_id, decks=20, cards_per_deck=50, progress_density=0.5)
+    # Other accounts so that filtering by user actually matters to the planner
+    for n in range(6):
+        seed_account(seed_user(f"other{n}"), decks=20, cards_per_deck=50, progress_density=0.5)
+    with app.app_context():
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        engine = db.engine
+        tables = set(db.metadata.tables)
+
+    headers = auth_headers(user_id)
+    client = app.test_client()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")) and not executemany:
+            captured.append((statement, parameters))
+
+    failures = 0
+    for method, url, payload in route_requests(deck_ids, flashcard_ids):
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = getattr(client, method)(url, headers=headers, json=payload)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert response.status_code < 400, (url, response.get_data(as_text=True))
+
+        with engine.connect() as connection:
+            problems = [
+                (statement, scans)
+                for statement, parameters in captured
+                for scans in [full_scans(connection, statement, parameters, tables)]
+                if scans
+            ]
+        status = "ok" if not problems else "FULL SCAN"
+        print(f"{method.upper():<5} {url:<44} {len(captured):>3} selects  {status}")
+        for statement, scans in problems:
+            failures += 1
+            print("      " + "; ".join(scans))
+            print("      " + " ".join(statement.split())[:200])
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
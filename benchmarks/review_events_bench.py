@@ -0,0 +1,108 @@
+"""Streak / minutes-per-day / weekly reads: raw review_events scan versus daily_study_stats.
+
+Generates --events review events (10M by default) spread over --users users
+and the last --days days with a recursive CTE, builds the daily totals from
+them, then times the per-user summary both ways and finally compacts the raw
+events older than --retention days. The CTE is SQLite syntax, so this one
+runs against the default SQLite benchmark database only.
+
+    python -m benchmarks.review_events_bench [--events 10000000] [--users 1000] [--days 365]
+        [--retention 180] [--sample 200]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import app, db, percentile, reset_database
+from models import User, ReviewEvent
+from study_log import compact_review_events, study_summary, MINUTES_WINDOW_DAYS
+
+
+def seed(users, events, days):
+    with app.app_context():
+        db.session.execute(db.insert(User), [
+            {"username": f"events{n}", "email": f"events{n}@example.com", "_password_hash": "x"} for n in range(users)
+        ])
+        start = datetime.utcnow() - timedelta(days=days)
+        db.session.execute(db.text(
+            "WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < :events - 1) "
+            "INSERT INTO review_events (user_id, flashcard_id, deck_id, studied_at, was_correct, time_spent) "
+            "SELECT 1 + n % :users, n % 5000, n % 50, "
+            "strftime('%Y-%m-%d %H:%M:%f', :start, '+' || (CAST(n AS REAL) * :seconds / :events) || ' seconds'), "
+            "n % 4 != 0, 0.5 + (n % 7) * 0.25 FROM seq"
+        ), {"events": events, "users": users, "start": start.isoformat(sep=" "), "seconds": days * 86400})
+        db.session.execute(db.text(
+            "INSERT INTO daily_study_stats (user_id, day, reviews, correct, study_time) "
+            "SELECT user_id, date(studied_at), COUNT(*), SUM(was_correct), SUM(time_spent) "
+            "FROM review_events GROUP BY user_id, date(studied_at)"
+        ))
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+
+
+def summary_from_events(user_id, today):
+    """What the summary costs without the daily table: group the user's raw events by day."""
+    rows = db.session.query(
+        db.func.date(ReviewEvent.studied_at), db.func.count(ReviewEvent.id), db.func.sum(ReviewEvent.time_spent)
+    ).filter(ReviewEvent.user_id == user_id).group_by(db.func.date(ReviewEvent.studied_at)).all()
+    days = {datetime.strptime(day, "%Y-%m-%d").date(): (count, minutes) for day, count, minutes in rows}
+    streak, day = 0, today if today in days else today - timedelta(days=1)
+    while day in days:
+        streak, day = streak + 1, day - timedelta(days=1)
+    window = [days.get(today - timedelta(days=n), (0, 0.0)) for n in range(MINUTES_WINDOW_DAYS)]
+    week = [days.get(today - timedelta(days=n), (0, 0.0)) for n in range(today.weekday() + 1)]
+    return {
+        "study_streak": streak,
+        "minutes_per_day": round(sum(minutes for _, minutes in window) / MINUTES_WINDOW_DAYS, 2),
+        "weekly_reviews": sum(count for count, _ in week),
+    }
+
+
+def time_calls(fn, user_ids, today):
+    latencies, results = [], []
+    with app.app_context():
+        for user_id in user_ids:
+            start = time.perf_counter()
+            results.append(fn(user_id, today))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--retention", type=int, default=180, help="days of raw events kept by compaction")
+    parser.add_argument("--sample", type=int, default=200, help="users timed per read strategy")
+    args = parser.parse_args()
+
+    reset_database()
+    start = time.perf_counter()
+    seed(args.users, args.events, args.days)
+    print(f"seeded {args.events} events for {args.users} users over {args.days} days in {time.perf_counter() - start:.1f}s")
+
+    today = datetime.utcnow().date()
+    user_ids = random.Random(0).sample(range(1, args.users + 1), min(args.sample, args.users))
+    scan, expected = time_calls(summary_from_events, user_ids, today)
+    daily, actual = time_calls(study_summary, user_ids, today)
+    assert [r["study_streak"] for r in expected] == [r["study_streak"] for r in actual], "streaks disagree"
+    for label, latencies in (("raw event scan", scan), ("daily totals", daily)):
+        print(f"{label:<15} mean={statistics.mean(latencies):8.2f} ms  p95={percentile(latencies, 95):8.2f} ms")
+
+    with app.app_context():
+        start = time.perf_counter()
+        deleted = compact_review_events(args.retention)
+        elapsed = time.perf_counter() - start
+        remaining = db.session.query(db.func.count(ReviewEvent.id)).scalar()
+    print(f"compaction: deleted {deleted} events older than {args.retention} days in {elapsed:.1f}s, {remaining} left")
+
+    _, after = time_calls(study_summary, user_ids, today)
+    assert after == actual, "compaction changed the summaries"
+    print("summaries unchanged after compaction")
+
+
+if __name__ == "__main__":
+    main()
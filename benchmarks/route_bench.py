@@ -0,0 +1,409 @@
+"""Throughput, latency, SQL count and memory for every registered route.
+
+Builds a synthetic dataset (--users accounts with --decks-per-user decks of
+--cards-per-deck cards, --progress-density of them studied), then drives
+each (rule, method) registered on the app --requests times:
+
+* client - sequentially through the Flask test client
+* server - through a threaded WSGI server with --concurrency HTTP clients
+
+and reports requests/s, p50/p95/p99 latency, SQL statements per request and
+the peak traced allocation of a short tracemalloc pass per route. Writes that
+use something up (signup, default-deck copy-on-write, deletes) take a fresh
+account, card or deck on every request. The job worker is disabled so its
+statements do not land in the counts; caches are warm, as in steady state.
+
+Results go to --output as JSON together with the scale and commit, and two
+result files can be compared; routes whose p95 grew by more than
+--threshold or that send more statements are flagged and the exit code is 1.
+
+    python -m benchmarks.route_bench [--users 20] [--decks-per-user 10] [--cards-per-deck 50]
+        [--progress-density 0.5] [--requests 200] [--concurrency 8] [--mode both]
+        [--bcrypt-rounds 4] [--output route_bench.json]
+    python -m benchmarks.route_bench --compare baseline.json route_bench.json [--threshold 0.2]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ["JOBS_WORKER_ENABLED"] = "0"
+
+from sqlalchemy import event  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database  # noqa: E402
+from benchmarks.query_budget import IGNORED_RULES, SKIPPED  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+from config import password_hasher  # noqa: E402
+from helpers import create_default_decks_for_user, ensure_default_decks  # noqa: E402
+from models import User, Flashcard, DefaultFlashcard, user_default_decks  # noqa: E402
+
+PASSWORD = "route-bench-password"
+MEMORY_REQUESTS = 20
+SPARE_CARDS_PER_DECK = 5
+SQL_TOLERANCE = 0.5  # Statements per request; first-time versus repeat reviews shift the mean slightly
+
+
+def seed(args, pool_size):
+    """Seed the accounts; returns the ids and tokens the route cases need."""
+    reset_database()
+    user_id = seed_user("routebench")
+    deck_ids, flashcard_ids = seed_account(
+        user_id, args.decks_per_user, args.cards_per_deck, args.progress_density, seed=0
+    )
+    for n in range(1, args.users):
+        seed_account(seed_user(f"routebench{n}"), args.decks_per_user, args.cards_per_deck, args.progress_density, seed=n)
+
+    # A separate owner for the decks and cards the delete cases remove, so the main account stays the same size
+    churn_id = seed_user("routechurn")
+    spare_decks, _ = seed_account(churn_id, decks=pool_size + 1, cards_per_deck=SPARE_CARDS_PER_DECK, progress_density=0.0)
+    with app.app_context():
+        db.session.execute(db.insert(Flashcard), [
+            {"deck_id": spare_decks[0], "front_text": f"Spare {n}", "back_text": "Spare"} for n in range(pool_size)
+        ])
+        spare_cards = [row[0] for row in db.session.query(Flashcard.id).filter(Flashcard.deck_id == spare_decks[0])]
+
+        login_user = User(username="routelogin", email="routelogin@example.com")
+        login_user.password_hash = PASSWORD
+        db.session.add(login_user)
+
+        # Accounts that still share the default decks, one per copy-on-write edit
+        default_deck_ids = ensure_default_decks()
+        db.session.execute(db.insert(User), [
+            {"username": f"routecow{n}", "email": f"routecow{n}@example.com", "_password_hash": "x"} for n in range(pool_size)
+        ])
+        cow_ids = [row[0] for row in db.session.query(User.id).filter(User.username.like("routecow%")).order_by(User.id)]
+        db.session.execute(user_default_decks.insert(), [
+            {"user_id": cow_id, "default_deck_id": default_deck_ids[0]} for cow_id in cow_ids
+        ])
+        default_card = db.session.query(DefaultFlashcard.id).filter_by(default_deck_id=default_deck_ids[0]).first()[0]
+        card_decks = db.session.query(Flashcard.id, Flashcard.deck_id).filter(Flashcard.id.in_(flashcard_ids)).order_by(Flashcard.id).all()
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+    with app.app_context():
+        create_default_decks_for_user(user_id)
+        db.session.commit()
+
+    return {
+        "headers": auth_headers(user_id),
+        "churn_headers": auth_headers(churn_id, "routechurn"),
+        "cow_headers": [auth_headers(cow_id, f"routecow{n}") for n, cow_id in enumerate(cow_ids)],
+        "decks": deck_ids,
+        "cards": [tuple(row) for row in card_decks],
+        "spare_decks": spare_decks[1:],
+        "spare_cards": spare_cards,
+        "default_deck": default_deck_ids[0],
+        "default_card": default_card,
+    }
+
+
+def route_cases(ids):
+    """``(method, rule, make)``; ``make(i)`` returns the i-th request's (url, json, headers or None)."""
+    decks, cards = ids["decks"], ids["cards"]
+    deck = decks[0]
+
+    def card(i):
+        return cards[i % len(cards)][0]
+
+    def review(i):
+        flashcard_id, deck_id = cards[i % len(cards)]
+        return {"flashcard_id": flashcard_id, "deck_id": deck_id, "was_correct": i % 3 != 0, "time_spent": 2}
+
+    return [
+        ("POST", "/signup", lambda i: ("/signup", {
+            "username": f"signup{i}", "email": f"signup{i}@example.com", "password": PASSWORD,
+        }, None)),
+        ("POST", "/login", lambda i: ("/login", {"email": "routelogin@example.com", "password": PASSWORD}, None)),
+        ("GET", "/user", lambda i: ("/user", None, None)),
+        ("GET", "/decks", lambda i: ("/decks", None, None)),
+        ("POST", "/decks", lambda i: ("/decks", {"title": f"Bench deck {i}", "description": "d", "subject": "s", "category": "c", "difficulty": 1}, None)),
+        ("GET", "/decks/summary", lambda i: ("/decks/summary", None, None)),
+        ("GET", "/decks/<int:deck_id>", lambda i: (f"/decks/{decks[i % len(decks)]}", None, None)),
+        ("PUT", "/decks/<int:deck_id>", lambda i: (f"/decks/{deck}", {"title": f"Renamed {i}"}, None)),
+        ("POST", "/decks/<int:deck_id>/import", lambda i: (f"/decks/{decks[-1]}/import", {"flashcards": [
+            {"front_text": f"Imported {i}-{n}", "back_text": "Answer"} for n in range(20)
+        ]}, None)),
+        ("GET", "/decks/defaults", lambda i: ("/decks/defaults", None, None)),
+        ("GET", "/decks/defaults/<int:default_deck_id>", lambda i: (f"/decks/defaults/{ids['default_deck']}", None, None)),
+        ("PUT", "/decks/defaults/<int:default_deck_id>/flashcards/<int:default_flashcard_id>", lambda i: (
+            f"/decks/defaults/{ids['default_deck']}/flashcards/{ids['default_card']}", {"front_text": "Edited"},
+            ids["cow_headers"][i],
+        )),
+        ("GET", "/flashcards", lambda i: ("/flashcards", None, None)),
+        ("POST", "/flashcards", lambda i: ("/flashcards", {"deck_id": deck, "front_text": f"New {i}", "back_text": "Card"}, None)),
+        ("GET", "/flashcards/search", lambda i: ("/flashcards/search?q=question", None, None)),
+        ("PUT", "/flashcards/<int:id>", lambda i: (f"/flashcards/{card(i)}", {"front_text": f"Updated {i}"}, None)),
+        ("GET", "/dashboard", lambda i: ("/dashboard", None, None)),
+        ("GET", "/progress", lambda i: ("/progress", None, None)),
+        ("POST", "/progress", lambda i: ("/progress", review(i), None)),
+        ("GET", "/progress/deck/<int:deck_id>", lambda i: (f"/progress/deck/{decks[i % len(decks)]}", None, None)),
+        ("GET", "/progress/flashcard/<int:flashcard_id>", lambda i: (f"/progress/flashcard/{card(i)}", None, None)),
+        ("POST", "/progress/batch", lambda i: ("/progress/batch", {"events": [review(i * 10 + n) for n in range(10)]}, None)),
+        ("PUT", "/user/stats", lambda i: ("/user/stats", {"weekly_goal": 10 + i % 50}, None)),
+        ("GET", "/study/next", lambda i: ("/study/next?limit=20", None, None)),
+        ("GET", "/export", lambda i: ("/export", None, None)),
+        ("GET", "/sync", lambda i: ("/sync", None, None)),
+        ("DELETE", "/flashcards/<int:id>", lambda i: (f"/flashcards/{ids['spare_cards'][i]}", None, ids["churn_headers"])),
+        ("DELETE", "/decks/<int:deck_id>", lambda i: (f"/decks/{ids['spare_decks'][i]}", None, ids["churn_headers"])),
+    ]
+
+
+def check_coverage(cases):
+    covered = {(method, rule) for method, rule, _ in cases} | set(SKIPPED)
+    missing = [
+        f"{method} {rule.rule}"
+        for rule in app.url_map.iter_rules() if rule.rule not in IGNORED_RULES
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"})
+        if (method, rule.rule) not in covered
+    ]
+    if missing:
+        sys.exit("No benchmark case for: " + ", ".join(missing))
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def summarize(latencies, elapsed, statements, errors):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "sql_per_request": round(statements / len(latencies), 2),
+    }
+
+
+def client_request(client, ids, method, make, i):
+    url, payload, headers = make(i)
+    response = client.open(url, method=method, headers=headers or ids["headers"], json=payload)
+    response.get_data()
+    return response.status_code
+
+
+def run_client(engine, ids, method, make, offset, requests):
+    client = app.test_client()
+    latencies, errors = [], 0
+    with StatementCounter(engine) as counter:
+        start = time.perf_counter()
+        for i in range(offset, offset + requests):
+            began = time.perf_counter()
+            if client_request(client, ids, method, make, i) >= 400:
+                errors += 1
+            latencies.append((time.perf_counter() - began) * 1000)
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, counter.count, errors)
+
+
+def run_server(engine, port, ids, method, make, offset, requests, concurrency):
+    indexes = iter(range(offset, offset + requests))
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker():
+        while True:
+            with lock:
+                i = next(indexes, None)
+            if i is None:
+                return
+            url, payload, headers = make(i)
+            headers = dict(headers or ids["headers"])
+            body = None
+            if payload is not None:
+                body = json.dumps(payload)
+                headers["Content-Type"] = "application/json"
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            began = time.perf_counter()
+            conn.request(method, url, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            with lock:
+                latencies.append((time.perf_counter() - began) * 1000)
+                if response.status >= 400:
+                    errors.append(response.status)
+
+    with StatementCounter(engine) as counter:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, counter.count, len(errors))
+
+
+def peak_memory_kib(ids, method, make, offset):
+    """Largest allocation peak of a single request, measured on a warm route."""
+    client = app.test_client()
+    tracemalloc.start()
+    try:
+        peak = 0
+        for i in range(offset, offset + MEMORY_REQUESTS):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            client_request(client, ids, method, make, i)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        return round(peak / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    modes = ["client", "server"] if args.mode == "both" else [args.mode]
+    app.config["BCRYPT_LOG_ROUNDS"] = args.bcrypt_rounds
+    password_hasher.init_app(app)
+    # Every mode and the memory pass take their own slice of the consumable pools
+    pool_size = args.requests * len(modes) + MEMORY_REQUESTS
+    start = time.perf_counter()
+    ids = seed(args, pool_size)
+    print(f"seeded {args.users} users x {args.decks_per_user} decks x {args.cards_per_deck} cards "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    cases = route_cases(ids)
+    check_coverage(cases)
+    with app.app_context():
+        engine = db.engine
+
+    server = port = None
+    if "server" in modes:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+
+    results = {mode: {} for mode in modes}
+    for method, rule, make in cases:
+        for n, mode in enumerate(modes):
+            offset = n * args.requests
+            if mode == "client":
+                result = run_client(engine, ids, method, make, offset, args.requests)
+            else:
+                result = run_server(engine, port, ids, method, make, offset, args.requests, args.concurrency)
+            results[mode][f"{method} {rule}"] = result
+    if server is not None:
+        server.shutdown()
+
+    # Traced once the server is down (tracemalloc sees every thread) and each route is warm
+    print(f"{'route':<62}{'mode':<8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>7}{'peak KiB':>10}")
+    for method, rule, make in cases:
+        key = f"{method} {rule}"
+        memory = peak_memory_kib(ids, method, make, len(modes) * args.requests)
+        for mode in modes:
+            result = results[mode][key]
+            result["peak_memory_kib"] = memory
+            flag = f"  {result['errors']} errors" if result["errors"] else ""
+            print(f"{key[:61]:<62}{mode:<8}{result['throughput']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                  f"{result['p99_ms']:>9.2f}{result['sql_per_request']:>7.1f}{memory:>10.1f}{flag}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "database": engine.dialect.name,
+            "scale": {
+                "users": args.users,
+                "decks_per_user": args.decks_per_user,
+                "cards_per_deck": args.cards_per_deck,
+                "progress_density": args.progress_density,
+            },
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+def compare(baseline_path, current_path, threshold):
+    """Print per-route changes; returns True when any route regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"baseline {baseline['meta'].get('commit')} vs current {current['meta'].get('commit')}")
+    if baseline["meta"].get("scale") != current["meta"].get("scale"):
+        print("warning: the two runs used different dataset scales")
+
+    regressed = False
+    print(f"{'route':<62}{'mode':<8}{'p95 before':>11}{'p95 after':>11}{'change':>9}{'sql':>12}")
+    for mode, routes in current["results"].items():
+        for key, after in routes.items():
+            before = baseline["results"].get(mode, {}).get(key)
+            if before is None:
+                print(f"{key[:61]:<62}{mode:<8}{'new route':>11}")
+                continue
+            change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+            flags = []
+            if change > threshold:
+                flags.append("SLOWER")
+            if after["sql_per_request"] > before["sql_per_request"] + SQL_TOLERANCE:
+                flags.append("MORE SQL")
+            regressed = regressed or bool(flags)
+            print(f"{key[:61]:<62}{mode:<8}{before['p95_ms']:>9.2f}ms{after['p95_ms']:>9.2f}ms{change:>+9.0%}"
+                  f"{before['sql_per_request']:>6.1f}>{after['sql_per_request']:<5.1f}{'  ' + ', '.join(flags) if flags else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--decks-per-user", type=int, default=10)
+    parser.add_argument("--cards-per-deck", type=int, default=50)
+    parser.add_argument("--progress-density", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP clients in server mode")
+    parser.add_argument("--mode", choices=("client", "server", "both"), default="both")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="keeps signup/login from dominating the run")
+    parser.add_argument("--output", default="route_bench.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 growth flagged as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
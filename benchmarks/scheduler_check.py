@@ -0,0 +1,49 @@
+"""Fail when a long run of answers pushes the scheduler out of range.
+
+Answers one transient Progress row --answers times in a row at every
+passing quality and checks after each answer that interval_days stays
+between 1 and MAX_INTERVAL_DAYS and that next_review_at is exactly
+interval_days after the answer. Exits 1 on the first violation or error.
+
+    python -m benchmarks.scheduler_check [--answers 200]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import app  # noqa: F401  (configures the app before the models import)
+from models import Progress
+from routes.progress_routes import apply_review
+from scheduler import MAX_INTERVAL_DAYS, PASSING_QUALITY
+
+
+def check_streak(quality, answers, now):
+    progress = Progress(user_id=1, deck_id=1, flashcard_id=1)
+    for answer in range(1, answers + 1):
+        try:
+            apply_review(progress, True, 1, quality, now)
+        except Exception as e:
+            return f"quality {quality}: answer {answer} raised {type(e).__name__}: {e}"
+        if not 1 <= progress.interval_days <= MAX_INTERVAL_DAYS:
+            return f"quality {quality}: answer {answer} set interval_days={progress.interval_days}"
+        if progress.next_review_at != now + timedelta(days=progress.interval_days):
+            return f"quality {quality}: answer {answer} set next_review_at={progress.next_review_at}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=200)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    failures = [error for quality in range(PASSING_QUALITY, 6) if (error := check_streak(quality, args.answers, now))]
+    for failure in failures:
+        print(failure)
+    if not failures:
+        print(f"{args.answers} correct answers per quality stay within {MAX_INTERVAL_DAYS} days")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
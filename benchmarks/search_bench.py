@@ -0,0 +1,125 @@
+"""Flashcard search: FTS5 index versus a LIKE '%q%' scan of the user's cards.
+
+Seeds --cards flashcards (1M by default) whose text is drawn from a Zipf-like
+vocabulary, giving one heavy user --heavy-share of them and spreading the
+rest over --users accounts. Each query (common, mid-frequency and rare words,
+a two-word query and a prefix) is then timed through search_flashcards() and
+through the LIKE fallback for the heavy user and a typical one. The FTS table
+is SQLite-only, so this runs against the default benchmark database.
+
+    python -m benchmarks.search_bench [--cards 1000000] [--users 500] [--heavy-share 0.2]
+        [--decks-per-user 10] [--repeat 20]
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from benchmarks.common import app, db, percentile, reset_database
+from models import User, Deck, Flashcard
+from search import search_flashcards, parse_terms, _search_like
+
+CHUNK = 10000
+VOCABULARY_SIZE = 20000
+SYLLABLES = ["ka", "lo", "mi", "ren", "tsu", "vel", "dor", "an", "shi", "po", "gra", "eth", "um", "qui", "bar", "zo"]
+
+
+def vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def seed(cards, users, heavy_share, decks_per_user, words, rng):
+    # Word n is drawn with weight 1/(n+1), so a handful of words appear on most cards
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+    def text(low, high):
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(low, high)))
+
+    with app.app_context():
+        db.session.execute(db.insert(User), [
+            {"username": f"search{n}", "email": f"search{n}@example.com", "_password_hash": "x"} for n in range(users)
+        ])
+        user_ids = [row[0] for row in db.session.query(User.id).order_by(User.id)]
+        db.session.execute(db.insert(Deck), [
+            {"user_id": user_id, "title": f"Deck {n}"} for user_id in user_ids for n in range(decks_per_user)
+        ])
+        decks = {}
+        for deck_id, user_id in db.session.query(Deck.id, Deck.user_id):
+            decks.setdefault(user_id, []).append(deck_id)
+
+        heavy_cards = int(cards * heavy_share)
+        per_user = (cards - heavy_cards) // (users - 1)
+        plan = [(user_ids[0], heavy_cards)] + [(user_id, per_user) for user_id in user_ids[1:]]
+        rows = []
+        for user_id, count in plan:
+            for n in range(count):
+                rows.append({"deck_id": decks[user_id][n % decks_per_user], "front_text": text(3, 8), "back_text": text(5, 14)})
+                if len(rows) == CHUNK:
+                    db.session.execute(db.insert(Flashcard), rows)
+                    rows = []
+        if rows:
+            db.session.execute(db.insert(Flashcard), rows)
+        db.session.execute(db.text("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('optimize')"))
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+        return user_ids[0], user_ids[len(user_ids) // 2], per_user
+
+
+def time_search(fn, repeat):
+    latencies = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--heavy-share", type=float, default=0.2, help="fraction of all cards owned by one user")
+    parser.add_argument("--decks-per-user", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = vocabulary(rng)
+    reset_database()
+    start = time.perf_counter()
+    heavy, typical, per_user = seed(args.cards, args.users, args.heavy_share, args.decks_per_user, words, rng)
+    print(f"seeded {args.cards} cards ({int(args.cards * args.heavy_share)} for the heavy user, "
+          f"{per_user} each for the others) in {time.perf_counter() - start:.1f}s")
+
+    queries = {
+        "common word": words[3],
+        "mid word": words[300],
+        "rare word": words[8000],
+        "two words": f"{words[20]} {words[150]}",
+        "prefix": words[300][:4] + "*",
+    }
+    print(f"{'user':<8} {'query':<12} {'q':<24} {'fts mean':>10} {'fts p95':>9} {'like mean':>10} {'like p95':>9} {'hits':>5}")
+    for label, user_id in (("heavy", heavy), ("typical", typical)):
+        for name, q in queries.items():
+            fts, page = time_search(lambda: search_flashcards(user_id, q), args.repeat)
+            terms = parse_terms(q)
+            like, _ = time_search(lambda: _search_like(user_id, terms, None, 21, 0), args.repeat)
+            for card in page["results"]:
+                text = (card["front_text"] + " " + card["back_text"]).lower()
+                assert all(word.lower() in text for word, _ in terms), f"{q!r} returned a non-matching card"
+            print(
+                f"{label:<8} {name:<12} {q:<24} "
+                f"{statistics.mean(fts):8.2f}ms {percentile(fts, 95):7.2f}ms "
+                f"{statistics.mean(like):8.2f}ms {percentile(like, 95):7.2f}ms {len(page['results']):>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Synthetic dataset builders shared by the benchmarks.
+
+Rows are written with Core executemany inserts so that seeding large
+accounts takes seconds rather than minutes.
+"""
+import random
+
+from config import app, db
+from models import User, Deck, Flashcard, Progress
+from rollups import rebuild_rollups
+
+CHUNK = 5000
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(model), rows[start:start + CHUNK])
+
+
+def seed_user(username="bench", email=None):
+    with app.app_context():
+        user = User(username=username, email=email or f"{username}@example.com")
+        user._password_hash = "x"  # Skip bcrypt, benchmarks never log in
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def seed_account(user_id, decks=10, cards_per_deck=10, progress_density=1.0, seed=0):
+    """Create decks, flashcards and progress rows for ``user_id``.
+
+    ``progress_density`` is the fraction of cards that have a progress row.
+    Returns ``(deck_ids, flashcard_ids)``.
+    """
+    rng = random.Random(seed)
+    with app.app_context():
+        _insert(Deck, [
+            {
+                "user_id": user_id,
+                "title": f"Deck {i}",
+                "description": "Benchmark deck",
+                "subject": "Bench",
+                "category": "Bench",
+                "difficulty": 1 + i % 5,
+            }
+            for i in range(decks)
+        ])
+        deck_ids = [
+            row[0] for row in db.session.query(Deck.id).filter(Deck.user_id == user_id).order_by(Deck.id)
+        ]
+
+        _insert(Flashcard, [
+            {"deck_id": deck_id, "front_text": f"Question {deck_id}-{n}", "back_text": f"Answer {deck_id}-{n}"}
+            for deck_id in deck_ids
+            for n in range(cards_per_deck)
+        ])
+        cards = (
+            db.session.query(Flashcard.id, Flashcard.deck_id)
+            .join(Deck)
+            .filter(Deck.user_id == user_id)
+            .order_by(Flashcard.id)
+            .all()
+        )
+
+        progress_rows = []
+        for flashcard_id, deck_id in cards:
+            if rng.random() >= progress_density:
+                continue
+            correct = rng.randint(0, 5)
+            incorrect = rng.randint(0, 3)
+            progress_rows.append({
+                "user_id": user_id,
+                "deck_id": deck_id,
+                "flashcard_id": flashcard_id,
+                "study_count": correct + incorrect,
+                "correct_attempts": correct,
+                "incorrect_attempts": incorrect,
+                "total_study_time": round(rng.uniform(0.1, 5.0), 2),
+                "review_status": "mastered" if correct >= 3 else "learning",
+                "is_learned": correct >= 3,
+            })
+        _insert(Progress, progress_rows)
+        db.session.commit()
+        rebuild_rollups(user_id)
+        return deck_ids, [card[0] for card in cards]
@@ -0,0 +1,156 @@
+"""Serialization cost of the list routes: ORM objects and stdlib json versus column tuples and orjson.
+
+Seeds one account with --decks decks of --cards cards, each card with a
+progress row, and times building the response body of GET /decks,
+GET /flashcards and GET /progress three ways:
+
+* before - the previous code: serialize_row's per-value isoformat check
+  over column tuples (decks, flashcards) or ORM objects built into dicts
+  by hand (progress), encoded by Flask-RESTful's stdlib json
+* stdlib - column tuples through the compiled row encoder, stdlib json
+  (what runs when orjson is not installed)
+* orjson - column tuples through the compiled row encoder, orjson
+
+Each is reported as rows per second (median of --repeat runs) and the peak
+traced allocation of one run. The same routes are then timed end to end
+through the test client with orjson on and off. The response cache is off
+so every request renders.
+
+    python -m benchmarks.serialization_bench [--decks 100] [--cards 100] [--repeat 15]
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+from flask_restful.representations.json import output_json as stdlib_output_json  # noqa: E402
+
+from benchmarks.common import app, db, auth_headers, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+from helpers import serialize_row  # noqa: E402
+from models import Deck, Flashcard, Progress  # noqa: E402
+from routes.deck_routes import DECK_FIELDS  # noqa: E402
+from routes.flashcard_routes import FLASHCARD_FIELDS  # noqa: E402
+from routes.progress_routes import PROGRESS_FIELDS  # noqa: E402
+import serialization  # noqa: E402
+
+ORJSON = serialization.orjson
+
+
+def use_orjson(enabled):
+    serialization.orjson = ORJSON if enabled else None
+    serialization.row_encoder.cache_clear()
+
+
+def tuple_query(model, fields, user_id):
+    query = db.session.query(*(getattr(model, name) for name in fields))
+    if model is Flashcard:
+        query = query.join(Deck)
+    if model is Progress:
+        return query.filter(Progress.user_id == user_id)
+    return query.filter(Deck.user_id == user_id)
+
+
+def orm_progress_rows(user_id):
+    return [
+        {
+            "id": p.id,
+            "deck_id": p.deck_id,
+            "flashcard_id": p.flashcard_id,
+            "default_deck_id": p.default_deck_id,
+            "default_flashcard_id": p.default_flashcard_id,
+            "study_count": p.study_count,
+            "correct_attempts": p.correct_attempts,
+            "incorrect_attempts": p.incorrect_attempts,
+            "total_study_time": p.total_study_time,
+            "last_studied_at": p.last_studied_at.isoformat() if p.last_studied_at else None,
+            "next_review_at": p.next_review_at.isoformat() if p.next_review_at else None,
+            "review_status": p.review_status,
+            "is_learned": p.is_learned,
+        }
+        for p in Progress.query.filter_by(user_id=user_id)
+    ]
+
+
+def body_before(model, fields, user_id):
+    if model is Progress:
+        rows = orm_progress_rows(user_id)
+    else:
+        rows = [serialize_row(fields, row) for row in tuple_query(model, fields, user_id)]
+    return stdlib_output_json(rows, 200).get_data(), len(rows)
+
+
+def body_after(model, fields, user_id):
+    query = tuple_query(model, fields, user_id)
+    encode = serialization.encoder_for(query, fields)
+    rows = [encode(row) for row in query]
+    return serialization.output_json(rows, 200).get_data(), len(rows)
+
+
+def measure(build, repeat):
+    """(rows per second, peak KiB) for ``build() -> (body, rows)``, with a fresh session per run."""
+    rates = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        _, rows = build()
+        rates.append(rows / (time.perf_counter() - start))
+    db.session.remove()
+    tracemalloc.start()
+    build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(rates), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=100)
+    parser.add_argument("--cards", type=int, default=100, help="cards per deck")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+    if ORJSON is None:
+        print("orjson is not installed; the orjson rows below use the stdlib encoder")
+
+    reset_database()
+    user_id = seed_user()
+    seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=1.0)
+    routes = (
+        ("/decks", Deck, DECK_FIELDS),
+        ("/flashcards", Flashcard, FLASHCARD_FIELDS),
+        ("/progress", Progress, PROGRESS_FIELDS),
+    )
+
+    print(f"{'route':<14}{'path':<8}{'rows/s':>12}{'peak KiB':>11}{'speedup':>9}")
+    with app.test_request_context():
+        for url, model, fields in routes:
+            use_orjson(False)
+            before, before_peak = measure(lambda: body_before(model, fields, user_id), args.repeat)
+            stdlib, stdlib_peak = measure(lambda: body_after(model, fields, user_id), args.repeat)
+            use_orjson(True)
+            fast, fast_peak = measure(lambda: body_after(model, fields, user_id), args.repeat)
+            for label, rate, peak in (("before", before, before_peak), ("stdlib", stdlib, stdlib_peak), ("orjson", fast, fast_peak)):
+                print(f"{url:<14}{label:<8}{rate:12,.0f}{peak:11.0f}{rate / before:8.2f}x")
+
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    print(f"\n{'route':<14}{'stdlib ms':>11}{'orjson ms':>11}")
+    for url, _, _ in routes:
+        timings = {}
+        for enabled in (False, True):
+            use_orjson(enabled)
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                runs.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, (url, response.status_code)
+            timings[enabled] = statistics.median(runs)
+        print(f"{url:<14}{timings[False]:11.1f}{timings[True]:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""GET /study/next against a user with 100k progress rows.
+
+Progress rows get spread-out next_review_at values so that roughly a
+tenth of them are due. The due-card query must stay an index range scan
+and the endpoint must answer in well under 10 ms.
+
+    python -m benchmarks.study_queue_bench [--decks 1000] [--cards 100] [--repeat 200]
+"""
+import argparse
+import statistics
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import app, db, auth_headers, percentile, reset_database, run_requests
+from benchmarks.seed import seed_account, seed_user
+from models import Progress
+
+BUDGET_MS = 10.0
+
+
+def spread_due_dates(user_id):
+    """Give every progress row a deterministic next_review_at between -3 and +27 days."""
+    now = datetime.utcnow()
+    with app.app_context():
+        ids = [row[0] for row in db.session.query(Progress.id).filter(Progress.user_id == user_id)]
+        db.session.execute(
+            db.update(Progress),
+            [{"id": pid, "next_review_at": now + timedelta(days=(pid % 30) - 3, minutes=pid % 60)} for pid in ids],
+        )
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=100, help="cards per deck")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    reset_database()
+    user_id = seed_user()
+    deck_ids, _ = seed_account(user_id, decks=args.decks, cards_per_deck=args.cards, progress_density=1.0)
+    spread_due_dates(user_id)
+    headers = auth_headers(user_id)
+    client = app.test_client()
+
+    print(f"{args.decks * args.cards} progress rows, {args.repeat} requests per case")
+    worst = 0.0
+    for label, url in (
+        ("all decks, limit=20", "/study/next?limit=20"),
+        ("one deck, limit=20", f"/study/next?limit=20&deck_id={deck_ids[len(deck_ids) // 2]}"),
+        ("all decks, limit=100", "/study/next?limit=100"),
+    ):
+        client.get(url, headers=headers)
+        latencies, queries = run_requests(client, "get", url, headers, args.repeat)
+        p95 = percentile(latencies, 95)
+        worst = max(worst, p95)
+        print(f"{label:<22} queries={queries:.0f}  mean={statistics.mean(latencies):6.2f} ms  p95={p95:6.2f} ms")
+
+    if worst > BUDGET_MS:
+        sys.exit(f"p95 {worst:.2f} ms exceeds the {BUDGET_MS:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""GET /sync?since=<token> after a small edit, for accounts of growing size.
+
+For each --sizes entry seeds an account of that many decks of --cards cards
+(half of them studied) next to a few other accounts, takes a full sync
+into a client-side replica, then makes the same small set of changes
+through the API:
+
+* edits --edits cards and answers --edits cards
+* adds one card, deletes one card
+* renames one deck, deletes another
+
+and times GET /sync with the token from the full sync (median of
+--repeat). Reported per size: full and delta payload bytes, delta
+statements and latency. The delta is applied to the replica, which must
+then equal a fresh full sync; the script exits 1 when it does not, or when
+the delta payload of the largest account is more than 1.5x that of the
+smallest.
+
+    python -m benchmarks.sync_bench [--sizes 10,100,1000] [--cards 20] [--edits 5] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+os.environ["JOBS_WORKER_ENABLED"] = "0"
+
+from benchmarks.common import app, db, auth_headers, QueryCounter, reset_database  # noqa: E402
+from benchmarks.seed import seed_account, seed_user  # noqa: E402
+
+KINDS = ("decks", "flashcards", "progress")
+
+
+def replica_of(payload):
+    return {kind: {row["id"]: row for row in payload[kind]} for kind in KINDS}
+
+
+def apply_delta(replica, payload):
+    for kind in KINDS:
+        replica[kind].update((row["id"], row) for row in payload[kind])
+    # A deck tombstone takes the deck's cards and progress with it; a card's leaves its progress, as the server does
+    for deck_id in payload["deleted"]["decks"]:
+        replica["decks"].pop(deck_id, None)
+        cards = {card_id for card_id, card in replica["flashcards"].items() if card["deck_id"] == deck_id}
+        for card_id in cards:
+            del replica["flashcards"][card_id]
+        replica["progress"] = {
+            progress_id: row for progress_id, row in replica["progress"].items()
+            if row["deck_id"] != deck_id and row["flashcard_id"] not in cards
+        }
+    for card_id in payload["deleted"]["flashcards"]:
+        replica["flashcards"].pop(card_id, None)
+
+
+def make_changes(client, headers, deck_ids, flashcard_ids, edits):
+    for n, card_id in enumerate(flashcard_ids[:edits]):
+        assert client.put(f"/flashcards/{card_id}", json={"front_text": f"Edited {n}"}, headers=headers).status_code == 200
+    for card_id in flashcard_ids[edits:2 * edits]:
+        deck_id = deck_ids[(card_id - flashcard_ids[0]) // (len(flashcard_ids) // len(deck_ids))]
+        response = client.post("/progress", json={"flashcard_id": card_id, "deck_id": deck_id, "was_correct": True}, headers=headers)
+        assert response.status_code == 200, response.get_json()
+    response = client.post("/flashcards", json={"deck_id": deck_ids[1], "front_text": "New", "back_text": "Card"}, headers=headers)
+    assert response.status_code == 201
+    assert client.delete(f"/flashcards/{flashcard_ids[-1]}", headers=headers).status_code == 200
+    assert client.put(f"/decks/{deck_ids[2]}", json={"title": "Renamed"}, headers=headers).status_code == 200
+    assert client.delete(f"/decks/{deck_ids[-1]}", headers=headers).status_code == 200
+
+
+def measure(size, args):
+    reset_database()
+    user_id = seed_user()
+    deck_ids, flashcard_ids = seed_account(user_id, decks=size, cards_per_deck=args.cards, progress_density=0.5)
+    for n in range(3):
+        seed_account(seed_user(f"other{n}"), decks=50, cards_per_deck=args.cards, progress_density=0.5, seed=n + 1)
+    with app.app_context():
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+        engine = db.engine
+
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    full = client.get("/sync", headers=headers)
+    replica = replica_of(full.get_json())
+    token = full.get_json()["token"]
+
+    make_changes(client, headers, deck_ids, flashcard_ids, args.edits)
+
+    url = f"/sync?since={token}"
+    with QueryCounter(engine) as counter:
+        delta = client.get(url, headers=headers)
+    assert delta.status_code == 200, delta.get_json()
+    latencies = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        client.get(url, headers=headers).get_data()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    apply_delta(replica, delta.get_json())
+    fresh = replica_of(client.get("/sync", headers=headers).get_json())
+    consistent = replica == fresh
+    if not consistent:
+        for kind in KINDS:
+            missing = fresh[kind].keys() - replica[kind].keys()
+            extra = replica[kind].keys() - fresh[kind].keys()
+            stale = [key for key in fresh[kind].keys() & replica[kind].keys() if fresh[kind][key] != replica[kind][key]]
+            if missing or extra or stale:
+                print(f"  {kind}: {len(missing)} missing, {len(extra)} extra, {len(stale)} stale in the replica")
+
+    changed = sum(len(delta.get_json()[kind]) for kind in KINDS)
+    print(f"{size:>7}{len(full.get_data()):>13,}{len(delta.get_data()):>12,}{changed:>9}{counter.count:>12}"
+          f"{statistics.median(latencies):>10.2f}  {'ok' if consistent else 'REPLICA DIFFERS'}")
+    return len(delta.get_data()), consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000", help="decks per account, comma separated")
+    parser.add_argument("--cards", type=int, default=20, help="cards per deck")
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    if sizes[0] < 3:
+        sys.exit("every account needs at least 3 decks")
+
+    print(f"{'decks':>7}{'full bytes':>13}{'delta bytes':>12}{'rows':>9}{'statements':>12}{'p50 ms':>10}")
+    results = [measure(size, args) for size in sizes]
+    ok = all(consistent for _, consistent in results)
+    if results[-1][0] > 1.5 * results[0][0]:
+        print(f"delta payload grew from {results[0][0]:,} to {results[-1][0]:,} bytes with the account")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
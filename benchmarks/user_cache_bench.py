@@ -0,0 +1,83 @@
+"""Queries saved by the cached JWT user lookup on a replayed request mix.
+
+Replays --requests requests (one second of traffic at 1k rps by default)
+spread over --users users and a mix of read endpoints, once with the user
+cache disabled and once with it enabled, and reports statements per request,
+users-table lookups and the cache hit rate from the cache's stats hook.
+
+    python -m benchmarks.user_cache_bench [--users 50] [--requests 1000]
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import app, db, auth_headers, reset_database
+from benchmarks.seed import seed_account, seed_user
+from cache import add_listener
+from identity import user_cache
+
+ENDPOINTS = ("/decks", "/dashboard", "/study/next?limit=20", "/flashcards?limit=50", "/user")
+
+
+def replay(client, plan, engine):
+    counts = {"statements": 0, "user_lookups": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+        if "FROM users" in statement:
+            counts["user_lookups"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    start = time.perf_counter()
+    try:
+        for url, headers in plan:
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return counts, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    reset_database()
+    headers = []
+    for n in range(args.users):
+        user_id = seed_user(f"cache{n}")
+        seed_account(user_id, decks=5, cards_per_deck=20, progress_density=0.5, seed=n)
+        headers.append(auth_headers(user_id, f"cache{n}"))
+
+    rng = random.Random(0)
+    plan = [(rng.choice(ENDPOINTS), rng.choice(headers)) for _ in range(args.requests)]
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+
+    events = {"hit": 0, "miss": 0}
+    add_listener(lambda name, kind: name == "users" and kind in events and events.__setitem__(kind, events[kind] + 1))
+
+    maxsize = user_cache.maxsize
+    print(f"{args.requests} requests over {args.users} users")
+    for label, size in (("no user cache", 0), ("user cache", maxsize)):
+        user_cache.maxsize = size
+        user_cache.clear()
+        events.update(hit=0, miss=0)
+        counts, elapsed = replay(client, plan, engine)
+        lookups = events["hit"] + events["miss"]
+        print(
+            f"{label:<14} statements/request={counts['statements'] / args.requests:5.2f}  "
+            f"users-table queries={counts['user_lookups']:5d}  "
+            f"hit rate={events['hit'] / lookups if lookups else 0:6.1%}  "
+            f"replay={elapsed:5.2f}s ({args.requests / elapsed:6.0f} rps)"
+        )
+    print(f"cache stats: {user_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
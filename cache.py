@@ -0,0 +1,182 @@
+# cache.py
+"""
+Cache backends with a common get/set/delete/clear/stats interface.
+
+LRUCache lives in the process (LRU eviction, per-entry TTL); RedisCache keeps
+JSON-encoded values on a Redis-protocol server so every worker shares them.
+make_cache picks one from CACHE_BACKEND.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Every named cache, so instrumentation can report on all of them
+CACHES = {}
+
+_listeners = []
+
+
+def add_listener(callback):
+    """Call ``callback(cache_name, event)`` for every "hit", "miss" and "eviction"."""
+    _listeners.append(callback)
+
+
+def _notify(name, event):
+    for callback in _listeners:
+        callback(name, event)
+
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded to ``maxsize`` entries, each expiring after ``ttl`` seconds.
+
+    A ``maxsize`` of 0 disables the cache: every lookup misses and nothing is stored.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        CACHES[name] = self
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        _notify(self.name, "miss" if entry is None else "hit")
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None):
+        if self.maxsize <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        for _ in range(evicted):
+            _notify(self.name, "eviction")
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class RedisCache:
+    """
+    Redis-protocol backend; ``client`` only needs get, set(ex=), delete and scan_iter.
+
+    Values must be JSON-serializable. Server errors are logged and treated as
+    misses so a Redis outage degrades to recomputing rather than failing requests.
+    """
+
+    def __init__(self, name, client, ttl=60, prefix="flashlearn"):
+        self.name = name
+        self.client = client
+        self.ttl = ttl
+        self.prefix = f"{prefix}:{name}:"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        CACHES[name] = self
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key, default=None):
+        try:
+            raw = self.client.get(self.prefix + str(key))
+        except Exception:
+            logger.exception("Cache %s: get failed", self.name)
+            self._count("errors")
+            raw = None
+        self._count("misses" if raw is None else "hits")
+        _notify(self.name, "miss" if raw is None else "hit")
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(self.prefix + str(key), json.dumps(value), ex=self.ttl if ttl is None else ttl)
+        except Exception:
+            logger.exception("Cache %s: set failed", self.name)
+            self._count("errors")
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + str(key))
+        except Exception:
+            logger.exception("Cache %s: delete failed", self.name)
+            self._count("errors")
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def make_cache(app, name, maxsize, ttl):
+    """Build the cache backend selected by CACHE_BACKEND ("memory" or "redis")."""
+    backend = app.config.get("CACHE_BACKEND", "memory")
+    if backend == "memory":
+        return LRUCache(name, maxsize=maxsize, ttl=ttl)
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        return RedisCache(name, redis.Redis.from_url(app.config["CACHE_REDIS_URL"]), ttl=ttl)
+    raise RuntimeError(f"Unknown CACHE_BACKEND {backend!r}")
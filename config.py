@@ -5,24 +5,101 @@ from flask_restful import Api
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from hashing import PasswordHasher
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 import os
+import sqlite3
 
 app = Flask(__name__)
 from datetime import timedelta
 
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=8)  # Extend to 8 hours
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///flashlearn.db'
+# Database: SQLite by default, anything SQLAlchemy understands (e.g. postgresql://) via DATABASE_URL
+database_uri = os.getenv('DATABASE_URL', 'sqlite:///flashlearn.db')
+for scheme in ('postgres://', 'postgresql://'):
+    if database_uri.startswith(scheme):
+        database_uri = 'postgresql+psycopg2://' + database_uri[len(scheme):]  # Driver from the Pipfile
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if not database_uri.startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
+
+# SQLite connection tuning, applied to every new connection (SQLITE_TUNING=0 disables it)
+app.config['SQLITE_TUNING'] = os.getenv('SQLITE_TUNING', '1') == '1'
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'supersecretkey') 
 
+# Password hashing: bcrypt cost and the bounded pool that runs it
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+app.config['HASHING_MAX_WORKERS'] = int(os.getenv('HASHING_MAX_WORKERS', 2))
+app.config['HASHING_MAX_PENDING'] = int(os.getenv('HASHING_MAX_PENDING', 32))
+app.config['HASHING_TIMEOUT'] = float(os.getenv('HASHING_TIMEOUT', 10))
+
+# Per-process cache of the JWT identity -> user lookup
+app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', 10000))
+app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 300))
+
+# Serialized GET responses keyed by (user, content version, URL); size 0 turns the cache off
+app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 2048))
+app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+
+# Shared caches (currently the dashboard payload): "memory" per process, or "redis" via CACHE_REDIS_URL
+app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memory')
+app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+app.config['DASHBOARD_CACHE_SIZE'] = int(os.getenv('DASHBOARD_CACHE_SIZE', 10000))
+app.config['DASHBOARD_CACHE_TTL'] = int(os.getenv('DASHBOARD_CACHE_TTL', 60))
+
+# Background jobs (jobs.py): the in-process worker can be disabled to run them with `flask jobs drain`
+app.config['JOBS_WORKER_ENABLED'] = os.getenv('JOBS_WORKER_ENABLED', '1') == '1'
+app.config['JOBS_POLL_INTERVAL'] = float(os.getenv('JOBS_POLL_INTERVAL', 1.0))
+app.config['JOBS_COALESCE_WINDOW'] = float(os.getenv('JOBS_COALESCE_WINDOW', 0.5))
+app.config['JOBS_BATCH_SIZE'] = int(os.getenv('JOBS_BATCH_SIZE', 100))
+app.config['JOBS_MAX_ATTEMPTS'] = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+app.config['JOBS_DRAIN_TIMEOUT'] = float(os.getenv('JOBS_DRAIN_TIMEOUT', 10.0))
+
+# Deck deletion (deletion.py): soft delete hides a deck at once and a background job purges it in chunks
+app.config['DECK_SOFT_DELETE'] = os.getenv('DECK_SOFT_DELETE', '0') == '1'
+app.config['DECK_PURGE_CHUNK'] = int(os.getenv('DECK_PURGE_CHUNK', 5000))
+
+# Raw review events older than this are compacted away (`flask rollups compact-events`); daily totals stay
+app.config['REVIEW_EVENT_RETENTION_DAYS'] = int(os.getenv('REVIEW_EVENT_RETENTION_DAYS', 180))
+
+# Request metrics at /metrics (metrics.py); a sampled fraction of requests is profiled and kept when slow
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '0') == '1'
+app.config['METRICS_PROFILE_SAMPLE_RATE'] = float(os.getenv('METRICS_PROFILE_SAMPLE_RATE', 0.0))
+app.config['METRICS_PROFILE_SLOW_MS'] = float(os.getenv('METRICS_PROFILE_SLOW_MS', 500))
+app.config['METRICS_PROFILE_DIR'] = os.getenv('METRICS_PROFILE_DIR', 'profiles')
+
 jwt = JWTManager(app)
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 bcrypt = Bcrypt(app)
+password_hasher = PasswordHasher(bcrypt, app)
 api = Api(app)
 
 
+@event.listens_for(Engine, "connect")
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the single writer; NORMAL sync is safe under WAL."""
+    if not isinstance(dbapi_connection, sqlite3.Connection) or not app.config['SQLITE_TUNING']:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']:d}")
+    cursor.execute(f"PRAGMA mmap_size={app.config['SQLITE_MMAP_SIZE']:d}")
+    cursor.close()
+
+
 CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}})
 # Default decks template
 DEFAULT_DECKS_TEMPLATE = [
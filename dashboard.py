@@ -0,0 +1,126 @@
+# dashboard.py
+"""
+The dashboard payload, computed read-only from the rollups and cached per user.
+
+Entries are keyed on versions of everything the payload reads instead of being
+deleted on writes: the content version moves with deck and flashcard writes,
+the change sequence with progress (and so rollup and daily total) writes, and
+weekly_goal and the date are part of the key themselves. A payload is never
+stored under a key older than the data it was built from, and every worker,
+whatever the cache backend, misses as soon as the user writes.
+"""
+from datetime import datetime
+
+from cache import make_cache
+from config import app, db
+from models import ChangeSequence, ContentVersion, Deck, User, UserStats, UserProgressRollup, DeckProgressRollup
+from study_log import study_summary
+
+dashboard_cache = make_cache(
+    app, "dashboard", maxsize=app.config["DASHBOARD_CACHE_SIZE"], ttl=app.config["DASHBOARD_CACHE_TTL"]
+)
+
+
+def dashboard_key(user_id, username):
+    """The cache key for the user's current data, read in one statement."""
+    versions = db.session.query(
+        db.select(ContentVersion.version).where(ContentVersion.user_id == user_id).scalar_subquery(),
+        db.select(ChangeSequence.seq).where(ChangeSequence.user_id == user_id).scalar_subquery(),
+        db.select(UserStats.weekly_goal).where(UserStats.user_id == user_id).scalar_subquery(),
+    ).one()
+    # The streak and trailing minutes roll over at midnight (UTC) without a write
+    return (user_id, username, *versions, datetime.utcnow().date().isoformat())
+
+
+def get_dashboard(user_id, username):
+    # Versions are read before the payload is built, so the payload is at least as new as its key
+    key = dashboard_key(user_id, username)
+    payload = dashboard_cache.get(key)
+    if payload is None:
+        payload = build_dashboard(user_id, username)
+        dashboard_cache.set(key, payload)
+    return payload
+
+
+def build_dashboard(user_id, username):
+    """Compute the dashboard without writing; UserStats is kept current by the write paths."""
+    # One statement for the user rollup, the stats row and the per-deck rollups; anchoring on the
+    # user row keeps a single all-NULL deck row for users without decks
+    rows = (
+        db.session.query(
+            UserProgressRollup.total_correct,
+            UserProgressRollup.total_study_time,
+            UserStats.weekly_goal,
+            UserProgressRollup.mastered_count,
+            Deck.id,
+            Deck.title,
+            db.func.coalesce(DeckProgressRollup.total_attempts, 0),
+        )
+        .select_from(User)
+        .outerjoin(UserProgressRollup, UserProgressRollup.user_id == User.id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .outerjoin(Deck, db.and_(Deck.user_id == User.id, Deck.deleted_at.is_(None)))
+        .outerjoin(DeckProgressRollup, db.and_(DeckProgressRollup.deck_id == Deck.id, DeckProgressRollup.user_id == User.id))
+        .filter(User.id == user_id)
+        .order_by(Deck.id)
+        .all()
+    )
+
+    deck_data = []
+    total_flashcards_studied = 0
+    most_reviewed_deck = None
+    most_reviews = 0
+
+    for *_, deck_id, deck_title, deck_study_count in rows:
+        if deck_id is None:
+            continue
+        total_flashcards_studied += deck_study_count
+
+        if deck_study_count > most_reviews:
+            most_reviews = deck_study_count
+            most_reviewed_deck = deck_title
+
+        deck_data.append({
+            "deck_id": deck_id,
+            "deck_title": deck_title,
+            "flashcards_studied": deck_study_count
+        })
+
+    # Users who have never studied have no rollup or stats row yet; report the column defaults.
+    # cards_mastered comes from the rollup the recompute job copies it from, so the job cannot leave it stale
+    total_correct, total_study_time, weekly_goal, cards_mastered = rows[0][:4] if rows else (None,) * 4
+    total_correct = total_correct or 0
+    total_study_time = total_study_time or 0
+    weekly_goal = weekly_goal or 0
+
+    # Streak and daily minutes are read fresh from the daily totals so they roll over at midnight
+    summary = study_summary(user_id)
+
+    total_attempts = total_flashcards_studied or 1
+    mastery_level = (total_correct / total_attempts) * 100 if total_attempts > 0 else 0
+
+    retention_rate = mastery_level
+
+    target_time_per_flashcard = 1
+    focus_score = 0
+
+    if total_flashcards_studied > 0:
+        average_time_per_flashcard = total_study_time / total_flashcards_studied
+        focus_score = (average_time_per_flashcard / target_time_per_flashcard) * 100
+
+    return {
+        "username": username,
+        "total_flashcards_studied": total_flashcards_studied,
+        "most_reviewed_deck": most_reviewed_deck,
+        "weekly_goal": weekly_goal,
+        "weekly_reviews": summary["weekly_reviews"],
+        "weekly_goal_progress": round(summary["weekly_reviews"] / weekly_goal * 100, 2) if weekly_goal else 0,
+        "mastery_level": mastery_level,
+        "study_streak": summary["study_streak"],
+        "focus_score": focus_score,
+        "retention_rate": retention_rate,
+        "cards_mastered": cards_mastered or 0,
+        "minutes_per_day": summary["minutes_per_day"],
+        "accuracy": mastery_level,
+        "decks": deck_data
+    }
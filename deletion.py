@@ -0,0 +1,89 @@
+# deletion.py
+"""
+Deck deletion with set-based statements.
+
+A deck's progress rows, flashcards, rollup and the deck itself are removed
+by one DELETE each, in foreign key order, instead of the ORM loading every
+card through the relationship cascade. With DECK_SOFT_DELETE the request
+only stamps ``deleted_at`` and takes the deck out of the rollups; the
+``purge_deck`` job then deletes DECK_PURGE_CHUNK rows per transaction until
+the deck is gone.
+"""
+from datetime import datetime
+
+from config import app, db
+from models import Deck, DeckProgressRollup, Flashcard, Progress
+from jobs import enqueue, job_handler
+from rollups import drop_deck_rollups, enqueue_stats_refresh, remove_progress
+
+
+def _deck_cards(deck_id):
+    return db.select(Flashcard.id).where(Flashcard.deck_id == deck_id)
+
+
+def _deck_progress(user_id, deck_id):
+    # The owner's rows filed under the deck plus any pointing at its cards, so no progress outlives its flashcard
+    return db.and_(
+        Progress.user_id == user_id,
+        db.or_(Progress.deck_id == deck_id, Progress.flashcard_id.in_(_deck_cards(deck_id))),
+    )
+
+
+def _remove_other_users_progress(deck, cards):
+    """
+    Delete other users' progress on ``cards``, a select of the deck's card ids, with its share of their rollups.
+
+    Only answers recorded before POST /progress checked card ownership can have left such rows.
+    """
+    for user_id in remove_progress(db.and_(Progress.user_id != deck.user_id, Progress.flashcard_id.in_(cards))):
+        enqueue_stats_refresh(user_id)
+
+
+def _drop_deck_rollups(deck):
+    for user_id in drop_deck_rollups(deck.id) - {deck.user_id}:
+        enqueue_stats_refresh(user_id)
+
+
+def delete_deck(deck):
+    """Delete the deck with everything that references it (does not commit)."""
+    # Other users' rows first: those filed under this deck come out of its rollup rows before they are dropped
+    _remove_other_users_progress(deck, _deck_cards(deck.id))
+    _drop_deck_rollups(deck)
+    db.session.query(Progress).filter(_deck_progress(deck.user_id, deck.id)).delete(synchronize_session=False)
+    db.session.query(Flashcard).filter(Flashcard.deck_id == deck.id).delete(synchronize_session=False)
+    db.session.query(Deck).filter(Deck.id == deck.id).delete(synchronize_session=False)
+    enqueue_stats_refresh(deck.user_id)
+
+
+def soft_delete_deck(deck):
+    """Hide the deck now and queue its purge (does not commit)."""
+    deck.deleted_at = datetime.utcnow()
+    _drop_deck_rollups(deck)
+    enqueue("purge_deck", deck.id)
+    enqueue_stats_refresh(deck.user_id)
+
+
+def _delete_chunk(model, condition, chunk):
+    chunk_ids = db.select(model.id).where(condition).limit(chunk)
+    return db.session.query(model).filter(model.id.in_(chunk_ids)).delete(synchronize_session=False)
+
+
+@job_handler("purge_deck")
+def purge_deck_job(key):
+    """Delete one chunk of a soft-deleted deck; the job queues itself again until the deck is gone."""
+    deck = db.session.query(Deck.id, Deck.user_id).filter(Deck.id == int(key), Deck.deleted_at.isnot(None)).first()
+    if deck is None:
+        return
+    chunk = app.config["DECK_PURGE_CHUNK"]
+    deleted = _delete_chunk(Progress, _deck_progress(deck.user_id, deck.id), chunk)
+    if deleted < chunk:
+        cards = db.session.scalars(_deck_cards(deck.id).limit(chunk - deleted)).all()
+        if cards:
+            _remove_other_users_progress(deck, cards)
+            deleted += db.session.query(Flashcard).filter(Flashcard.id.in_(cards)).delete(synchronize_session=False)
+    if deleted:
+        enqueue("purge_deck", deck.id)
+        return
+    # Answers that landed after the soft delete may have started a new rollup row
+    _drop_deck_rollups(deck)
+    db.session.query(Deck).filter(Deck.id == deck.id).delete(synchronize_session=False)
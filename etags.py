@@ -0,0 +1,69 @@
+# etags.py
+"""Strong ETags and a serialized-response cache for deck and flashcard reads."""
+import hashlib
+from functools import wraps
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt_identity
+
+from cache import LRUCache
+from config import app, db
+from models import ContentVersion
+from serialization import output_json
+
+response_cache = LRUCache("responses", maxsize=app.config["RESPONSE_CACHE_SIZE"], ttl=app.config["RESPONSE_CACHE_TTL"])
+
+
+def content_version(user_id):
+    version = db.session.query(ContentVersion.version).filter(ContentVersion.user_id == user_id).scalar()
+    return version or 0
+
+
+def bump_content_version(user_id):
+    """
+    Invalidate every ETag and cached response for the user's decks and flashcards.
+
+    Runs in the caller's transaction, so the new version commits together with the write.
+    """
+    updated = (
+        db.session.query(ContentVersion)
+        .filter(ContentVersion.user_id == user_id)
+        .update({ContentVersion.version: ContentVersion.version + 1})
+    )
+    if not updated:
+        db.session.add(ContentVersion(user_id=user_id, version=1))
+        db.session.flush()
+
+
+def etag_cached(view):
+    """
+    Serve a GET from the user's content version instead of the underlying tables.
+
+    Answers 304 when If-None-Match carries the current ETag, otherwise returns
+    the cached serialized body for (user, version, URL) or renders and caches
+    it. Only 200 responses are cached. Apply below @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity().get("id")
+        version = content_version(user_id)
+        etag = hashlib.sha1(f"{user_id}:{version}:{request.full_path}".encode()).hexdigest()
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            key = (user_id, version, request.full_path)
+            body = response_cache.get(key)
+            if body is None:
+                result = view(*args, **kwargs)
+                if result[1] != 200:
+                    return result
+                body = output_json(result[0], 200).get_data()
+                response_cache.set(key, body)
+            response = Response(body, status=200, mimetype="application/json")
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"  # Always revalidate, never share
+        return response
+
+    return wrapper
@@ -0,0 +1,127 @@
+# hashing.py
+"""Bounded thread pool for bcrypt work so logins cannot monopolize request workers."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class HashingTimeout(HashingBusy):
+    """Raised when a queued hash did not finish within HASHING_TIMEOUT; also answered with 503."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and checks on a small dedicated pool.
+
+    At most HASHING_MAX_WORKERS hashes run at once and at most
+    HASHING_MAX_PENDING more may wait; anything beyond that is rejected
+    immediately instead of piling up behind the pool.
+    """
+
+    def __init__(self, bcrypt, app=None):
+        self.bcrypt = bcrypt
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        max_workers = app.config.get("HASHING_MAX_WORKERS", 2)
+        max_pending = app.config.get("HASHING_MAX_PENDING", 32)
+        self.timeout = app.config.get("HASHING_TIMEOUT", 10.0)
+        self.log_rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.max_workers = max_workers
+        self._reset_stats()
+
+        old_executor = self._executor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self.in_flight = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy("Too many concurrent password operations")
+
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+
+        def finish():
+            with self._lock:
+                self.in_flight -= 1
+            slots.release()
+
+        def task():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    waited = started_at - enqueued_at
+                    self.queue_seconds_total += waited
+                    self.queue_seconds_max = max(self.queue_seconds_max, waited)
+                    self.run_seconds_total += finished_at - started_at
+                    self.completed += 1
+                finish()
+
+        future = self._executor.submit(task)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # A task still waiting in the queue is dropped and gives its slot back now;
+            # one already running cannot be interrupted and releases it when bcrypt returns
+            if future.cancel():
+                finish()
+            with self._lock:
+                self.timed_out += 1
+            raise HashingTimeout("Password operation timed out")
+
+    def generate(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password, self.log_rounds).decode("utf-8")
+
+    def check(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+        try:
+            return int(password_hash.split("$")[2]) != self.log_rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "completed": self.completed,
+                "in_flight": self.in_flight,
+                "queue_seconds_avg": self.queue_seconds_total / completed,
+                "queue_seconds_max": self.queue_seconds_max,
+                "run_seconds_avg": self.run_seconds_total / completed,
+            }
@@ -1,29 +1,202 @@
 # helpers.py
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from config import DEFAULT_DECKS_TEMPLATE
-from models import db, Deck, Flashcard
+from models import db, Deck, Flashcard, Progress, DefaultDeck, DefaultFlashcard, user_default_decks
+from rollups import seed_deck_rollup
+from serialization import encoder_for
+from sync import next_change_seq
+
+def ensure_default_decks():
+    """
+    Store DEFAULT_DECKS_TEMPLATE once in the shared default tables and return the deck ids.
+
+    Titles are unique: a deck that a concurrent sign-up stored first is
+    reused rather than duplicated. Does not commit.
+    """
+    existing = dict(db.session.query(DefaultDeck.title, DefaultDeck.id))
+    missing = [deck_data for deck_data in DEFAULT_DECKS_TEMPLATE if deck_data["title"] not in existing]
+    if not missing:
+        return [existing[deck_data["title"]] for deck_data in DEFAULT_DECKS_TEMPLATE]
+
+    dialect = db.session.get_bind().dialect.name
+    for deck_data in missing:
+        values = {key: deck_data[key] for key in ("title", "description", "subject", "category", "difficulty")}
+        if dialect in ("sqlite", "postgresql"):
+            statement = (sqlite if dialect == "sqlite" else postgresql).insert(DefaultDeck).values(**values)
+            default_deck_id = db.session.execute(
+                statement.on_conflict_do_nothing(index_elements=["title"]).returning(DefaultDeck.id)
+            ).scalar()
+        else:
+            try:
+                with db.session.begin_nested():
+                    default_deck_id = db.session.execute(db.insert(DefaultDeck).values(**values)).inserted_primary_key[0]
+            except IntegrityError:
+                default_deck_id = None
+        # None: another sign-up stored this deck, together with its cards
+        if default_deck_id is not None and deck_data["flashcards"]:
+            db.session.execute(db.insert(DefaultFlashcard), [
+                {"default_deck_id": default_deck_id, "front_text": card["front_text"], "back_text": card["back_text"]}
+                for card in deck_data["flashcards"]
+            ])
+
+    existing = dict(db.session.query(DefaultDeck.title, DefaultDeck.id))
+    return [existing[deck_data["title"]] for deck_data in DEFAULT_DECKS_TEMPLATE]
+
 
 def create_default_decks_for_user(user_id):
-    for deck_data in DEFAULT_DECKS_TEMPLATE:
-        # Create a new deck for the user
-        new_deck = Deck(
-            user_id=user_id,
-            title=deck_data["title"],
-            description=deck_data["description"],
-            subject=deck_data["subject"],
-            category=deck_data["category"],
-            difficulty=deck_data["difficulty"],
-            is_default=True  # Mark this deck as a default deck
+    """Link the shared default decks to a user; no deck or card rows are copied. Does not commit."""
+    default_deck_ids = ensure_default_decks()
+    db.session.execute(
+        user_default_decks.insert(),
+        [{"user_id": user_id, "default_deck_id": default_deck_id} for default_deck_id in default_deck_ids],
+    )
+
+
+def copy_default_deck_for_user(user_id, default_deck_id, edits=None):
+    """
+    Copy-on-write: give the user a private copy of a shared deck.
+
+    ``edits`` maps default_flashcard_id to front_text/back_text overrides that
+    are written into the copies. The user's progress on the shared cards is
+    moved onto the copies and the shared deck is unlinked. Returns
+    (deck, {default_flashcard_id: flashcard_id}). Does not commit.
+    """
+    edits = edits or {}
+    default_deck = db.session.get(DefaultDeck, default_deck_id)
+    seq = next_change_seq(user_id)
+    deck = Deck(
+        user_id=user_id,
+        title=default_deck.title,
+        description=default_deck.description,
+        subject=default_deck.subject,
+        category=default_deck.category,
+        difficulty=default_deck.difficulty,
+        is_default=True,
+        source_default_deck_id=default_deck.id,
+        change_seq=seq,
+    )
+    db.session.add(deck)
+    db.session.flush()
+
+    default_cards = (
+        db.session.query(DefaultFlashcard.id, DefaultFlashcard.front_text, DefaultFlashcard.back_text)
+        .filter(DefaultFlashcard.default_deck_id == default_deck.id)
+        .order_by(DefaultFlashcard.id)
+        .all()
+    )
+    if default_cards:
+        db.session.execute(
+            db.insert(Flashcard),
+            [
+                {"deck_id": deck.id, "front_text": front_text, "back_text": back_text, "change_seq": seq,
+                 **edits.get(default_card_id, {})}
+                for default_card_id, front_text, back_text in default_cards
+            ],
+        )
+    copied_ids = [row[0] for row in db.session.query(Flashcard.id).filter(Flashcard.deck_id == deck.id).order_by(Flashcard.id)]
+    card_map = {default_card[0]: flashcard_id for default_card, flashcard_id in zip(default_cards, copied_ids)}
+
+    # One UPDATE repoints every progress row; SET expressions read the row's old default_flashcard_id
+    moved = db.session.query(Progress).filter(
+        Progress.user_id == user_id, Progress.default_deck_id == default_deck.id
+    ).update({
+        Progress.flashcard_id: db.case(card_map, value=Progress.default_flashcard_id),
+        Progress.deck_id: deck.id,
+        Progress.default_flashcard_id: None,
+        Progress.default_deck_id: None,
+        Progress.change_seq: seq,
+    }, synchronize_session=False) if card_map else 0
+    if moved:
+        seed_deck_rollup(user_id, deck.id)
+
+    db.session.execute(
+        user_default_decks.delete().where(
+            user_default_decks.c.user_id == user_id,
+            user_default_decks.c.default_deck_id == default_deck.id,
         )
-        db.session.add(new_deck)
-        db.session.flush()  # Ensure the deck ID is available for flashcards
-
-        # Create flashcards for the deck
-        for flashcard_data in deck_data["flashcards"]:
-            new_flashcard = Flashcard(
-                deck_id=new_deck.id,
-                front_text=flashcard_data["front_text"],
-                back_text=flashcard_data["back_text"]
-            )
-            db.session.add(new_flashcard)
-
-    db.session.commit()
\ No newline at end of file
+    )
+    return deck, card_map
+
+
+def user_has_default_deck(user_id, default_deck_id):
+    return db.session.query(
+        db.exists().where(
+            user_default_decks.c.user_id == user_id,
+            user_default_decks.c.default_deck_id == default_deck_id,
+        )
+    ).scalar()
+
+
+# Keyset pagination and field selection for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_list_args(args, allowed_fields):
+    """
+    Read ``fields``, ``limit`` and ``after`` from the query string.
+
+    Returns (fields, paginate, limit, after). ``paginate`` is False when the
+    client sent neither ``limit`` nor ``after``, so older clients keep
+    receiving a plain list. Raises ValueError on bad input.
+    """
+    fields = list(allowed_fields)
+    if args.get("fields"):
+        requested = {name.strip() for name in args["fields"].split(",") if name.strip()}
+        unknown = requested - set(allowed_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        fields = [name for name in allowed_fields if name == "id" or name in requested]
+
+    paginate = "limit" in args or "after" in args
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        after = int(args["after"]) if args.get("after") else None
+    except ValueError:
+        raise ValueError("limit and after must be integers")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    return fields, paginate, limit, after
+
+
+def parse_deck_id(args):
+    """Read the optional ``deck_id`` filter; None when absent. Raises ValueError on bad input."""
+    if "deck_id" not in args:
+        return None
+    deck_id = args.get("deck_id", type=int)
+    if deck_id is None:
+        raise ValueError("deck_id must be an integer")
+    return deck_id
+
+
+def serialize_row(fields, row):
+    return {
+        name: value.isoformat() if hasattr(value, "isoformat") else value
+        for name, value in zip(fields, row)
+    }
+
+
+def keyset_page(query, id_column, fields, paginate, limit, after):
+    """
+    Order ``query`` by ``id_column`` and return its rows as dicts keyed by ``fields``.
+
+    Paginated results are ``{"items": [...], "next_cursor": ...}`` where
+    the cursor is the last id returned, or None on the final page.
+    """
+    if after is not None:
+        query = query.filter(id_column > after)
+    query = query.order_by(id_column)
+    encode = encoder_for(query, fields)
+
+    if not paginate:
+        return [encode(row) for row in query]
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = [encode(row) for row in rows[:limit]]
+    return {
+        "items": items,
+        "next_cursor": str(items[-1]["id"]) if has_more else None,
+    }
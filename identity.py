@@ -0,0 +1,39 @@
+# identity.py
+"""Resolve the JWT identity to a cached, lightweight user for ``current_user``."""
+from collections import namedtuple
+
+from sqlalchemy import event
+
+from cache import LRUCache
+from config import app, db, jwt
+from models import User
+
+# Detached, immutable stand-in for User; resources only need these columns
+CachedUser = namedtuple("CachedUser", ["id", "username", "email"])
+
+user_cache = LRUCache("users", maxsize=app.config["USER_CACHE_SIZE"], ttl=app.config["USER_CACHE_TTL"])
+
+
+@jwt.user_lookup_loader
+def load_user(_jwt_header, jwt_data):
+    """Return the CachedUser for the token's identity, or None if the account is gone."""
+    user_id = jwt_data["sub"].get("id")
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.session.query(User.id, User.username, User.email).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        user = CachedUser(*row)
+        user_cache.set(user_id, user)
+    return user
+
+
+@jwt.user_lookup_error_loader
+def user_not_found(_jwt_header, _jwt_data):
+    return {"error": "User not found"}, 404
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(_mapper, _connection, target):
+    user_cache.delete(target.id)
@@ -0,0 +1,111 @@
+# importers.py
+"""Incremental parsers for flashcard imports (CSV, Anki-style TSV and JSON)."""
+import csv
+import io
+import json
+
+FORMATS = ("csv", "tsv", "json")
+MAX_TEXT_LENGTH = 10000
+
+_HEADER_ALIASES = {
+    "front": "front_text", "front_text": "front_text", "question": "front_text",
+    "back": "back_text", "back_text": "back_text", "answer": "back_text",
+}
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole cannot be parsed."""
+
+
+def detect_format(requested=None, content_type=None, filename=None):
+    """Pick the import format from ?format=, the file extension or the content type."""
+    if requested:
+        if requested not in FORMATS:
+            raise ImportFormatError(f"format must be one of {', '.join(FORMATS)}")
+        return requested
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in ("csv", "json"):
+            return extension
+        if extension in ("tsv", "txt"):
+            return "tsv"
+    content_type = (content_type or "").lower()
+    if "json" in content_type:
+        return "json"
+    if "tab-separated" in content_type:
+        return "tsv"
+    return "csv"
+
+
+def _validate(front_text, back_text):
+    front_text = (front_text or "").strip()
+    back_text = (back_text or "").strip()
+    if not front_text or not back_text:
+        return None, "front_text and back_text are required"
+    if len(front_text) > MAX_TEXT_LENGTH or len(back_text) > MAX_TEXT_LENGTH:
+        return None, f"Card text is limited to {MAX_TEXT_LENGTH} characters"
+    return (front_text, back_text), None
+
+
+def _iter_delimited(text_stream, delimiter):
+    columns = None
+    reader = csv.reader(text_stream, delimiter=delimiter)
+    for row in reader:
+        row_number = reader.line_num
+        # Anki exports start with '#key:value' header lines
+        if not row or (delimiter == "\t" and row[0].startswith("#")):
+            continue
+        if columns is None:
+            names = [_HEADER_ALIASES.get(cell.strip().lower()) for cell in row]
+            if "front_text" in names and "back_text" in names:
+                columns = (names.index("front_text"), names.index("back_text"))
+                continue
+            columns = (0, 1)
+        if len(row) <= max(columns):
+            yield row_number, None, "Expected a front and a back column"
+            continue
+        card, error = _validate(row[columns[0]], row[columns[1]])
+        yield row_number, card, error
+
+
+def _iter_json(binary_stream):
+    try:
+        data = json.load(binary_stream)
+    except ValueError as e:
+        raise ImportFormatError(f"Invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("flashcards")
+    if not isinstance(data, list):
+        raise ImportFormatError("JSON imports must be a list of cards or {\"flashcards\": [...]}")
+    for row_number, item in enumerate(data, start=1):
+        if not isinstance(item, dict):
+            yield row_number, None, "Each card must be an object"
+            continue
+        card, error = _validate(
+            item.get("front_text", item.get("front")),
+            item.get("back_text", item.get("back")),
+        )
+        yield row_number, card, error
+
+
+def iter_cards(binary_stream, import_format):
+    """
+    Yield (row_number, (front_text, back_text) or None, error or None) for each record.
+
+    CSV and TSV are decoded and parsed line by line from the stream. JSON has
+    to be decoded as a whole, but rows are still validated one at a time.
+    """
+    if import_format == "json":
+        yield from _iter_json(binary_stream)
+        return
+    if not hasattr(binary_stream, "read1"):
+        binary_stream = io.BufferedReader(binary_stream)
+    text_stream = io.TextIOWrapper(binary_stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from _iter_delimited(text_stream, "\t" if import_format == "tsv" else ",")
+    except UnicodeDecodeError:
+        raise ImportFormatError("Uploads must be UTF-8 encoded")
+    except csv.Error as e:
+        raise ImportFormatError(f"Malformed {import_format.upper()}: {e}")
+    finally:
+        text_stream.detach()
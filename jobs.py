@@ -0,0 +1,247 @@
+# jobs.py
+"""
+Background jobs backed by the job_outbox table.
+
+Request handlers call enqueue() inside their own transaction, so a job exists
+exactly when the change that needs it has committed. Pending jobs are unique
+per (kind, key): enqueuing work that is already queued coalesces into the
+existing row. A worker thread in each serving process is woken by the commit
+that queued a job, waits JOBS_COALESCE_WINDOW for the rest of the burst, runs
+everything pending and drains the queue on shutdown. With
+JOBS_WORKER_ENABLED=0 they can be run from `flask jobs drain` instead.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import app, db
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def job_handler(kind, after_commit=None):
+    """
+    Register ``fn(key)`` to run jobs of ``kind`` inside the worker's transaction.
+
+    ``after_commit(key)``, if given, runs once the job's work has committed.
+    """
+    def register(fn):
+        _handlers[kind] = (fn, after_commit)
+        return fn
+    return register
+
+
+class JobMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.processed += 1
+            self.latency_seconds_total += seconds
+            self.latency_seconds_max = max(self.latency_seconds_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": self.coalesced / self.enqueued if self.enqueued else 0.0,
+                "processed": self.processed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "latency_seconds_avg": self.latency_seconds_total / self.processed if self.processed else 0.0,
+                "latency_seconds_max": self.latency_seconds_max,
+            }
+
+
+metrics = JobMetrics()
+
+
+def enqueue(kind, key):
+    """Queue ``kind`` for ``key`` in the current transaction (the caller commits)."""
+    values = {"kind": kind, "key": str(key), "enqueued_at": datetime.utcnow(), "attempts": 0}
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = (sqlite if dialect == "sqlite" else postgresql).insert
+        inserted = db.session.execute(
+            insert(Job).values(**values).on_conflict_do_nothing(index_elements=["kind", "key"])
+        ).rowcount
+    else:
+        inserted = not db.session.query(Job.id).filter_by(kind=kind, key=values["key"]).first()
+        if inserted:
+            db.session.execute(db.insert(Job).values(**values))
+    metrics.add(enqueued=1, coalesced=0 if inserted else 1)
+    db.session.info["jobs_enqueued"] = True
+
+
+def queue_depth():
+    return db.session.query(db.func.count(Job.id)).scalar()
+
+
+def job_stats():
+    """Worker metrics plus the current queue depth (needs an app context)."""
+    return {"queue_depth": queue_depth(), **metrics.snapshot()}
+
+
+def _run_job(job):
+    handler, after_commit = _handlers.get(job.kind, (None, None))
+
+    # Deleting the row claims the job; a zero rowcount means another worker already has it
+    claimed = db.session.query(Job).filter(Job.id == job.id).delete(synchronize_session=False)
+    if not claimed:
+        db.session.rollback()
+        return
+    if handler is None:
+        logger.error("No handler for job kind %r, dropping job %s", job.kind, job.id)
+        db.session.commit()
+        metrics.add(dropped=1)
+        return
+
+    try:
+        handler(job.key)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Job %s (%s %s) failed", job.id, job.kind, job.key)
+        metrics.add(failed=1)
+        if job.attempts + 1 >= app.config["JOBS_MAX_ATTEMPTS"]:
+            db.session.query(Job).filter(Job.id == job.id).delete(synchronize_session=False)
+            metrics.add(dropped=1)
+        else:
+            db.session.query(Job).filter(Job.id == job.id).update({Job.attempts: Job.attempts + 1})
+        db.session.commit()
+        return
+
+    metrics.record_latency((datetime.utcnow() - job.enqueued_at).total_seconds())
+    if after_commit is not None:
+        after_commit(job.key)
+
+
+def run_pending(batch_size=None):
+    """Run every job pending at call time once, oldest first; returns how many were attempted."""
+    batch_size = batch_size or app.config["JOBS_BATCH_SIZE"]
+    attempted, last_id = 0, 0
+    while True:
+        batch = (
+            db.session.query(Job.id, Job.kind, Job.key, Job.enqueued_at, Job.attempts)
+            .filter(Job.id > last_id)
+            .order_by(Job.id)
+            .limit(batch_size)
+            .all()
+        )
+        db.session.rollback()  # End the read so claims start fresh transactions
+        if not batch:
+            return attempted
+        for job in batch:
+            _run_job(job)
+        attempted += len(batch)
+        last_id = batch[-1].id
+
+
+class JobWorker:
+    """Runs pending jobs on a daemon thread, woken by commits that enqueued work."""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, flask_app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(flask_app,), name="job-worker", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Ask the worker to drain the queue and exit, waiting up to JOBS_DRAIN_TIMEOUT."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(app.config["JOBS_DRAIN_TIMEOUT"] if timeout is None else timeout)
+        if thread.is_alive():
+            logger.warning("Job worker did not drain within the timeout; pending jobs stay in the outbox")
+
+    def _run(self, flask_app):
+        poll_interval = flask_app.config["JOBS_POLL_INTERVAL"]
+        coalesce_window = flask_app.config["JOBS_COALESCE_WINDOW"]
+        while True:
+            if self._wake.wait(poll_interval) and not self._stop.is_set():
+                # Let the rest of a burst land so repeated keys coalesce into one run
+                self._stop.wait(coalesce_window)
+            self._wake.clear()
+            stopping = self._stop.is_set()
+            try:
+                with flask_app.app_context():
+                    run_pending()
+            except Exception:
+                logger.exception("Job worker pass failed")
+            if stopping:
+                return
+
+
+worker = JobWorker()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker(session):
+    if session.info.pop("jobs_enqueued", False):
+        worker.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_enqueued(session):
+    session.info.pop("jobs_enqueued", None)
+
+
+@app.before_request
+def _start_worker():
+    if app.config["JOBS_WORKER_ENABLED"]:
+        worker.start(app)
+
+
+jobs_cli = AppGroup("jobs", help="Inspect and run background jobs.")
+
+
+@jobs_cli.command("drain")
+def drain_command():
+    """Run every pending job in this process."""
+    click.echo(f"Ran {run_pending()} job(s); {queue_depth()} left pending.")
+
+
+@jobs_cli.command("status")
+def status_command():
+    """Show the queue depth."""
+    click.echo(f"{queue_depth()} job(s) pending.")
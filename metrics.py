@@ -0,0 +1,252 @@
+# metrics.py
+"""
+Per-endpoint request metrics in Prometheus text format at /metrics.
+
+Opt-in with METRICS_ENABLED=1. Each request records its latency, the SQL
+statements it sent and their total time (engine cursor events), the rows
+its selects returned and the response size. Row counts come from the DBAPI
+cursor's rowcount, which psycopg2 reports for SELECTs and sqlite3 does not,
+so on SQLite that series stays at zero. /metrics also exposes
+the counters the caches, the password hasher and the job worker already
+keep. Streamed responses (/export) are recorded when their headers go
+out, before the body and its queries run. With METRICS_PROFILE_SAMPLE_RATE > 0 a sample of requests runs under
+cProfile, and those slower than METRICS_PROFILE_SLOW_MS are dumped to
+METRICS_PROFILE_DIR for `python -m pstats` or snakeviz.
+"""
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from flask import request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from cache import CACHES
+from config import app, password_hasher
+from jobs import job_stats
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_local = threading.local()
+_profile_lock = threading.Lock()
+
+
+class _RequestRecord:
+    __slots__ = ("start", "statements", "sql_seconds", "sql_start", "rows", "profiler")
+
+    def __init__(self, start):
+        self.start = start
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.sql_start = 0.0
+        self.rows = 0
+        self.profiler = None
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.total = 0
+        self.count = 0
+
+
+class RequestMetrics:
+    """Aggregated per (endpoint, method) series; observe() is the only per-request cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.statements = {}
+        self.sql_seconds = {}
+        self.rows = {}
+        self.response_bytes = {}
+        self.responses = {}
+
+    def observe(self, endpoint, method, status, seconds, record, size):
+        key = (endpoint, method)
+        with self._lock:
+            for histograms, buckets, value in (
+                (self.latency, LATENCY_BUCKETS, seconds),
+                (self.statements, STATEMENT_BUCKETS, record.statements),
+            ):
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = _Histogram(buckets)
+                histogram.counts[bisect.bisect_left(buckets, value)] += 1
+                histogram.total += value
+                histogram.count += 1
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + record.sql_seconds
+            self.rows[key] = self.rows.get(key, 0) + record.rows
+            self.response_bytes[key] = self.response_bytes.get(key, 0) + size
+            status_key = (endpoint, method, status)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            for series in (self.latency, self.statements, self.sql_seconds, self.rows, self.response_bytes, self.responses):
+                series.clear()
+
+    def render(self):
+        with self._lock:
+            lines = []
+            _histogram_lines(lines, "flashlearn_request_duration_seconds", "Request latency.", self.latency, LATENCY_BUCKETS)
+            _histogram_lines(lines, "flashlearn_request_sql_statements", "SQL statements per request.", self.statements, STATEMENT_BUCKETS)
+            for name, help_text, series in (
+                ("flashlearn_request_sql_seconds_total", "Time spent executing SQL.", self.sql_seconds),
+                ("flashlearn_request_sql_rows_total", "Rows returned by selects.", self.rows),
+                ("flashlearn_response_bytes_total", "Response body bytes.", self.response_bytes),
+            ):
+                _header(lines, name, help_text, "counter")
+                for (endpoint, method), value in sorted(series.items()):
+                    lines.append(f'{name}{{endpoint="{endpoint}",method="{method}"}} {value}')
+            _header(lines, "flashlearn_responses_total", "Responses by status code.", "counter")
+            for (endpoint, method, status), value in sorted(self.responses.items()):
+                lines.append(f'flashlearn_responses_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+            return lines
+
+
+def _header(lines, name, help_text, kind):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram_lines(lines, name, help_text, histograms, buckets):
+    _header(lines, name, help_text, "histogram")
+    for (endpoint, method), histogram in sorted(histograms.items()):
+        labels = f'endpoint="{endpoint}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ["+Inf"], histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def _stats_lines(lines, prefix, help_text, series, counters):
+    """Render ``(labels, stats_dict)`` pairs as one metric per stats key; keys in ``counters`` become *_total."""
+    names = {}
+    for labels, stats in series:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                names.setdefault(key, []).append((labels, value))
+    for key, values in names.items():
+        name = f"{prefix}_{key}_total" if key in counters else f"{prefix}_{key}"
+        _header(lines, name, f"{help_text} ({key}).", "counter" if key in counters else "gauge")
+        for labels, value in values:
+            lines.append(f"{name}{{{labels}}} {float(value)}" if labels else f"{name} {float(value)}")
+
+
+request_metrics = RequestMetrics()
+
+
+def render_metrics():
+    lines = request_metrics.render()
+    _stats_lines(
+        lines, "flashlearn_cache", "Cache statistics",
+        [(f'cache="{name}"', cache.stats()) for name, cache in sorted(CACHES.items())],
+        {"hits", "misses", "evictions", "expirations", "errors"},
+    )
+    _stats_lines(
+        lines, "flashlearn_password_hashing", "Password hashing pool",
+        [("", password_hasher.stats())], {"submitted", "rejected", "timed_out", "completed"},
+    )
+    _stats_lines(
+        lines, "flashlearn_jobs", "Background jobs",
+        [("", job_stats())], {"enqueued", "coalesced", "processed", "failed", "dropped"},
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _before_request():
+    record = _local.record = _RequestRecord(time.perf_counter())
+    rate = app.config["METRICS_PROFILE_SAMPLE_RATE"]
+    # One profiled request at a time keeps the sampling overhead bounded
+    if rate and random.random() < rate and _profile_lock.acquire(blocking=False):
+        record.profiler = cProfile.Profile()
+        record.profiler.enable()
+
+
+def _after_request(response):
+    record = getattr(_local, "record", None)
+    if record is None:
+        return response
+    _local.record = None
+    seconds = time.perf_counter() - record.start
+    if record.profiler is not None:
+        record.profiler.disable()
+        _profile_lock.release()
+        if seconds * 1000 >= app.config["METRICS_PROFILE_SLOW_MS"]:
+            _dump_profile(record.profiler, seconds)
+    request_metrics.observe(
+        request.endpoint or "unmatched", request.method, response.status_code, seconds, record,
+        response.content_length or 0,
+    )
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped when an earlier hook raised; never leave a profiler running
+    record = getattr(_local, "record", None)
+    if record is None:
+        return
+    _local.record = None
+    if record.profiler is not None:
+        record.profiler.disable()
+        _profile_lock.release()
+
+
+def _dump_profile(profiler, seconds):
+    directory = app.config["METRICS_PROFILE_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S.%f")
+    path = os.path.join(directory, f"{stamp}-{request.method}-{request.endpoint or 'unmatched'}-{seconds * 1000:.0f}ms.prof")
+    profiler.dump_stats(path)
+    app.logger.info("Slow request %s %s (%.0f ms) profiled to %s", request.method, request.path, seconds * 1000, path)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record.sql_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record.statements += 1
+        record.sql_seconds += time.perf_counter() - record.sql_start
+        if cursor.description is not None and cursor.rowcount > 0:
+            record.rows += cursor.rowcount
+
+
+def metrics_view():
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+_installed = False
+
+
+def install(flask_app):
+    """Register the request hooks, SQL listeners and the /metrics route (once)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    flask_app.before_request(_before_request)
+    flask_app.after_request(_after_request)
+    flask_app.teardown_request(_teardown_request)
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    flask_app.add_url_rule("/metrics", "metrics", metrics_view)
+
+
+if app.config["METRICS_ENABLED"]:
+    install(app)
@@ -0,0 +1,25 @@
+"""add deck soft delete
+
+Revision ID: 2c6ce7d248a3
+Revises: c3e85a1f20d4
+Create Date: 2026-10-17 13:44:38.947886
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c6ce7d248a3'
+down_revision = 'c3e85a1f20d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ALTERs: a batch rebuild of decks breaks the flashcards_fts triggers that read it on SQLite
+    op.add_column('decks', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('decks', 'deleted_at')
@@ -0,0 +1,25 @@
+"""index default flashcards by deck
+
+Revision ID: 4a0283bdd979
+Revises: 756c6263d7de
+Create Date: 2026-10-17 14:36:06.330853
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a0283bdd979'
+down_revision = '756c6263d7de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Shared decks' cards are read by deck: /decks/defaults, /decks/summary and the copy-on-write PUT
+    op.create_index('ix_default_flashcards_default_deck_id', 'default_flashcards', ['default_deck_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_default_flashcards_default_deck_id', table_name='default_flashcards')
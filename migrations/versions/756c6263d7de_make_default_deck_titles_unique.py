@@ -0,0 +1,53 @@
+"""make default deck titles unique
+
+Revision ID: 756c6263d7de
+Revises: 84f00f577211
+Create Date: 2026-10-17 14:04:29.299515
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '756c6263d7de'
+down_revision = '84f00f577211'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent first sign-ups could each store the template decks. Fold every duplicate into the
+    # oldest deck with its title (cards are matched by text) before the index makes titles unique.
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text(
+        "SELECT d.id, k.keep_id FROM default_decks d"
+        " JOIN (SELECT title, MIN(id) AS keep_id FROM default_decks GROUP BY title HAVING COUNT(*) > 1) k"
+        " ON k.title = d.title AND d.id <> k.keep_id"
+    )).fetchall()
+    for duplicate_id, keep_id in duplicates:
+        params = {"duplicate": duplicate_id, "keep": keep_id}
+        conn.execute(sa.text(
+            "UPDATE progress SET default_deck_id = :keep, default_flashcard_id = ("
+            " SELECT MIN(k.id) FROM default_flashcards k JOIN default_flashcards c"
+            " ON c.front_text = k.front_text AND c.back_text = k.back_text"
+            " WHERE c.id = progress.default_flashcard_id AND k.default_deck_id = :keep)"
+            " WHERE default_deck_id = :duplicate"
+        ), params)
+        conn.execute(sa.text(
+            "UPDATE decks SET source_default_deck_id = :keep WHERE source_default_deck_id = :duplicate"
+        ), params)
+        conn.execute(sa.text(
+            "INSERT INTO user_default_decks (user_id, default_deck_id)"
+            " SELECT user_id, :keep FROM user_default_decks u WHERE default_deck_id = :duplicate"
+            " AND NOT EXISTS (SELECT 1 FROM user_default_decks o WHERE o.user_id = u.user_id AND o.default_deck_id = :keep)"
+        ), params)
+        conn.execute(sa.text("DELETE FROM user_default_decks WHERE default_deck_id = :duplicate"), params)
+        conn.execute(sa.text("DELETE FROM default_flashcards WHERE default_deck_id = :duplicate"), params)
+        conn.execute(sa.text("DELETE FROM default_decks WHERE id = :duplicate"), params)
+
+    op.create_index('uq_default_decks_title', 'default_decks', ['title'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_default_decks_title', table_name='default_decks')
@@ -0,0 +1,59 @@
+"""add change sequences and sync tombstones
+
+Revision ID: 84f00f577211
+Revises: 2c6ce7d248a3
+Create Date: 2026-10-17 13:53:50.594101
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '84f00f577211'
+down_revision = '2c6ce7d248a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_sequences',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_change_seq', 'sync_tombstones', ['user_id', 'change_seq'], unique=False)
+
+    # Plain ALTERs: a batch rebuild of decks or flashcards breaks the flashcards_fts triggers on SQLite.
+    # Existing rows get 0, so they reach clients through a full sync (no token).
+    for table, index, columns in (
+        ('decks', 'ix_decks_user_change_seq', ['user_id', 'change_seq']),
+        ('flashcards', 'ix_flashcards_deck_change_seq', ['deck_id', 'change_seq']),
+        ('progress', 'ix_progress_user_change_seq', ['user_id', 'change_seq']),
+    ):
+        op.add_column(table, sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+        op.create_index(index, table, columns, unique=False)
+
+
+def downgrade():
+    for table, index in (
+        ('progress', 'ix_progress_user_change_seq'),
+        ('flashcards', 'ix_flashcards_deck_change_seq'),
+        ('decks', 'ix_decks_user_change_seq'),
+    ):
+        op.drop_index(index, table_name=table)
+        op.drop_column(table, 'change_seq')
+
+    op.drop_index('ix_sync_tombstones_user_change_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_table('change_sequences')
@@ -96,3 +96,5 @@ def downgrade():
     op.drop_table('decks')
     op.drop_table('users')
     # ### end Alembic commands ###
+    # PostgreSQL keeps the enum type after its table is dropped
+    sa.Enum(name='review_status').drop(op.get_bind(), checkfirst=True)
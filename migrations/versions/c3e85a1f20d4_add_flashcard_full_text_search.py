@@ -0,0 +1,64 @@
+"""add flashcard full text search
+
+Revision ID: c3e85a1f20d4
+Revises: fffcd1fd15c7
+Create Date: 2026-10-17 14:02:31.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e85a1f20d4'
+down_revision = 'fffcd1fd15c7'
+branch_labels = None
+depends_on = None
+
+SCOPE = "'u' || (SELECT user_id FROM decks WHERE decks.id = new.deck_id) || ' d' || new.deck_id"
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE flashcards_fts USING fts5("
+            "front_text, back_text, scope, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER flashcards_fts_insert AFTER INSERT ON flashcards BEGIN "
+            f"INSERT INTO flashcards_fts (rowid, front_text, back_text, scope) VALUES (new.id, new.front_text, new.back_text, {SCOPE}); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER flashcards_fts_update AFTER UPDATE OF front_text, back_text, deck_id ON flashcards BEGIN "
+            "DELETE FROM flashcards_fts WHERE rowid = old.id; "
+            f"INSERT INTO flashcards_fts (rowid, front_text, back_text, scope) VALUES (new.id, new.front_text, new.back_text, {SCOPE}); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER flashcards_fts_delete AFTER DELETE ON flashcards BEGIN "
+            "DELETE FROM flashcards_fts WHERE rowid = old.id; "
+            "END"
+        )
+        op.execute(
+            "INSERT INTO flashcards_fts (rowid, front_text, back_text, scope) "
+            "SELECT f.id, f.front_text, f.back_text, 'u' || d.user_id || ' d' || f.deck_id "
+            "FROM flashcards f JOIN decks d ON d.id = f.deck_id"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_flashcards_search ON flashcards "
+            "USING gin (to_tsvector('simple', front_text || ' ' || back_text))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS flashcards_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS flashcards_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS flashcards_fts_insert")
+        op.execute("DROP TABLE IF EXISTS flashcards_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_flashcards_search")
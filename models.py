@@ -3,7 +3,8 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy import ForeignKey
 import re
-from config import db, bcrypt
+from datetime import datetime
+from config import db, password_hasher
 # Association table for many-to-many relationship between users and default decks
 user_default_decks = db.Table(
     'user_default_decks',
@@ -26,6 +27,9 @@ class DefaultDeck(db.Model, SerializerMixin):
 
     serialize_rules = ('-flashcards.default_deck',)
 
+    # One shared deck per template title; ensure_default_decks relies on it under concurrent sign-ups
+    __table_args__ = (db.Index('uq_default_decks_title', 'title', unique=True),)
+
 class DefaultFlashcard(db.Model, SerializerMixin):
     __tablename__ = 'default_flashcards'
 
@@ -38,6 +42,8 @@ class DefaultFlashcard(db.Model, SerializerMixin):
 
     serialize_rules = ('-default_deck.flashcards',)
 
+    __table_args__ = (db.Index('ix_default_flashcards_default_deck_id', 'default_deck_id'),)
+
 class User(db.Model):
     __tablename__ = 'users'
 
@@ -57,10 +63,14 @@ class User(db.Model):
 
     @password_hash.setter
     def password_hash(self, password):
-        self._password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self._password_hash = password_hasher.generate(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self._password_hash, password)
+        return password_hasher.check(self._password_hash, password)
+
+    def needs_rehash(self):
+        """True when the stored hash predates the configured BCRYPT_LOG_ROUNDS."""
+        return password_hasher.needs_rehash(self._password_hash)
 
     # VALIDATIONS
     @validates("email")
@@ -89,11 +99,19 @@ class Deck(db.Model, SerializerMixin):
     created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     is_default = db.Column(db.Boolean, default=False, nullable=False, server_default='0')
+    source_default_deck_id = db.Column(db.Integer, db.ForeignKey('default_decks.id', name='fk_decks_source_default_deck_id'))  # Set when copied from a shared default deck
+    deleted_at = db.Column(db.DateTime)  # Set by a soft delete; reads skip the deck until the purge job removes it
+    change_seq = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # Stamped by sync.next_change_seq on every write to the deck or its cards
     
     flashcards = db.relationship('Flashcard', backref='deck', cascade="all, delete-orphan")
 
     serialize_rules = ('-user.decks', '-flashcards.deck')
 
+    __table_args__ = (
+        db.Index('ix_decks_user_id', 'user_id'),
+        db.Index('ix_decks_user_change_seq', 'user_id', 'change_seq'),
+    )
+
 class Flashcard(db.Model, SerializerMixin):
     __tablename__ = 'flashcards'
 
@@ -103,16 +121,26 @@ class Flashcard(db.Model, SerializerMixin):
     back_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    change_seq = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # See Deck.change_seq
 
     serialize_rules = ('-deck.flashcards',)
 
+    __table_args__ = (
+        db.Index('ix_flashcards_deck_id', 'deck_id'),
+        db.Index('ix_flashcards_deck_change_seq', 'deck_id', 'change_seq'),
+    )
+
 class Progress(db.Model, SerializerMixin):
     __tablename__ = 'progress'
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False)
-    flashcard_id = db.Column(db.Integer, db.ForeignKey('flashcards.id'), nullable=False)
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'))
+    flashcard_id = db.Column(db.Integer, db.ForeignKey('flashcards.id'))
+
+    # Progress on a shared default card sets these instead of deck_id/flashcard_id
+    default_deck_id = db.Column(db.Integer, db.ForeignKey('default_decks.id', name='fk_progress_default_deck_id'))
+    default_flashcard_id = db.Column(db.Integer, db.ForeignKey('default_flashcards.id', name='fk_progress_default_flashcard_id'))
 
     # Fields with default values to ensure they are never None
     study_count = db.Column(db.Integer, default=0, nullable=False)
@@ -128,25 +156,46 @@ class Progress(db.Model, SerializerMixin):
     review_status = db.Column(db.Enum('new', 'learning', 'reviewing', 'mastered', name="review_status"), default='new', nullable=False)
     is_learned = db.Column(db.Boolean, default=False, nullable=False)
 
+    # Spaced-repetition state, advanced by scheduler.schedule_review
+    ease_factor = db.Column(db.Float, default=2.5, nullable=False, server_default='2.5')
+    interval_days = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    repetitions = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # Consecutive successful reviews
+    lapses = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # Times the card was forgotten
+    change_seq = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # See Deck.change_seq
+
     # Serialization rules
     serialize_rules = ('-user.progress', '-deck.progress')
 
-    # Unique constraint to ensure one progress entry per user-flashcard pair
-    __table_args__ = (db.UniqueConstraint('user_id', 'flashcard_id', name='unique_user_flashcard_progress'),)
-
-    def __init__(self, user_id, deck_id, flashcard_id, study_count=0, correct_attempts=0, incorrect_attempts=0, total_study_time=0.0, review_status='new', is_learned=False):
+    # Unique constraint to ensure one progress entry per user-flashcard pair, plus the hot-path indexes
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'flashcard_id', name='unique_user_flashcard_progress'),
+        db.UniqueConstraint('user_id', 'default_flashcard_id', name='unique_user_default_flashcard_progress'),
+        db.Index('ix_progress_user_deck_next_review', 'user_id', 'deck_id', 'next_review_at'),
+        db.Index('ix_progress_user_next_review', 'user_id', 'next_review_at'),
+        db.Index('ix_progress_flashcard_id', 'flashcard_id'),
+        db.Index('ix_progress_default_flashcard_id', 'default_flashcard_id'),
+        db.Index('ix_progress_user_change_seq', 'user_id', 'change_seq'),
+    )
+
+    def __init__(self, user_id, deck_id, flashcard_id, study_count=0, correct_attempts=0, incorrect_attempts=0, total_study_time=0.0, review_status='new', is_learned=False, ease_factor=2.5, interval_days=0, repetitions=0, lapses=0, default_deck_id=None, default_flashcard_id=None):
         """
         Constructor to ensure all fields are initialized with default values.
         """
         self.user_id = user_id
         self.deck_id = deck_id
         self.flashcard_id = flashcard_id
+        self.default_deck_id = default_deck_id
+        self.default_flashcard_id = default_flashcard_id
         self.study_count = study_count
         self.correct_attempts = correct_attempts
         self.incorrect_attempts = incorrect_attempts
         self.total_study_time = total_study_time
         self.review_status = review_status
         self.is_learned = is_learned
+        self.ease_factor = ease_factor
+        self.interval_days = interval_days
+        self.repetitions = repetitions
+        self.lapses = lapses
 class UserStats(db.Model, SerializerMixin):
     __tablename__ = 'user_stats'
 
@@ -165,3 +214,96 @@ class UserStats(db.Model, SerializerMixin):
     user = db.relationship("User", backref=db.backref("stats", uselist=False, cascade="all, delete-orphan"))
 
     serialize_rules = ('-user.stats',)
+
+class UserProgressRollup(db.Model, SerializerMixin):
+    __tablename__ = 'user_progress_rollups'
+
+    # Running totals over all of a user's Progress rows, maintained incrementally by rollups.apply_progress_delta
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_correct = db.Column(db.Integer, default=0, nullable=False)
+    total_attempts = db.Column(db.Integer, default=0, nullable=False)
+    total_study_time = db.Column(db.Float, default=0.0, nullable=False)
+    mastered_count = db.Column(db.Integer, default=0, nullable=False)
+
+class DeckProgressRollup(db.Model, SerializerMixin):
+    __tablename__ = 'deck_progress_rollups'
+
+    # Same totals as UserProgressRollup, restricted to one of the user's decks
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), primary_key=True)
+    total_correct = db.Column(db.Integer, default=0, nullable=False)
+    total_attempts = db.Column(db.Integer, default=0, nullable=False)
+    total_study_time = db.Column(db.Float, default=0.0, nullable=False)
+    mastered_count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (db.Index('ix_deck_progress_rollups_deck_id', 'deck_id'),)
+
+class ContentVersion(db.Model, SerializerMixin):
+    __tablename__ = 'content_versions'
+
+    # Bumped by etags.bump_content_version on every deck or flashcard write; read ETags derive from it
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+class ChangeSequence(db.Model, SerializerMixin):
+    __tablename__ = 'change_sequences'
+
+    # Per-user counter behind the change_seq columns; sync.next_change_seq bumps it once per writing transaction
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    seq = db.Column(db.Integer, default=0, nullable=False)
+
+class SyncTombstone(db.Model, SerializerMixin):
+    __tablename__ = 'sync_tombstones'
+
+    # One row per deleted deck or flashcard, read by GET /sync; a deck's row also stands for its cards and progress
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    entity = db.Column(db.String(20), nullable=False)  # 'deck' or 'flashcard'
+    entity_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (db.Index('ix_sync_tombstones_user_change_seq', 'user_id', 'change_seq'),)
+
+class Job(db.Model, SerializerMixin):
+    __tablename__ = 'job_outbox'
+
+    # Pending background work, written in the same transaction as the change that needs it (see jobs.py).
+    # One row per (kind, key): enqueuing work that is already pending coalesces into the existing row.
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    key = db.Column(db.String(100), nullable=False)
+    enqueued_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+
+    __table_args__ = (db.UniqueConstraint('kind', 'key', name='unique_job_kind_key'),)
+
+class ReviewEvent(db.Model, SerializerMixin):
+    __tablename__ = 'review_events'
+
+    # Append-only log of every answer, written by the progress routes through rollups.record_reviews.
+    # Card and deck ids are plain integers so history outlives deleted cards; raw rows older than
+    # REVIEW_EVENT_RETENTION_DAYS are removed by `flask rollups compact-events`, DailyStudyStats is kept.
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    flashcard_id = db.Column(db.Integer)
+    deck_id = db.Column(db.Integer)
+    default_flashcard_id = db.Column(db.Integer)
+    studied_at = db.Column(db.DateTime, nullable=False)
+    was_correct = db.Column(db.Boolean, nullable=False)
+    time_spent = db.Column(db.Float, default=0.0, nullable=False)  # Minutes, like Progress.total_study_time
+
+    __table_args__ = (
+        db.Index('ix_review_events_user_studied_at', 'user_id', 'studied_at'),
+        db.Index('ix_review_events_studied_at', 'studied_at'),
+    )
+
+class DailyStudyStats(db.Model, SerializerMixin):
+    __tablename__ = 'daily_study_stats'
+
+    # Per-user totals for each UTC day, maintained together with review_events; streaks and
+    # per-day averages read these O(days) rows instead of the raw events
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    reviews = db.Column(db.Integer, default=0, nullable=False)
+    correct = db.Column(db.Integer, default=0, nullable=False)
+    study_time = db.Column(db.Float, default=0.0, nullable=False)
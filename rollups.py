@@ -0,0 +1,246 @@
+# rollups.py
+import click
+from flask.cli import AppGroup
+from config import app, db
+from models import Deck, Progress, UserStats, UserProgressRollup, DeckProgressRollup
+from jobs import enqueue, job_handler
+from study_log import study_summary, compact_review_events
+
+ROLLUP_COLUMNS = ("total_correct", "total_attempts", "total_study_time", "mastered_count")
+
+
+def _bump(model, keys, deltas):
+    """Add ``deltas`` to the rollup row identified by ``keys``, creating it if missing."""
+    key_filter = [getattr(model, name) == value for name, value in keys.items()]
+    updated = (
+        db.session.query(model)
+        .filter(*key_filter)
+        .update({getattr(model, name): getattr(model, name) + value for name, value in deltas.items()})
+    )
+    if not updated:
+        db.session.add(model(**keys, **deltas))
+        db.session.flush()
+
+
+def apply_progress_delta(user_id, deck_id, correct=0, attempts=0, study_time=0.0, mastered=0):
+    """
+    Apply one review's change to the user and deck rollups.
+
+    Runs in the caller's transaction, so the rollups commit together with the Progress write.
+    """
+    deltas = {
+        "total_correct": correct,
+        "total_attempts": attempts,
+        "total_study_time": study_time,
+        "mastered_count": mastered,
+    }
+    _bump(UserProgressRollup, {"user_id": user_id}, deltas)
+    if deck_id is not None:  # Progress on shared default cards has no deck of its own
+        _bump(DeckProgressRollup, {"user_id": user_id, "deck_id": deck_id}, deltas)
+
+
+def apply_progress_deltas(user_id, deck_deltas):
+    """
+    Apply a batch's changes, given as {deck_id: apply_progress_delta kwargs}, with one user rollup update.
+
+    deck_id None holds the shared default cards' share, which only reaches the user rollup.
+    """
+    totals = {"total_correct": 0, "total_attempts": 0, "total_study_time": 0.0, "mastered_count": 0}
+    for deck_id, delta in deck_deltas.items():
+        deltas = {
+            "total_correct": delta.get("correct", 0),
+            "total_attempts": delta.get("attempts", 0),
+            "total_study_time": delta.get("study_time", 0.0),
+            "mastered_count": delta.get("mastered", 0),
+        }
+        for name, value in deltas.items():
+            totals[name] += value
+        if deck_id is not None:
+            _bump(DeckProgressRollup, {"user_id": user_id, "deck_id": deck_id}, deltas)
+    if deck_deltas:
+        _bump(UserProgressRollup, {"user_id": user_id}, totals)
+
+
+def drop_deck_rollups(deck_id):
+    """
+    Take a deck's totals out of the user rollups and delete its deck rollup rows (does not commit).
+
+    Besides the owner's, a deck can only have rollup rows from answers recorded
+    before POST /progress checked card ownership. Returns the users whose rollups changed.
+    """
+    deck_rollups = (
+        db.session.query(DeckProgressRollup.user_id, *(getattr(DeckProgressRollup, name) for name in ROLLUP_COLUMNS))
+        .filter(DeckProgressRollup.deck_id == deck_id)
+        .all()
+    )
+    for user_id, *totals in deck_rollups:
+        _bump(UserProgressRollup, {"user_id": user_id}, {name: -value for name, value in zip(ROLLUP_COLUMNS, totals)})
+    if deck_rollups:
+        db.session.query(DeckProgressRollup).filter(DeckProgressRollup.deck_id == deck_id).delete(synchronize_session=False)
+    return {user_id for user_id, *_ in deck_rollups}
+
+
+def remove_progress(condition):
+    """
+    Delete the progress rows matching ``condition`` and take them out of their
+    users' user and deck rollups (does not commit). Returns the ids of those users.
+    """
+    rows = (
+        db.session.query(Progress.user_id, Progress.deck_id, db.func.max(Deck.deleted_at), *_progress_sums())
+        .outerjoin(Deck, Deck.id == Progress.deck_id)
+        .filter(condition)
+        .group_by(Progress.user_id, Progress.deck_id)
+        .all()
+    )
+    for user_id, deck_id, deck_deleted_at, *totals in rows:
+        if deck_deleted_at is not None:
+            continue  # Already out of the rollups since the soft delete
+        deltas = {name: -(value or 0) for name, value in zip(ROLLUP_COLUMNS, totals)}
+        _bump(UserProgressRollup, {"user_id": user_id}, deltas)
+        if deck_id is not None:
+            _bump(DeckProgressRollup, {"user_id": user_id, "deck_id": deck_id}, deltas)
+    if rows:
+        db.session.query(Progress).filter(condition).delete(synchronize_session=False)
+    return {user_id for user_id, *_ in rows}
+
+
+def refresh_user_stats(user_id):
+    """Recompute the derived UserStats fields from the user's rollup and daily study totals (does not commit)."""
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+    if not stats:
+        stats = UserStats(user_id=user_id)
+        db.session.add(stats)
+
+    rollup = db.session.get(UserProgressRollup, user_id)
+    total_correct = rollup.total_correct if rollup else 0
+    total_attempts = (rollup.total_attempts if rollup else 0) or 1
+    total_study_time = rollup.total_study_time if rollup else 0
+
+    stats.mastery_level = round((total_correct / total_attempts) * 100, 2)
+    stats.cards_mastered = rollup.mastered_count if rollup else 0
+    stats.retention_rate = stats.mastery_level
+
+    target_time_per_flashcard = 1
+    average_time_per_flashcard = total_study_time / total_attempts
+    stats.focus_score = round((average_time_per_flashcard / target_time_per_flashcard) * 100, 2)
+
+    summary = study_summary(user_id)
+    stats.study_streak = summary["study_streak"]
+    stats.minutes_per_day = summary["minutes_per_day"]
+    return stats
+
+
+@job_handler("recompute_stats")
+def recompute_stats_job(key):
+    refresh_user_stats(int(key))
+
+
+def enqueue_stats_refresh(user_id):
+    """Recompute UserStats in the background once the caller's transaction commits."""
+    enqueue("recompute_stats", user_id)
+
+
+def _progress_sums():
+    # In ROLLUP_COLUMNS order
+    return (
+        db.func.sum(Progress.correct_attempts),
+        db.func.sum(Progress.study_count),
+        db.func.sum(Progress.total_study_time),
+        db.func.sum(db.case((Progress.review_status == "mastered", 1), else_=0)),
+    )
+
+
+def _progress_totals(*group_by):
+    # A soft-deleted deck left the rollups when it was hidden; its rows only wait for the purge job
+    return (
+        db.session.query(*group_by, *_progress_sums())
+        .outerjoin(Deck, Deck.id == Progress.deck_id)
+        .filter(Deck.deleted_at.is_(None))
+        .group_by(*group_by)
+    )
+
+
+def seed_deck_rollup(user_id, deck_id):
+    """Create a deck rollup row from the deck's existing progress rows (does not commit)."""
+    totals = _progress_totals(Progress.user_id, Progress.deck_id).filter(
+        Progress.user_id == user_id, Progress.deck_id == deck_id
+    )
+    # INSERT ... SELECT: no round trip for the totals, and no row when the deck has no progress
+    db.session.execute(db.insert(DeckProgressRollup).from_select(("user_id", "deck_id") + ROLLUP_COLUMNS, totals.statement))
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute rollups from the progress table, for one user or everyone."""
+    for model, group_by in (
+        (UserProgressRollup, (Progress.user_id,)),
+        (DeckProgressRollup, (Progress.user_id, Progress.deck_id)),
+    ):
+        stale = db.session.query(model)
+        totals = _progress_totals(*group_by).filter(*(column.isnot(None) for column in group_by))
+        if user_id is not None:
+            stale = stale.filter(model.user_id == user_id)
+            totals = totals.filter(Progress.user_id == user_id)
+        stale.delete(synchronize_session=False)
+
+        key_names = [column.key for column in group_by]
+        rows = [dict(zip(key_names + list(ROLLUP_COLUMNS), row)) for row in totals]
+        if rows:
+            db.session.execute(db.insert(model), rows)
+    db.session.commit()
+
+
+def check_rollups():
+    """Compare stored rollups with fresh aggregates and return a list of mismatch descriptions."""
+    mismatches = []
+    for model, group_by in (
+        (UserProgressRollup, (Progress.user_id,)),
+        (DeckProgressRollup, (Progress.user_id, Progress.deck_id)),
+    ):
+        key_names = [column.key for column in group_by]
+        expected = {
+            tuple(row[:len(key_names)]): tuple(row[len(key_names):])
+            for row in _progress_totals(*group_by).filter(*(column.isnot(None) for column in group_by))
+        }
+        stored = {
+            tuple(getattr(rollup, name) for name in key_names): tuple(getattr(rollup, name) for name in ROLLUP_COLUMNS)
+            for rollup in db.session.query(model)
+        }
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key, (0, 0, 0.0, 0))
+            have = stored.get(key, (0, 0, 0.0, 0))
+            same = all(
+                abs((a or 0) - (b or 0)) < 1e-6 for a, b in zip(want, have)
+            )
+            if not same:
+                mismatches.append(f"{model.__tablename__} {dict(zip(key_names, key))}: stored={have} expected={want}")
+    return mismatches
+
+
+rollups_cli = AppGroup("rollups", help="Maintain the progress rollup tables.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's rollups.")
+def rebuild_command(user_id):
+    """Recompute rollups from the progress table."""
+    rebuild_rollups(user_id)
+    click.echo("Rollups rebuilt.")
+
+
+@rollups_cli.command("check")
+def check_command():
+    """Report rollup rows that disagree with the progress table."""
+    mismatches = check_rollups()
+    for line in mismatches:
+        click.echo(line)
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} rollup mismatch(es) found")
+    click.echo("Rollups are consistent.")
+
+
+@rollups_cli.command("compact-events")
+@click.option("--days", type=int, default=None, help="Keep this many days of raw events (default REVIEW_EVENT_RETENTION_DAYS).")
+def compact_events_command(days):
+    """Delete raw review events past the retention window; daily totals are kept."""
+    days = app.config["REVIEW_EVENT_RETENTION_DAYS"] if days is None else days
+    click.echo(f"Deleted {compact_review_events(days)} review event(s) older than {days} days.")
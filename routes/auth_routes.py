@@ -3,6 +3,8 @@ from flask_restful import Resource
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from config import db
 from models import User
+from helpers import create_default_decks_for_user
+from hashing import HashingBusy
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -15,6 +17,8 @@ def is_valid_email(email):
 def is_valid_username(username):
     return 3 <= len(username) <= 50
 class Signup(Resource):
+    query_budget = {"post": 4}
+
     def post(self):
         data = request.get_json()
         username, email, password = data.get("username"), data.get("email"), data.get("password")
@@ -30,13 +34,21 @@ class Signup(Resource):
             user = User(username=username, email=email)
             user.password_hash = password  # Hash password
             db.session.add(user)
+            db.session.flush()
+            # Linked in the same transaction, so a failure leaves no half-created account
+            create_default_decks_for_user(user.id)
             db.session.commit()
             return {"message": "User registered successfully"}, 201
         except IntegrityError:
             db.session.rollback()
             return {"error": "Username or email already exists"}, 409
+        except HashingBusy:
+            db.session.rollback()
+            return {"error": "Too many sign-ups in progress, please retry"}, 503, {"Retry-After": "1"}
 
 class Login(Resource):
+    query_budget = {"post": 1}
+
     def post(self):
         data = request.get_json()
         email, password = data.get("email"), data.get("password")
@@ -45,12 +57,27 @@ class Login(Resource):
             return {"error": "Email and password are required"}, 400
 
         user = User.query.filter_by(email=email.lower()).first()
-        if user and user.check_password(password):
+        try:
+            authenticated = user is not None and user.check_password(password)
+        except HashingBusy:
+            return {"error": "Too many logins in progress, please retry"}, 503, {"Retry-After": "1"}
+
+        if authenticated:
+            if user.needs_rehash():
+                # Upgrade the stored hash to the configured cost while we have the plaintext;
+                # if the pool is saturated, leave it for the next login
+                try:
+                    user.password_hash = password
+                    db.session.commit()
+                except HashingBusy:
+                    db.session.rollback()
             token = create_access_token(identity={"id": user.id, "username": user.username})
             return {"message": "Login successful", "token": token}, 200
 
         return {"error": "Invalid email or password"}, 401
 class ProtectedUser(Resource):
+    query_budget = {"get": 1}
+
     @jwt_required()
     def get(self):
         """Fetch the current authenticated user's data."""
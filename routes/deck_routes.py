@@ -1,49 +1,70 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from config import db
-from models import Deck, User
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from datetime import datetime
+from config import app, db
+from models import Deck, DefaultDeck, DefaultFlashcard, Flashcard, Progress, user_default_decks
+from helpers import parse_list_args, keyset_page
+from etags import etag_cached, bump_content_version
+from deletion import delete_deck, soft_delete_deck
+from sync import next_change_seq, record_tombstone, stamp_decks
+from importers import ImportFormatError, detect_format, iter_cards
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_ROWS = 100000
+MAX_REPORTED_ERRORS = 100
+
+DECK_FIELDS = ("id", "title", "description", "subject", "category", "difficulty", "created_at", "updated_at")
+SUMMARY_FIELDS = ("id", "title", "total_cards", "studied", "mastered", "due", "accuracy", "shared")
+
+
+def _summary_columns(card_id, now):
+    """Per-deck aggregates over the deck's cards (``card_id``) outer-joined to the user's Progress."""
+    attempts = db.func.sum(Progress.correct_attempts + Progress.incorrect_attempts)
+    return (
+        db.func.count(card_id).label("total_cards"),
+        db.func.count(Progress.id).label("studied"),
+        db.func.count(db.case((Progress.review_status == "mastered", 1))).label("mastered"),
+        db.func.count(db.case((Progress.next_review_at <= now, 1))).label("due"),
+        db.cast(
+            db.case((attempts > 0, db.func.round(100.0 * db.func.sum(Progress.correct_attempts) / attempts, 2))),
+            db.Float,
+        ).label("accuracy"),
+    )
 
 class DecksResource(Resource):
+    query_budget = {"get": 3, "post": 6}
+
     @jwt_required()
+    @etag_cached
     def get(self):
-        """Get all decks for the authenticated user."""
+        """Get the authenticated user's decks, optionally paginated with ?limit=&after=&fields=."""
         user_data = get_jwt_identity()
         user_id = user_data.get("id")
-        decks = Deck.query.filter_by(user_id=user_id).all()
 
-        if not decks:
+        try:
+            fields, paginate, limit, after = parse_list_args(request.args, DECK_FIELDS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        query = db.session.query(*(getattr(Deck, name) for name in fields)).filter(Deck.user_id == user_id, Deck.deleted_at.is_(None))
+        result = keyset_page(query, Deck.id, fields, paginate, limit, after)
+
+        if not paginate and not result:
             return {"message": "You have no decks yet."}, 200
 
-        return [
-            {
-                "id": deck.id,
-                "title": deck.title,
-                "description": deck.description,
-                "subject": deck.subject,
-                "category": deck.category,
-                "difficulty": deck.difficulty,
-                "created_at": deck.created_at.isoformat(),
-                "updated_at": deck.updated_at.isoformat(),
-            }
-            for deck in decks
-        ], 200
+        return result, 200
 
     @jwt_required()
     def post(self):
         """Create a new deck for the authenticated user."""
         data = request.get_json()
-        user_data = get_jwt_identity()
-        user_id = user_data.get("id")
+        user_id = current_user.id  # jwt_required() already confirmed the user exists
 
         required_fields = ["title", "description", "subject", "category", "difficulty"]
         if not all(field in data and data[field] for field in required_fields):
             return {"error": "All fields are required"}, 400
 
-        user = User.query.get(user_id)
-        if not user:
-            return {"error": "User not found"}, 404
-
         new_deck = Deck(
             title=data["title"],
             description=data["description"],
@@ -51,9 +72,11 @@ class DecksResource(Resource):
             category=data["category"],
             difficulty=data["difficulty"],
             user_id=user_id,
+            change_seq=next_change_seq(user_id),
         )
 
         db.session.add(new_deck)
+        bump_content_version(user_id)
         db.session.commit()
 
         return {
@@ -68,14 +91,74 @@ class DecksResource(Resource):
             "updated_at": new_deck.updated_at.isoformat()
         }, 201
 
+class DeckSummaryResource(Resource):
+    query_budget = {"get": 3}
+
+    @jwt_required()
+    def get(self):
+        """
+        Card, studied, mastered and due counts plus accuracy per deck, optionally paginated with ?limit=&after=.
+
+        "due" counts studied cards whose next review has come; cards never
+        studied (total_cards - studied) are the "new" cards /study/next
+        serves on request. The user's own decks come first in id order, then
+        the shared default decks linked to them (``"shared": true``, ids from
+        /decks/defaults); pages are cut on own deck ids and the shared decks
+        are added to the last one.
+        """
+        user_id = get_jwt_identity().get("id")
+
+        try:
+            _, paginate, limit, after = parse_list_args(request.args, SUMMARY_FIELDS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # One grouped statement: decks by ix_decks_user_id in id order, cards by ix_flashcards_deck_id,
+        # progress by the (user_id, flashcard_id) unique index. Not ETag-cached, "due" moves with the clock.
+        now = datetime.utcnow()
+        query = (
+            db.session.query(Deck.id, Deck.title, *_summary_columns(Flashcard.id, now), db.literal(False, db.Boolean))
+            .outerjoin(Flashcard, Flashcard.deck_id == Deck.id)
+            .outerjoin(Progress, db.and_(Progress.user_id == user_id, Progress.flashcard_id == Flashcard.id))
+            .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None))
+            .group_by(Deck.id)
+        )
+        result = keyset_page(query, Deck.id, SUMMARY_FIELDS, paginate, limit, after)
+
+        if not paginate or result["next_cursor"] is None:
+            # Shared decks in a second grouped statement, progress by the (user_id, default_flashcard_id) index
+            shared = keyset_page(
+                db.session.query(
+                    DefaultDeck.id, DefaultDeck.title, *_summary_columns(DefaultFlashcard.id, now), db.literal(True, db.Boolean)
+                )
+                .select_from(user_default_decks)
+                .join(DefaultDeck, DefaultDeck.id == user_default_decks.c.default_deck_id)
+                .outerjoin(DefaultFlashcard, DefaultFlashcard.default_deck_id == DefaultDeck.id)
+                .outerjoin(Progress, db.and_(
+                    Progress.user_id == user_id, Progress.default_flashcard_id == DefaultFlashcard.id
+                ))
+                .filter(user_default_decks.c.user_id == user_id)
+                .group_by(user_default_decks.c.default_deck_id),
+                DefaultDeck.id, SUMMARY_FIELDS, False, None, None,
+            )
+            (result["items"] if paginate else result).extend(shared)
+
+        if not paginate and not result:
+            return {"message": "You have no decks yet."}, 200
+
+        return result, 200
+
 class DeckResource(Resource):
+    query_budget = {"get": 3, "put": 6, "delete": 13}
+
     @jwt_required()
+    @etag_cached
     def get(self, deck_id):
         """Retrieve a single deck by ID for the authenticated user."""
         user_data = get_jwt_identity()
         user_id = user_data.get("id")
 
-        deck = Deck.query.filter_by(id=deck_id, user_id=user_id).first()
+        deck = Deck.query.filter_by(id=deck_id, user_id=user_id, deleted_at=None).first()
         if not deck:
             return {"error": "Deck not found"}, 404
 
@@ -97,15 +180,17 @@ class DeckResource(Resource):
         user_id = user_data.get("id")
         data = request.get_json()
 
-        deck = Deck.query.filter_by(id=deck_id, user_id=user_id).first()
+        deck = Deck.query.filter_by(id=deck_id, user_id=user_id, deleted_at=None).first()
         if not deck:
             return {"error": "Deck not found"}, 404
 
         # Update deck fields if provided
+        deck.change_seq = next_change_seq(user_id)
         for field in ["title", "description", "subject", "category", "difficulty"]:
             if field in data:
                 setattr(deck, field, data[field])
 
+        bump_content_version(user_id)
         db.session.commit()
 
         return {
@@ -124,11 +209,81 @@ class DeckResource(Resource):
         user_data = get_jwt_identity()
         user_id = user_data.get("id")
 
-        deck = Deck.query.filter_by(id=deck_id, user_id=user_id).first()
+        deck = Deck.query.filter_by(id=deck_id, user_id=user_id, deleted_at=None).first()
         if not deck:
             return {"error": "Deck not found"}, 404
 
-        db.session.delete(deck)
+        if app.config["DECK_SOFT_DELETE"]:
+            soft_delete_deck(deck)
+        else:
+            delete_deck(deck)
+        record_tombstone(user_id, "deck", deck.id)
+        bump_content_version(user_id)
         db.session.commit()
 
-        return {"message": "Deck deleted successfully"}, 200
\ No newline at end of file
+        return {"message": "Deck deleted successfully"}, 200
+
+class DeckImportResource(Resource):
+    query_budget = {"post": 7}
+
+    @jwt_required()
+    def post(self, deck_id):
+        """Bulk-import flashcards into a deck from a CSV, TSV or JSON upload."""
+        user_id = get_jwt_identity().get("id")
+
+        deck = Deck.query.filter_by(id=deck_id, user_id=user_id, deleted_at=None).first()
+        if not deck:
+            return {"error": "Deck not found"}, 404
+
+        upload = request.files.get("file")
+        stream = upload.stream if upload else request.stream
+        try:
+            import_format = detect_format(
+                request.args.get("format"),
+                upload.content_type if upload else request.content_type,
+                upload.filename if upload else None,
+            )
+        except ImportFormatError as e:
+            return {"error": str(e)}, 400
+
+        seq = next_change_seq(user_id)
+        imported, failed, rows_seen = 0, 0, 0
+        errors = []
+        chunk = []
+        try:
+            for row_number, card, error in iter_cards(stream, import_format):
+                rows_seen += 1
+                if rows_seen > MAX_IMPORT_ROWS:
+                    db.session.rollback()
+                    return {"error": f"Imports are limited to {MAX_IMPORT_ROWS} rows"}, 413
+                if error:
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"row": row_number, "error": error})
+                    continue
+
+                chunk.append({"deck_id": deck.id, "front_text": card[0], "back_text": card[1], "change_seq": seq})
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    db.session.execute(db.insert(Flashcard), chunk)
+                    imported += len(chunk)
+                    chunk = []
+
+            if chunk:
+                db.session.execute(db.insert(Flashcard), chunk)
+                imported += len(chunk)
+        except ImportFormatError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 400
+
+        if imported:
+            stamp_decks(user_id, deck.id)
+            bump_content_version(user_id)
+        db.session.commit()
+
+        return {
+            "deck_id": deck.id,
+            "format": import_format,
+            "imported": imported,
+            "failed": failed,
+            "errors": errors,
+        }, 201
@@ -0,0 +1,110 @@
+from flask import request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import db
+from models import DefaultDeck, DefaultFlashcard, Flashcard, user_default_decks
+from helpers import copy_default_deck_for_user, user_has_default_deck
+from etags import bump_content_version
+
+class DefaultDecksResource(Resource):
+    query_budget = {"get": 2}
+
+    @jwt_required()
+    def get(self):
+        """List the shared default decks linked to the authenticated user."""
+        user_id = get_jwt_identity().get("id")
+
+        rows = (
+            db.session.query(DefaultDeck, db.func.count(DefaultFlashcard.id))
+            .join(user_default_decks, user_default_decks.c.default_deck_id == DefaultDeck.id)
+            .outerjoin(DefaultFlashcard, DefaultFlashcard.default_deck_id == DefaultDeck.id)
+            .filter(user_default_decks.c.user_id == user_id)
+            .group_by(DefaultDeck.id)
+            .order_by(DefaultDeck.id)
+            .all()
+        )
+
+        return [
+            {
+                "id": deck.id,
+                "title": deck.title,
+                "description": deck.description,
+                "subject": deck.subject,
+                "category": deck.category,
+                "difficulty": deck.difficulty,
+                "card_count": card_count,
+                "is_default": True,
+            }
+            for deck, card_count in rows
+        ], 200
+
+class DefaultDeckResource(Resource):
+    query_budget = {"get": 4}
+
+    @jwt_required()
+    def get(self, default_deck_id):
+        """Retrieve a shared default deck and its cards."""
+        user_id = get_jwt_identity().get("id")
+
+        if not user_has_default_deck(user_id, default_deck_id):
+            return {"error": "Deck not found"}, 404
+        deck = db.session.get(DefaultDeck, default_deck_id)
+
+        return {
+            "id": deck.id,
+            "title": deck.title,
+            "description": deck.description,
+            "subject": deck.subject,
+            "category": deck.category,
+            "difficulty": deck.difficulty,
+            "is_default": True,
+            "flashcards": [
+                {"id": card.id, "front_text": card.front_text, "back_text": card.back_text}
+                for card in sorted(deck.flashcards, key=lambda card: card.id)
+            ],
+        }, 200
+
+class DefaultFlashcardResource(Resource):
+    query_budget = {"put": 12}
+
+    @jwt_required()
+    def put(self, default_deck_id, default_flashcard_id):
+        """Edit a shared card by first copying its deck into the user's own decks."""
+        user_id = get_jwt_identity().get("id")
+        data = request.get_json()
+
+        # Ownership, the deck (left in the identity map for the copy) and the card in one query
+        row = (
+            db.session.query(DefaultDeck, DefaultFlashcard)
+            .join(user_default_decks, user_default_decks.c.default_deck_id == DefaultDeck.id)
+            .outerjoin(DefaultFlashcard, db.and_(
+                DefaultFlashcard.default_deck_id == DefaultDeck.id, DefaultFlashcard.id == default_flashcard_id
+            ))
+            .filter(user_default_decks.c.user_id == user_id, DefaultDeck.id == default_deck_id)
+            .first()
+        )
+        if row is None:
+            return {"error": "Deck not found"}, 404
+        default_card = row[1]
+        if default_card is None:
+            return {"error": "Flashcard not found"}, 404
+
+        # The edit goes into the copy's INSERT rather than a read and UPDATE afterwards
+        edit = {
+            "front_text": data.get("front_text", default_card.front_text),
+            "back_text": data.get("back_text", default_card.back_text),
+        }
+        deck, card_map = copy_default_deck_for_user(user_id, default_deck_id, {default_card.id: edit})
+        flashcard_id, deck_id = card_map[default_card.id], deck.id
+        updated_at = db.session.query(Flashcard.updated_at).filter(Flashcard.id == flashcard_id).scalar()
+        bump_content_version(user_id)
+        db.session.commit()
+
+        return {
+            "id": flashcard_id,
+            "deck_id": deck_id,
+            "front_text": edit["front_text"],
+            "back_text": edit["back_text"],
+            "source_default_deck_id": default_deck_id,
+            "updated_at": updated_at.isoformat()
+        }, 200
@@ -0,0 +1,82 @@
+import json
+from flask import request, Response, stream_with_context
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import db
+from models import Deck, Flashcard, Progress
+from helpers import serialize_row
+
+EXPORT_BATCH_SIZE = 1000
+
+DECK_EXPORT_FIELDS = ("id", "title", "description", "subject", "category", "difficulty", "is_default", "created_at", "updated_at")
+FLASHCARD_EXPORT_FIELDS = ("id", "deck_id", "front_text", "back_text", "created_at", "updated_at")
+PROGRESS_EXPORT_FIELDS = (
+    "id", "deck_id", "flashcard_id", "default_deck_id", "default_flashcard_id", "study_count", "correct_attempts", "incorrect_attempts",
+    "total_study_time", "last_studied_at", "next_review_at", "review_status", "is_learned",
+    "ease_factor", "interval_days", "repetitions", "lapses",
+)
+
+
+def _export_sections(user_id):
+    """Yield (section, record_type, fields, rows) per exported table; rows are fetched in batches."""
+    sections = (
+        ("decks", "deck", DECK_EXPORT_FIELDS, db.select(*(getattr(Deck, f) for f in DECK_EXPORT_FIELDS))
+            .where(Deck.user_id == user_id, Deck.deleted_at.is_(None)).order_by(Deck.id)),
+        ("flashcards", "flashcard", FLASHCARD_EXPORT_FIELDS, db.select(*(getattr(Flashcard, f) for f in FLASHCARD_EXPORT_FIELDS))
+            .join(Deck).where(Deck.user_id == user_id, Deck.deleted_at.is_(None)).order_by(Flashcard.id)),
+        ("progress", "progress", PROGRESS_EXPORT_FIELDS, db.select(*(getattr(Progress, f) for f in PROGRESS_EXPORT_FIELDS))
+            .outerjoin(Deck, Deck.id == Progress.deck_id)
+            .where(Progress.user_id == user_id, Deck.deleted_at.is_(None)).order_by(Progress.id)),
+    )
+    for section, record_type, fields, statement in sections:
+        # yield_per streams rows through a server-side cursor instead of buffering the whole result
+        rows = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield section, record_type, fields, rows
+
+
+def _encode(record):
+    return json.dumps(record, separators=(",", ":"))
+
+
+def _ndjson_lines(user_id):
+    for section, record_type, fields, rows in _export_sections(user_id):
+        # One chunk per fetched batch keeps the number of writes low
+        for batch in rows.partitions():
+            yield "".join(
+                _encode(dict(serialize_row(fields, row), type=record_type)) + "\n" for row in batch
+            )
+
+
+def _json_chunks(user_id):
+    yield "{"
+    for index, (section, record_type, fields, rows) in enumerate(_export_sections(user_id)):
+        yield ("," if index else "") + json.dumps(section) + ":["
+        separator = ""
+        for batch in rows.partitions():
+            yield separator + ",".join(_encode(serialize_row(fields, row)) for row in batch)
+            separator = ","
+        yield "]"
+    yield "}"
+
+
+class ExportResource(Resource):
+    query_budget = {"get": 4}
+
+    @jwt_required()
+    def get(self):
+        """Stream the user's decks, flashcards and progress as NDJSON or JSON."""
+        user_id = get_jwt_identity().get("id")
+        export_format = request.args.get("format", "ndjson")
+
+        if export_format == "ndjson":
+            body, mimetype = _ndjson_lines(user_id), "application/x-ndjson"
+        elif export_format == "json":
+            body, mimetype = _json_chunks(user_id), "application/json"
+        else:
+            return {"error": "format must be 'ndjson' or 'json'"}, 400
+
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=flashlearn-export.{export_format}"},
+        )
@@ -3,28 +3,41 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from config import db
 from models import Flashcard, Deck
+from helpers import parse_deck_id, parse_list_args, keyset_page
+from etags import etag_cached, bump_content_version
+from sync import next_change_seq, record_tombstone, stamp_decks
+from search import search_flashcards, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+
+FLASHCARD_FIELDS = ("id", "deck_id", "front_text", "back_text", "created_at", "updated_at")
 
 class FlashcardResource(Resource):
+    query_budget = {"get": 3, "post": 7}
+
     @jwt_required()
+    @etag_cached
     def get(self):
-        """Retrieve all flashcards for the authenticated user."""
+        """Retrieve the user's flashcards, optionally paginated with ?limit=&after=&deck_id=&fields=."""
         user_id = get_jwt_identity().get("id")
-        flashcards = Flashcard.query.join(Deck).filter(Deck.user_id == user_id).all()
 
-        if not flashcards:
+        try:
+            fields, paginate, limit, after = parse_list_args(request.args, FLASHCARD_FIELDS)
+            deck_id = parse_deck_id(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        query = (
+            db.session.query(*(getattr(Flashcard, name) for name in fields))
+            .join(Deck)
+            .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None))
+        )
+        if deck_id is not None:
+            query = query.filter(Deck.id == deck_id)
+        result = keyset_page(query, Flashcard.id, fields, paginate, limit, after)
+
+        if not paginate and not result:
             return {"message": "No flashcards found."}, 200
 
-        return [
-            {
-                "id": flashcard.id,
-                "deck_id": flashcard.deck_id,
-                "front_text": flashcard.front_text,
-                "back_text": flashcard.back_text,
-                "created_at": flashcard.created_at.isoformat(),
-                "updated_at": flashcard.updated_at.isoformat()
-            }
-            for flashcard in flashcards
-        ], 200
+        return result, 200
 
     @jwt_required()
     def post(self):
@@ -36,17 +49,20 @@ class FlashcardResource(Resource):
         if not all(field in data and data[field] for field in required_fields):
             return {"error": "All fields are required"}, 400
 
-        deck = Deck.query.filter_by(id=data["deck_id"], user_id=user_id).first()
+        deck = Deck.query.filter_by(id=data["deck_id"], user_id=user_id, deleted_at=None).first()
         if not deck:
             return {"error": "Deck not found or does not belong to the user"}, 404
 
         new_flashcard = Flashcard(
             deck_id=data["deck_id"],
             front_text=data["front_text"],
-            back_text=data["back_text"]
+            back_text=data["back_text"],
+            change_seq=next_change_seq(user_id),
         )
+        deck.change_seq = new_flashcard.change_seq
 
         db.session.add(new_flashcard)
+        bump_content_version(user_id)
         db.session.commit()
 
         return {
@@ -58,20 +74,53 @@ class FlashcardResource(Resource):
             "updated_at": new_flashcard.updated_at.isoformat()
         }, 201
 
+class FlashcardSearchResource(Resource):
+    query_budget = {"get": 2}
+
+    @jwt_required()
+    def get(self):
+        """Search the user's flashcards with ?q=&deck_id=&limit=&offset=; a trailing * makes a word a prefix."""
+        user_id = get_jwt_identity().get("id")
+
+        try:
+            limit = int(request.args.get("limit", SEARCH_DEFAULT_LIMIT))
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return {"error": "limit and offset must be integers"}, 400
+        try:
+            deck_id = parse_deck_id(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if not 1 <= limit <= SEARCH_MAX_LIMIT or offset < 0:
+            return {"error": f"limit must be between 1 and {SEARCH_MAX_LIMIT} and offset non-negative"}, 400
+
+        try:
+            result = search_flashcards(
+                user_id, request.args.get("q", ""), deck_id, limit, offset
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return result, 200
+
 class FlashcardDetailResource(Resource):
+    query_budget = {"put": 7, "delete": 6}
+
     @jwt_required()
     def put(self, id):
         """Update a flashcard by ID."""
         user_id = get_jwt_identity().get("id")
         data = request.get_json()
 
-        flashcard = Flashcard.query.join(Deck).filter(Flashcard.id == id, Deck.user_id == user_id).first()
+        flashcard = Flashcard.query.join(Deck).filter(Flashcard.id == id, Deck.user_id == user_id, Deck.deleted_at.is_(None)).first()
         if not flashcard:
             return {"error": "Flashcard not found"}, 404
 
+        flashcard.change_seq = stamp_decks(user_id, flashcard.deck_id)
         flashcard.front_text = data.get("front_text", flashcard.front_text)
         flashcard.back_text = data.get("back_text", flashcard.back_text)
 
+        bump_content_version(user_id)
         db.session.commit()
 
         return {
@@ -86,12 +135,14 @@ class FlashcardDetailResource(Resource):
     def delete(self, id):
         """Delete a flashcard by ID."""
         user_id = get_jwt_identity().get("id")
-        flashcard = Flashcard.query.join(Deck).filter(Flashcard.id == id, Deck.user_id == user_id).first()
+        flashcard = Flashcard.query.join(Deck).filter(Flashcard.id == id, Deck.user_id == user_id, Deck.deleted_at.is_(None)).first()
 
         if not flashcard:
             return {"error": "Flashcard not found"}, 404
 
         db.session.delete(flashcard)
+        record_tombstone(user_id, "flashcard", flashcard.id)
+        bump_content_version(user_id)
         db.session.commit()
 
         return {"message": "Flashcard deleted successfully"}, 200
\ No newline at end of file
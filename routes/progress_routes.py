@@ -1,43 +1,160 @@
+from collections import defaultdict
+from datetime import datetime, timezone
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.dialects import postgresql, sqlite
 from config import db
-from models import Progress, UserStats
+from models import Progress, Flashcard, Deck, DefaultFlashcard, user_default_decks
+from helpers import parse_deck_id, user_has_default_deck
+from rollups import apply_progress_delta, apply_progress_deltas, enqueue_stats_refresh
+from study_log import record_reviews
+from serialization import encoder_for
+from sync import next_change_seq
+from scheduler import answer_quality, check_answer, schedule_review, review_assignments, MASTERED_AFTER_CORRECT
+
+MAX_BATCH_SIZE = 1000
+
+PROGRESS_FIELDS = (
+    "id", "deck_id", "flashcard_id", "default_deck_id", "default_flashcard_id", "study_count",
+    "correct_attempts", "incorrect_attempts", "total_study_time", "last_studied_at", "next_review_at",
+    "review_status", "is_learned",
+)
+
+
+def apply_review(progress, was_correct, time_spent, quality=None, now=None):
+    """Apply one answer to a Progress row, reschedule it and return its rollup delta."""
+    was_mastered = progress.review_status == "mastered"
+
+    progress.study_count += 1
+    progress.total_study_time += time_spent
+    if was_correct:
+        progress.correct_attempts += 1
+    else:
+        progress.incorrect_attempts += 1
+
+    schedule_review(progress, answer_quality(was_correct, quality), now)
+
+    return {
+        "correct": 1 if was_correct else 0,
+        "attempts": 1,
+        "study_time": time_spent,
+        "mastered": 1 if progress.review_status == "mastered" and not was_mastered else 0,
+    }
+
+
+def new_progress_values(user_id, flashcard_id, deck_id):
+    return {
+        "user_id": user_id,
+        "flashcard_id": flashcard_id,
+        "deck_id": deck_id,
+        "study_count": 0,
+        "total_study_time": 0,
+        "correct_attempts": 0,
+        "incorrect_attempts": 0,
+        "review_status": 'new',
+        "is_learned": False,
+    }
+
+
+def new_progress(user_id, flashcard_id, deck_id):
+    return Progress(**new_progress_values(user_id, flashcard_id, deck_id))
+
+
+def upsert_review(keys, was_correct, time_spent, quality=None):
+    """
+    Apply one answer with a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    ``keys`` holds user_id plus flashcard_id/deck_id or default_flashcard_id/
+    default_deck_id. A first answer inserts the row apply_review would build;
+    later ones are computed by the database from the stored row, so concurrent
+    answers for one card all count. Other databases fall back to a
+    read-modify-write. Returns the row and its rollup delta.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return _review_in_python(keys, was_correct, time_spent, quality)
+    now = datetime.utcnow()
+    table = Progress.__table__
+
+    first = new_progress(keys["user_id"], keys.get("flashcard_id"), keys.get("deck_id"))
+    first.default_flashcard_id = keys.get("default_flashcard_id")
+    first.default_deck_id = keys.get("default_deck_id")
+    first.change_seq = next_change_seq(keys["user_id"])
+    apply_review(first, was_correct, time_spent, quality, now)
+    values = {column.key: getattr(first, column.key) for column in table.c if column.key not in ("id", "last_studied_at")}
+
+    c = table.c
+    statement = (sqlite if dialect == "sqlite" else postgresql).insert(table).values(**values).on_conflict_do_update(
+        index_elements=["user_id", "default_flashcard_id" if keys.get("default_flashcard_id") else "flashcard_id"],
+        set_={
+            "study_count": c.study_count + 1,
+            "correct_attempts": c.correct_attempts + (1 if was_correct else 0),
+            "incorrect_attempts": c.incorrect_attempts + (0 if was_correct else 1),
+            "total_study_time": c.total_study_time + time_spent,
+            "last_studied_at": db.func.current_timestamp(),
+            "change_seq": first.change_seq,
+            **review_assignments(c, answer_quality(was_correct, quality), was_correct, now, dialect),
+        },
+    ).returning(*table.c)
+    row = db.session.execute(statement).one()
+
+    # Mastery is reached on exactly the correct answer that makes correct_attempts hit the threshold
+    mastered = was_correct and row.review_status == "mastered" and row.correct_attempts == MASTERED_AFTER_CORRECT
+    return row, {
+        "correct": 1 if was_correct else 0,
+        "attempts": 1,
+        "study_time": time_spent,
+        "mastered": 1 if mastered else 0,
+    }
+
+
+def _review_in_python(keys, was_correct, time_spent, quality=None):
+    """Read-modify-write fallback for databases without ON CONFLICT ... RETURNING."""
+    lookup = "default_flashcard_id" if keys.get("default_flashcard_id") else "flashcard_id"
+    progress = Progress.query.filter_by(user_id=keys["user_id"], **{lookup: keys[lookup]}).first()
+    if not progress:
+        progress = new_progress(keys["user_id"], keys.get("flashcard_id"), keys.get("deck_id"))
+        progress.default_flashcard_id = keys.get("default_flashcard_id")
+        progress.default_deck_id = keys.get("default_deck_id")
+        db.session.add(progress)
+    progress.change_seq = next_change_seq(keys["user_id"])
+    delta = apply_review(progress, was_correct, time_spent, quality)
+    db.session.flush()
+    return progress, delta
+
 
 class ProgressResource(Resource):
+    query_budget = {"get": 2, "post": 10}
+
     @jwt_required()
     def get(self, deck_id=None, flashcard_id=None):
-        """Retrieve progress for a specific deck or flashcard."""
+        """Retrieve progress, optionally for one deck (/progress/deck/<id> or ?deck_id=) or flashcard."""
         user_id = get_jwt_identity().get("id")
-        
-        query = Progress.query.filter_by(user_id=user_id)
+        if deck_id is None:
+            try:
+                deck_id = parse_deck_id(request.args)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+        query = (
+            db.session.query(*(getattr(Progress, name) for name in PROGRESS_FIELDS))
+            .outerjoin(Deck, Deck.id == Progress.deck_id)
+            .filter(Progress.user_id == user_id, Deck.deleted_at.is_(None))
+        )
 
-        if deck_id:
-            query = query.filter_by(deck_id=deck_id)
+        if deck_id is not None:
+            query = query.filter(Progress.deck_id == deck_id)
         if flashcard_id:
-            query = query.filter_by(flashcard_id=flashcard_id)
+            query = query.filter(Progress.flashcard_id == flashcard_id)
 
-        progress_entries = query.all()
+        encode = encoder_for(query, PROGRESS_FIELDS)
+        progress_entries = [encode(row) for row in query]
 
         if not progress_entries:
             return {"message": "No progress found."}, 200
 
-        return [
-            {
-                "id": p.id,
-                "deck_id": p.deck_id,
-                "flashcard_id": p.flashcard_id,
-                "study_count": p.study_count,
-                "correct_attempts": p.correct_attempts,
-                "incorrect_attempts": p.incorrect_attempts,
-                "total_study_time": p.total_study_time,
-                "last_studied_at": p.last_studied_at.isoformat() if p.last_studied_at else None,
-                "next_review_at": p.next_review_at.isoformat() if p.next_review_at else None,
-                "review_status": p.review_status,
-                "is_learned": p.is_learned
-            }
-            for p in progress_entries
-        ], 200
+        return progress_entries, 200
 
     @jwt_required()
     def post(self):
@@ -45,56 +162,46 @@ class ProgressResource(Resource):
         user_id = get_jwt_identity().get("id")
         data = request.get_json()
 
-        progress = Progress.query.filter_by(
-            user_id=user_id,
-            flashcard_id=data["flashcard_id"],
-        ).first()
-
-        if not progress:
-            progress = Progress(
-                user_id=user_id,
-                flashcard_id=data["flashcard_id"],
-                deck_id=data["deck_id"],
-                study_count=0,
-                total_study_time=0,
-                correct_attempts=0,
-                incorrect_attempts=0,
-                review_status='new',
-                is_learned=False
-            )
-            db.session.add(progress)
+        try:
+            was_correct, quality = check_answer(data.get("was_correct"), data.get("quality"))
+            time_spent = check_time_spent(data.get("time_spent", 0))
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
-        progress.study_count += 1
-        progress.total_study_time += data.get("time_spent", 0)
-        if data.get("was_correct"):
-            progress.correct_attempts += 1
+        if data.get("default_flashcard_id"):
+            # Progress against a shared default card
+            default_card = db.session.get(DefaultFlashcard, data["default_flashcard_id"])
+            if not default_card or not user_has_default_deck(user_id, default_card.default_deck_id):
+                return {"error": "Flashcard not found"}, 404
+            keys = {"user_id": user_id, "default_flashcard_id": default_card.id, "default_deck_id": default_card.default_deck_id}
         else:
-            progress.incorrect_attempts += 1
-
-        if progress.correct_attempts >= 3:
-            progress.review_status = "mastered"
-            progress.is_learned = True
-
-        db.session.commit()
-
-        stats = UserStats.query.filter_by(user_id=user_id).first()
-        if not stats:
-            stats = UserStats(user_id=user_id)
-            db.session.add(stats)
-
-        total_correct = db.session.query(db.func.sum(Progress.correct_attempts)).filter_by(user_id=user_id).scalar() or 0
-        total_attempts = db.session.query(db.func.sum(Progress.study_count)).filter_by(user_id=user_id).scalar() or 1
-        stats.mastery_level = round((total_correct / total_attempts) * 100, 2)
-
-        stats.cards_mastered = Progress.query.filter_by(user_id=user_id, review_status="mastered").count()
-        stats.retention_rate = stats.mastery_level
+            flashcard_id, deck_id = data.get("flashcard_id"), data.get("deck_id")
+            if not isinstance(flashcard_id, int) or not isinstance(deck_id, int):
+                return {"error": "flashcard_id and deck_id must be integers"}, 400
+            # Same ownership rule as the batch: the card is in deck_id, a live deck of this user
+            owner_deck = (
+                db.session.query(Flashcard.deck_id)
+                .join(Deck)
+                .filter(Flashcard.id == flashcard_id, Deck.user_id == user_id, Deck.deleted_at.is_(None))
+                .scalar()
+            )
+            if owner_deck != deck_id:
+                return {"error": "Flashcard not found in this deck"}, 404
+            keys = {"user_id": user_id, "flashcard_id": flashcard_id, "deck_id": deck_id}
 
-        total_study_time = db.session.query(db.func.sum(Progress.total_study_time)).filter_by(user_id=user_id).scalar() or 0
-        target_time_per_flashcard = 1
-        if total_attempts > 0:
-            average_time_per_flashcard = total_study_time / total_attempts
-            stats.focus_score = round((average_time_per_flashcard / target_time_per_flashcard) * 100, 2)
+        progress, delta = upsert_review(keys, was_correct, time_spent, quality)
 
+        # O(1) rollup maintenance instead of re-aggregating the user's history
+        apply_progress_delta(user_id, progress.deck_id, **delta)
+        record_reviews(user_id, [{
+            "flashcard_id": progress.flashcard_id,
+            "deck_id": progress.deck_id,
+            "default_flashcard_id": progress.default_flashcard_id,
+            "studied_at": datetime.utcnow(),
+            "was_correct": was_correct,
+            "time_spent": delta["study_time"],
+        }])
+        enqueue_stats_refresh(user_id)
         db.session.commit()
 
         return {
@@ -102,10 +209,195 @@ class ProgressResource(Resource):
             "user_id": progress.user_id,
             "flashcard_id": progress.flashcard_id,
             "deck_id": progress.deck_id,
+            "default_flashcard_id": progress.default_flashcard_id,
+            "default_deck_id": progress.default_deck_id,
             "study_count": progress.study_count,
             "correct_attempts": progress.correct_attempts,
             "incorrect_attempts": progress.incorrect_attempts,
             "total_study_time": progress.total_study_time,
             "review_status": progress.review_status,
             "is_learned": progress.is_learned,
-        }, 200
\ No newline at end of file
+            "ease_factor": progress.ease_factor,
+            "interval_days": progress.interval_days,
+            "next_review_at": progress.next_review_at.isoformat(),
+        }, 200
+
+def check_time_spent(time_spent):
+    """Return ``time_spent`` if it is a non-negative number of minutes; raises ValueError."""
+    if isinstance(time_spent, bool) or not isinstance(time_spent, (int, float)) or time_spent < 0:
+        raise ValueError("time_spent must be a non-negative number")
+    return time_spent
+
+
+def _parse_event(event):
+    """
+    Validate one batch item and return
+    (flashcard_id, deck_id, default_flashcard_id, was_correct, time_spent, quality, studied_at).
+
+    An item names either one of the user's cards (flashcard_id and deck_id)
+    or a shared default card (default_flashcard_id); the other ids are None.
+    """
+    if not isinstance(event, dict):
+        raise ValueError("Event must be an object")
+    flashcard_id, deck_id = event.get("flashcard_id"), event.get("deck_id")
+    default_flashcard_id = event.get("default_flashcard_id")
+    if default_flashcard_id is not None:
+        if not isinstance(default_flashcard_id, int):
+            raise ValueError("default_flashcard_id must be an integer")
+        flashcard_id = deck_id = None
+    elif not isinstance(flashcard_id, int) or not isinstance(deck_id, int):
+        raise ValueError("flashcard_id and deck_id must be integers")
+
+    time_spent = check_time_spent(event.get("time_spent", 0))
+
+    was_correct, quality = check_answer(event.get("was_correct"), event.get("quality"))
+
+    studied_at = None
+    if event.get("timestamp"):
+        try:
+            studied_at = datetime.fromisoformat(str(event["timestamp"]).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("timestamp must be an ISO 8601 string")
+        if studied_at.tzinfo:
+            studied_at = studied_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return flashcard_id, deck_id, default_flashcard_id, was_correct, time_spent, quality, studied_at
+
+
+def _progress_rows(user_id, flashcard_ids, default_flashcard_ids):
+    """The user's progress on the given cards as ({flashcard_id: row}, {default_flashcard_id: row}), in one query."""
+    by_card, by_default = {}, {}
+    if not flashcard_ids and not default_flashcard_ids:
+        return by_card, by_default
+    for p in Progress.query.filter(
+        Progress.user_id == user_id,
+        db.or_(Progress.flashcard_id.in_(flashcard_ids), Progress.default_flashcard_id.in_(default_flashcard_ids)),
+    ):
+        if p.flashcard_id is not None:
+            by_card[p.flashcard_id] = p
+        else:
+            by_default[p.default_flashcard_id] = p
+    return by_card, by_default
+
+
+class ProgressBatchResource(Resource):
+    query_budget = {"post": 15}
+
+    @jwt_required()
+    def post(self):
+        """Apply a queue of review events in order within a single transaction."""
+        user_id = get_jwt_identity().get("id")
+        data = request.get_json(silent=True)
+        events = data.get("events") if isinstance(data, dict) else data
+
+        if not isinstance(events, list) or not events:
+            return {"error": "A non-empty list of events is required"}, 400
+        if len(events) > MAX_BATCH_SIZE:
+            return {"error": f"A batch may contain at most {MAX_BATCH_SIZE} events"}, 413
+
+        results = [None] * len(events)
+        parsed = []
+        for index, event in enumerate(events):
+            try:
+                parsed.append((index,) + _parse_event(event))
+            except ValueError as e:
+                results[index] = {"index": index, "status": "error", "error": str(e)}
+
+        # One lookup per kind of card for ownership, then one for the existing progress rows
+        flashcard_ids = {item[1] for item in parsed if item[1] is not None}
+        default_flashcard_ids = {item[3] for item in parsed if item[3] is not None}
+        owned_decks = dict(
+            db.session.query(Flashcard.id, Flashcard.deck_id)
+            .join(Deck)
+            .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None), Flashcard.id.in_(flashcard_ids))
+            .all()
+        ) if flashcard_ids else {}
+        # Shared cards count while the user still has their default deck, as in ProgressResource.post
+        owned_defaults = dict(
+            db.session.query(DefaultFlashcard.id, DefaultFlashcard.default_deck_id)
+            .join(user_default_decks, user_default_decks.c.default_deck_id == DefaultFlashcard.default_deck_id)
+            .filter(user_default_decks.c.user_id == user_id, DefaultFlashcard.id.in_(default_flashcard_ids))
+            .all()
+        ) if default_flashcard_ids else {}
+        progress_by_card, progress_by_default = _progress_rows(user_id, owned_decks, owned_defaults)
+
+        # Cards studied for the first time get their rows in one executemany, not one INSERT each
+        missing = {
+            flashcard_id: deck_id
+            for _, flashcard_id, deck_id, *_ in parsed
+            if flashcard_id is not None and owned_decks.get(flashcard_id) == deck_id and flashcard_id not in progress_by_card
+        }
+        missing_defaults = owned_defaults.keys() - progress_by_default.keys()
+        if missing or missing_defaults:
+            # render_nulls keeps both kinds of row in one statement instead of one per set of non-null keys
+            db.session.execute(db.insert(Progress).execution_options(render_nulls=True), [
+                dict(new_progress_values(user_id, flashcard_id, deck_id), default_flashcard_id=None, default_deck_id=None)
+                for flashcard_id, deck_id in missing.items()
+            ] + [
+                dict(new_progress_values(user_id, None, None),
+                     default_flashcard_id=default_flashcard_id, default_deck_id=owned_defaults[default_flashcard_id])
+                for default_flashcard_id in missing_defaults
+            ])
+            inserted_by_card, inserted_by_default = _progress_rows(user_id, missing, missing_defaults)
+            progress_by_card.update(inserted_by_card)
+            progress_by_default.update(inserted_by_default)
+
+        deck_deltas = defaultdict(lambda: {"correct": 0, "attempts": 0, "study_time": 0.0, "mastered": 0})
+        applied = []
+        review_events = []
+        received_at = datetime.utcnow()
+        seq = next_change_seq(user_id) if owned_decks or owned_defaults else None
+        for index, flashcard_id, deck_id, default_flashcard_id, was_correct, time_spent, quality, studied_at in parsed:
+            if default_flashcard_id is not None:
+                if default_flashcard_id not in owned_defaults:
+                    results[index] = {"index": index, "status": "error", "error": "Flashcard not found"}
+                    continue
+                progress = progress_by_default[default_flashcard_id]
+            elif owned_decks.get(flashcard_id) != deck_id:
+                results[index] = {"index": index, "status": "error", "error": "Flashcard not found in this deck"}
+                continue
+            else:
+                progress = progress_by_card[flashcard_id]
+
+            progress.change_seq = seq
+            delta = apply_review(progress, was_correct, time_spent, quality, now=studied_at)
+            if studied_at:
+                progress.last_studied_at = studied_at
+            for key, value in delta.items():
+                deck_deltas[deck_id][key] += value
+            review_events.append({
+                "flashcard_id": flashcard_id,
+                "deck_id": deck_id,
+                "default_flashcard_id": default_flashcard_id,
+                "studied_at": studied_at or received_at,
+                "was_correct": was_correct,
+                "time_spent": time_spent,
+            })
+
+            results[index] = {
+                "index": index,
+                "status": "ok",
+                "flashcard_id": flashcard_id,
+                "default_flashcard_id": default_flashcard_id,
+                "study_count": progress.study_count,
+                "correct_attempts": progress.correct_attempts,
+                "incorrect_attempts": progress.incorrect_attempts,
+                "review_status": progress.review_status,
+            }
+            applied.append((index, progress))
+
+        if applied:
+            apply_progress_deltas(user_id, deck_deltas)
+            record_reviews(user_id, review_events)
+            enqueue_stats_refresh(user_id)
+            db.session.flush()
+            for index, progress in applied:
+                results[index]["id"] = progress.id
+            db.session.commit()
+
+        failed = sum(1 for result in results if result["status"] == "error")
+        return {
+            "processed": len(applied),
+            "failed": failed,
+            "results": results,
+        }, 200
@@ -5,6 +5,8 @@ from config import db
 from models import UserStats
 
 class UserStatsResource(Resource):
+    query_budget = {"put": 4}
+
     @jwt_required()
     def put(self):
         """Update user stats, such as weekly goal."""
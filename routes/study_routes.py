@@ -0,0 +1,94 @@
+from datetime import datetime
+from flask import request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import db
+from models import Progress, Flashcard, Deck, DefaultFlashcard
+from helpers import parse_deck_id
+
+DEFAULT_QUEUE_SIZE = 20
+MAX_QUEUE_SIZE = 100
+
+
+class StudyQueueResource(Resource):
+    query_budget = {"get": 2}
+
+    @jwt_required()
+    def get(self):
+        """Return the next cards due for review, soonest first."""
+        user_id = get_jwt_identity().get("id")
+        try:
+            deck_id = parse_deck_id(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        limit = request.args.get("limit", DEFAULT_QUEUE_SIZE, type=int)
+        new_limit = request.args.get("new", 0, type=int)
+
+        if limit < 1 or limit > MAX_QUEUE_SIZE:
+            return {"error": f"limit must be between 1 and {MAX_QUEUE_SIZE}"}, 400
+        now = datetime.utcnow()
+
+        # Range scan on (user_id, [deck_id,] next_review_at); stops after `limit` rows.
+        # Card text comes from the user's own card or, for shared cards, the default card.
+        query = (
+            db.session.query(
+                Progress.flashcard_id,
+                Progress.deck_id,
+                Progress.default_flashcard_id,
+                Progress.next_review_at,
+                Progress.review_status,
+                Progress.interval_days,
+                db.func.coalesce(Flashcard.front_text, DefaultFlashcard.front_text).label("front_text"),
+                db.func.coalesce(Flashcard.back_text, DefaultFlashcard.back_text).label("back_text"),
+            )
+            .outerjoin(Flashcard, Flashcard.id == Progress.flashcard_id)
+            .outerjoin(DefaultFlashcard, DefaultFlashcard.id == Progress.default_flashcard_id)
+            .outerjoin(Deck, Deck.id == Progress.deck_id)
+            .filter(Progress.user_id == user_id, Progress.next_review_at <= now, Deck.deleted_at.is_(None))
+        )
+        if deck_id:
+            query = query.filter(Progress.deck_id == deck_id)
+        due = query.order_by(Progress.next_review_at).limit(limit).all()
+
+        cards = [
+            {
+                "flashcard_id": row.flashcard_id,
+                "deck_id": row.deck_id,
+                "default_flashcard_id": row.default_flashcard_id,
+                "front_text": row.front_text,
+                "back_text": row.back_text,
+                "review_status": row.review_status,
+                "interval_days": row.interval_days,
+                "next_review_at": row.next_review_at.isoformat(),
+            }
+            for row in due
+        ]
+
+        # Optionally top the queue up with cards the user has never studied
+        remaining = min(new_limit, limit - len(cards))
+        if remaining > 0:
+            studied = db.session.query(Progress.id).filter(
+                Progress.user_id == user_id, Progress.flashcard_id == Flashcard.id
+            )
+            new_query = (
+                db.session.query(Flashcard.id, Flashcard.deck_id, Flashcard.front_text, Flashcard.back_text)
+                .join(Deck)
+                .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None), ~studied.exists())
+            )
+            if deck_id:
+                new_query = new_query.filter(Flashcard.deck_id == deck_id)
+            cards.extend(
+                {
+                    "flashcard_id": card.id,
+                    "deck_id": card.deck_id,
+                    "default_flashcard_id": None,
+                    "front_text": card.front_text,
+                    "back_text": card.back_text,
+                    "review_status": "new",
+                    "interval_days": 0,
+                    "next_review_at": None,
+                }
+                for card in new_query.order_by(Flashcard.id).limit(remaining)
+            )
+
+        return {"cards": cards, "count": len(cards)}, 200
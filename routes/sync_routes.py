@@ -0,0 +1,69 @@
+from flask import request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import db
+from models import Deck, Flashcard, Progress, SyncTombstone
+from serialization import encoder_for
+from sync import current_change_seq
+from routes.deck_routes import DECK_FIELDS
+from routes.flashcard_routes import FLASHCARD_FIELDS
+from routes.progress_routes import PROGRESS_FIELDS
+
+
+def _rows(query, fields):
+    encode = encoder_for(query, fields)
+    return [encode(row) for row in query]
+
+
+class SyncResource(Resource):
+    query_budget = {"get": 6}
+
+    @jwt_required()
+    def get(self):
+        """Decks, flashcards and progress changed since ?since=<token>, plus what was deleted; no token means everything."""
+        user_id = get_jwt_identity().get("id")
+
+        since = -1  # No token: everything
+        if request.args.get("since"):
+            try:
+                since = int(request.args["since"])
+            except ValueError:
+                since = -1
+            if since < 0:
+                return {"error": "since must be a token returned by an earlier sync"}, 400
+
+        # Sequence numbers commit in order, so every row up to the token is already visible.
+        # Rows stamped after it are left for the next sync.
+        token = current_change_seq(user_id)
+        if since > token:
+            return {"error": "since must be a token returned by an earlier sync"}, 400
+
+        changed_decks = db.and_(Deck.user_id == user_id, Deck.change_seq > since, Deck.deleted_at.is_(None))
+        decks = db.session.query(*(getattr(Deck, name) for name in DECK_FIELDS)).filter(
+            changed_decks, Deck.change_seq <= token
+        )
+        # A card write stamps its deck too, so only the changed decks' (deck_id, change_seq) ranges are read
+        flashcards = (
+            db.session.query(*(getattr(Flashcard, name) for name in FLASHCARD_FIELDS))
+            .join(Deck)
+            .filter(changed_decks, Flashcard.change_seq > since, Flashcard.change_seq <= token)
+        )
+        progress = (
+            db.session.query(*(getattr(Progress, name) for name in PROGRESS_FIELDS))
+            .outerjoin(Deck, Deck.id == Progress.deck_id)
+            .filter(Progress.user_id == user_id, Progress.change_seq > since, Progress.change_seq <= token,
+                    Deck.deleted_at.is_(None))
+        )
+        deleted = {"decks": [], "flashcards": []}
+        for entity, entity_id in db.session.query(SyncTombstone.entity, SyncTombstone.entity_id).filter(
+            SyncTombstone.user_id == user_id, SyncTombstone.change_seq > since, SyncTombstone.change_seq <= token
+        ):
+            deleted[entity + "s"].append(entity_id)
+
+        return {
+            "token": str(token),
+            "decks": _rows(decks, DECK_FIELDS),
+            "flashcards": _rows(flashcards, FLASHCARD_FIELDS),
+            "progress": _rows(progress, PROGRESS_FIELDS),
+            "deleted": deleted,
+        }, 200
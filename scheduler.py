@@ -0,0 +1,142 @@
+# scheduler.py
+"""SM-2 spaced repetition scheduling for Progress rows."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, cast, func, literal, DateTime, Integer, String
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+MASTERED_AFTER_CORRECT = 3  # Correct answers before a card counts as mastered
+MAX_INTERVAL_DAYS = 36500  # Keeps next_review_at inside the datetime range however long a streak runs
+
+
+def answer_quality(was_correct, quality=None):
+    """Map an answer to an SM-2 quality grade (0-5); an explicit grade wins."""
+    if quality is not None:
+        return max(0, min(5, int(quality)))
+    return 4 if was_correct else 1
+
+
+def check_answer(was_correct, quality=None):
+    """
+    Validate an answer and return (was_correct, quality); raises ValueError.
+
+    A grade must be an integer from 0 to 5 and agree with was_correct: a
+    grade of PASSING_QUALITY or more is a correct answer. When was_correct
+    is missing the grade decides it.
+    """
+    if quality is None:
+        return bool(was_correct), None
+    if isinstance(quality, bool) or not isinstance(quality, int) or not 0 <= quality <= 5:
+        raise ValueError("quality must be an integer from 0 to 5")
+    passed = quality >= PASSING_QUALITY
+    if was_correct is not None and bool(was_correct) != passed:
+        raise ValueError(f"quality {quality} contradicts was_correct; grades from {PASSING_QUALITY} up are correct answers")
+    return passed, quality
+
+
+def ease_change(quality):
+    return 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+
+
+def next_ease(ease_factor, quality):
+    return max(MIN_EASE, ease_factor + ease_change(quality))
+
+
+def next_interval(repetitions, interval_days, ease_factor, quality):
+    """Days until the next review; ``repetitions`` counts the successful reviews before this one."""
+    if quality < PASSING_QUALITY:
+        return 1
+    if repetitions == 0:
+        return 1
+    if repetitions == 1:
+        return 6
+    return min(MAX_INTERVAL_DAYS, max(1, int(round(interval_days * ease_factor))))
+
+
+def review_status_for(progress):
+    if progress.correct_attempts >= MASTERED_AFTER_CORRECT:
+        return "mastered"
+    if progress.repetitions >= 2:
+        return "reviewing"
+    return "learning"
+
+
+def schedule_review(progress, quality, now=None):
+    """
+    Advance ``progress`` after one answer of the given quality.
+
+    Expects the attempt counters to be updated already; sets interval, ease,
+    repetitions, next_review_at and the review status.
+    """
+    now = now or datetime.utcnow()
+    ease_factor = progress.ease_factor or DEFAULT_EASE
+    repetitions = progress.repetitions or 0
+
+    progress.interval_days = next_interval(repetitions, progress.interval_days or 0, ease_factor, quality)
+    if quality >= PASSING_QUALITY:
+        progress.repetitions = repetitions + 1
+    else:
+        progress.repetitions = 0
+        progress.lapses = (progress.lapses or 0) + 1
+    progress.ease_factor = next_ease(ease_factor, quality)
+    progress.next_review_at = now + timedelta(days=progress.interval_days)
+
+    if progress.review_status != "mastered":
+        progress.review_status = review_status_for(progress)
+        progress.is_learned = progress.review_status == "mastered"
+
+
+def _add_days(timestamp, days, dialect):
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:%f", timestamp, cast(days, String) + " days")
+    return timestamp + func.make_interval(0, 0, 0, days)
+
+
+def review_assignments(columns, quality, was_correct, now, dialect):
+    """
+    schedule_review as SQL: the SET clause of an UPDATE applying one answer.
+
+    ``columns`` is the progress table's column collection. Every expression
+    reads the stored row, so the database advances whatever is current when
+    the statement runs. Intervals round half away from zero (SQL ROUND)
+    where round() would go to the even day.
+    """
+    ease = func.coalesce(columns.ease_factor, DEFAULT_EASE)
+    repetitions = func.coalesce(columns.repetitions, 0)
+    correct_attempts = columns.correct_attempts + (1 if was_correct else 0)
+
+    new_ease = ease + ease_change(quality)
+    if quality >= PASSING_QUALITY:
+        scaled = cast(func.round(func.coalesce(columns.interval_days, 0) * ease), Integer)
+        interval = case(
+            (repetitions == 0, 1), (repetitions == 1, 6), (scaled < 1, 1), (scaled > MAX_INTERVAL_DAYS, MAX_INTERVAL_DAYS),
+            else_=scaled,
+        )
+        new_repetitions = repetitions + 1
+        lapses = func.coalesce(columns.lapses, 0)
+    else:
+        interval = literal(1)
+        new_repetitions = literal(0)
+        lapses = func.coalesce(columns.lapses, 0) + 1
+
+    def status(name):
+        return literal(name, columns.review_status.type)
+
+    is_mastered = columns.review_status == "mastered"
+    reaches_mastery = correct_attempts >= MASTERED_AFTER_CORRECT
+    return {
+        "ease_factor": case((new_ease < MIN_EASE, MIN_EASE), else_=new_ease),
+        "interval_days": interval,
+        "repetitions": new_repetitions,
+        "lapses": lapses,
+        "next_review_at": _add_days(literal(now, DateTime), interval, dialect),
+        "review_status": case(
+            (is_mastered, columns.review_status),
+            (reaches_mastery, status("mastered")),
+            (new_repetitions >= 2, status("reviewing")),
+            else_=status("learning"),
+        ),
+        "is_learned": case((is_mastered, columns.is_learned), (reaches_mastery, True), else_=False),
+    }
@@ -0,0 +1,187 @@
+# search.py
+"""
+Full-text search over the user's flashcards.
+
+On SQLite the cards are indexed in the ``flashcards_fts`` FTS5 table, kept in
+sync by triggers on ``flashcards``. Besides the two text columns each row
+carries a ``scope`` column holding ``u<user_id> d<deck_id>`` tokens, so the
+ownership and deck filters are part of the MATCH and FTS5 intersects them
+with the search terms instead of ranking every card that contains a word.
+PostgreSQL uses a GIN index on the cards' tsvector; other backends fall back
+to LIKE.
+
+Backends mark matches with control characters; the card text is
+HTML-escaped before those become <mark> tags, so results are safe to render.
+"""
+import html
+import re
+
+from sqlalchemy import event
+
+from config import db
+from models import Flashcard, Deck
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+MAX_SEARCH_TERMS = 16
+HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE = "<mark>", "</mark>"
+MATCH_START, MATCH_END = "\x02", "\x03"
+
+# Front-text matches outrank back-text matches; the scope tokens never score
+FTS_WEIGHTS = "2.0, 1.0, 0.0"
+
+_SCOPE = "'u' || (SELECT user_id FROM decks WHERE decks.id = new.deck_id) || ' d' || new.deck_id"
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5("
+    "front_text, back_text, scope, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_insert AFTER INSERT ON flashcards BEGIN "
+    f"INSERT INTO flashcards_fts (rowid, front_text, back_text, scope) VALUES (new.id, new.front_text, new.back_text, {_SCOPE}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_update AFTER UPDATE OF front_text, back_text, deck_id ON flashcards BEGIN "
+    "DELETE FROM flashcards_fts WHERE rowid = old.id; "
+    f"INSERT INTO flashcards_fts (rowid, front_text, back_text, scope) VALUES (new.id, new.front_text, new.back_text, {_SCOPE}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_delete AFTER DELETE ON flashcards BEGIN "
+    "DELETE FROM flashcards_fts WHERE rowid = old.id; "
+    "END",
+]
+
+POSTGRESQL_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_flashcards_search ON flashcards "
+    "USING gin (to_tsvector('simple', front_text || ' ' || back_text))",
+]
+
+
+@event.listens_for(Flashcard.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    # Databases built with create_all() rather than the migrations get the same index
+    statements = {"sqlite": SQLITE_FTS_DDL, "postgresql": POSTGRESQL_SEARCH_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Flashcard.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS flashcards_fts")
+
+
+def parse_terms(q):
+    """
+    Split a query string into ``(word, is_prefix)`` pairs.
+
+    Only word characters survive, so user input never reaches the FTS query
+    syntax; a trailing ``*`` marks a prefix term. Raises ValueError when
+    nothing searchable is left.
+    """
+    terms = [(word, star == "*") for word, star in re.findall(r"(\w+)(\*?)", q or "")]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def _fts_match(user_id, deck_id, terms):
+    words = " ".join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+    match = f'scope : "u{user_id}" AND {{front_text back_text}} : ({words})'
+    if deck_id:
+        match = f'scope : "d{deck_id}" AND ' + match
+    return match
+
+
+def _search_sqlite(user_id, terms, deck_id, limit, offset):
+    # Rank first and highlight only the page; highlighting and joining every match costs more than the MATCH.
+    # Cards of a soft-deleted deck stay indexed until the purge job gets to them, so such a page can come up short.
+    rows = db.session.execute(db.text(
+        "WITH page AS ("
+        f"SELECT rowid, bm25(flashcards_fts, {FTS_WEIGHTS}) AS score FROM flashcards_fts "
+        "WHERE flashcards_fts MATCH :match ORDER BY score LIMIT :limit OFFSET :offset) "
+        "SELECT f.id, f.deck_id, "
+        "highlight(flashcards_fts, 0, :open, :close) AS front_text, "
+        "highlight(flashcards_fts, 1, :open, :close) AS back_text, "
+        "page.score "
+        "FROM page "
+        "JOIN flashcards_fts ON flashcards_fts.rowid = page.rowid AND flashcards_fts MATCH :match "
+        "JOIN flashcards f ON f.id = page.rowid "
+        "JOIN decks d ON d.id = f.deck_id AND d.deleted_at IS NULL "
+        "ORDER BY page.score"
+    ), {
+        "match": _fts_match(user_id, deck_id, terms),
+        "open": MATCH_START,
+        "close": MATCH_END,
+        "limit": limit,
+        "offset": offset,
+    })
+    return [(row.id, row.deck_id, row.front_text, row.back_text, -row.score) for row in rows]
+
+
+def _search_postgresql(user_id, terms, deck_id, limit, offset):
+    document = db.func.to_tsvector("simple", Flashcard.front_text + " " + Flashcard.back_text)
+    tsquery = db.func.to_tsquery("simple", " & ".join(f"{word}:*" if prefix else word for word, prefix in terms))
+    options = f'StartSel="{MATCH_START}", StopSel="{MATCH_END}", HighlightAll=true'
+    rank = db.func.ts_rank(document, tsquery)
+    query = (
+        db.session.query(
+            Flashcard.id,
+            Flashcard.deck_id,
+            db.func.ts_headline("simple", Flashcard.front_text, tsquery, options),
+            db.func.ts_headline("simple", Flashcard.back_text, tsquery, options),
+            rank,
+        )
+        .join(Deck)
+        .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None), document.op("@@")(tsquery))
+    )
+    if deck_id:
+        query = query.filter(Flashcard.deck_id == deck_id)
+    return query.order_by(rank.desc(), Flashcard.id).limit(limit).offset(offset).all()
+
+
+def _search_like(user_id, terms, deck_id, limit, offset):
+    query = (
+        db.session.query(Flashcard.id, Flashcard.deck_id, Flashcard.front_text, Flashcard.back_text, db.literal(0.0))
+        .join(Deck)
+        .filter(Deck.user_id == user_id, Deck.deleted_at.is_(None))
+    )
+    for word, _ in terms:
+        pattern = f"%{word}%"
+        query = query.filter(db.or_(Flashcard.front_text.ilike(pattern), Flashcard.back_text.ilike(pattern)))
+    if deck_id:
+        query = query.filter(Flashcard.deck_id == deck_id)
+    return query.order_by(Flashcard.id).limit(limit).offset(offset).all()
+
+
+def render_highlight(text):
+    """HTML-escape card text and turn the backend's match markers into <mark> tags."""
+    return html.escape(text).replace(MATCH_START, HIGHLIGHT_OPEN).replace(MATCH_END, HIGHLIGHT_CLOSE)
+
+
+def search_flashcards(user_id, q, deck_id=None, limit=SEARCH_DEFAULT_LIMIT, offset=0):
+    """
+    Return one page of the user's cards matching ``q``, best match first.
+
+    ``front_text``/``back_text`` are HTML-escaped with matched words wrapped
+    in <mark> tags.
+    ``next_offset`` is None on the last page. Raises ValueError on a query
+    with no searchable words.
+    """
+    terms = parse_terms(q)
+    backend = {"sqlite": _search_sqlite, "postgresql": _search_postgresql}.get(
+        db.session.get_bind().dialect.name, _search_like
+    )
+    # One extra row tells us whether another page exists
+    rows = backend(user_id, terms, deck_id, limit + 1, offset)
+    return {
+        "results": [
+            {
+                "id": id,
+                "deck_id": card_deck_id,
+                "front_text": render_highlight(front),
+                "back_text": render_highlight(back),
+                "score": round(score, 4),
+            }
+            for id, card_deck_id, front, back, score in rows[:limit]
+        ],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if len(rows) > limit else None,
+    }
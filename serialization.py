@@ -0,0 +1,62 @@
+# serialization.py
+"""
+JSON encoding for API responses: orjson when it is installed, the stdlib otherwise.
+
+output_json is the Api representation for application/json. List endpoints
+select plain column tuples and turn each row into a dict with an encoder
+compiled once per shape (field names plus which columns hold timestamps).
+With orjson a row is zipped straight into a dict and timestamps are left for
+orjson, which writes the same ISO 8601 text as isoformat(); without it the
+timestamp columns are converted in Python before the stdlib encoder runs.
+"""
+from functools import lru_cache
+
+from flask import make_response
+from flask_restful.representations.json import output_json as stdlib_output_json
+from sqlalchemy import Date, DateTime, Time
+
+from config import api
+
+try:
+    import orjson
+except ImportError:  # Optional: responses fall back to Flask-RESTful's stdlib encoder
+    orjson = None
+
+TEMPORAL_TYPES = (Date, DateTime, Time)
+
+
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    if orjson is None:
+        return stdlib_output_json(data, code, headers)
+    response = make_response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+@lru_cache(maxsize=256)
+def row_encoder(fields, temporal):
+    """
+    Return ``encode(row) -> dict`` for rows whose columns are ``fields``.
+
+    ``temporal`` flags the positions holding dates or datetimes; they are
+    only converted here when orjson is not there to encode them.
+    """
+    if orjson is not None or not any(temporal):
+        return lambda row: dict(zip(fields, row))
+
+    convert = [(name, index) for index, (name, flag) in enumerate(zip(fields, temporal)) if flag]
+
+    def encode(row):
+        item = dict(zip(fields, row))
+        for name, index in convert:
+            if row[index] is not None:
+                item[name] = row[index].isoformat()
+        return item
+    return encode
+
+
+def encoder_for(query, fields):
+    """row_encoder for a query selecting the columns named by ``fields``, in order."""
+    temporal = tuple(isinstance(column["type"], TEMPORAL_TYPES) for column in query.column_descriptions)
+    return row_encoder(tuple(fields), temporal)
@@ -0,0 +1,114 @@
+# study_log.py
+"""Append-only review events, their per-day totals and the streak/minutes/weekly figures read from them."""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import chain
+
+from config import db
+from models import ReviewEvent, DailyStudyStats
+
+STREAK_PAGE_SIZE = 64  # Daily rows fetched per round trip while walking a streak backwards
+MINUTES_WINDOW_DAYS = 7  # minutes_per_day averages over this many trailing days, today included; at most STREAK_PAGE_SIZE
+COMPACTION_CHUNK_SIZE = 10000
+
+
+def _add_to_day(user_id, day, deltas):
+    updated = (
+        db.session.query(DailyStudyStats)
+        .filter(DailyStudyStats.user_id == user_id, DailyStudyStats.day == day)
+        .update({getattr(DailyStudyStats, name): getattr(DailyStudyStats, name) + value for name, value in deltas.items()})
+    )
+    if not updated:
+        db.session.add(DailyStudyStats(user_id=user_id, day=day, **deltas))
+        db.session.flush()
+
+
+def record_reviews(user_id, events):
+    """
+    Append review events and fold them into the user's daily totals.
+
+    Each event is a dict with flashcard_id, deck_id, default_flashcard_id,
+    studied_at, was_correct and time_spent. Runs in the caller's transaction.
+    """
+    # render_nulls keeps a mixed batch of own and shared cards in one executemany
+    db.session.execute(
+        db.insert(ReviewEvent).execution_options(render_nulls=True),
+        [{"user_id": user_id, **event} for event in events],
+    )
+
+    per_day = defaultdict(lambda: {"reviews": 0, "correct": 0, "study_time": 0.0})
+    for event in events:
+        totals = per_day[event["studied_at"].date()]
+        totals["reviews"] += 1
+        totals["correct"] += 1 if event["was_correct"] else 0
+        totals["study_time"] += event["time_spent"]
+    for day, deltas in per_day.items():
+        _add_to_day(user_id, day, deltas)
+
+
+def _daily_pages(user_id, today):
+    """The user's daily rows up to today, newest first, STREAK_PAGE_SIZE rows per query."""
+    before = today + timedelta(days=1)
+    while True:
+        page = (
+            db.session.query(DailyStudyStats.day, DailyStudyStats.reviews, DailyStudyStats.study_time)
+            .filter(DailyStudyStats.user_id == user_id, DailyStudyStats.day < before)
+            .order_by(DailyStudyStats.day.desc())
+            .limit(STREAK_PAGE_SIZE)
+            .all()
+        )
+        yield page
+        if len(page) < STREAK_PAGE_SIZE:
+            return
+        before = page[-1].day
+
+
+def _streak(pages, today):
+    streak, expected = 0, today
+    for page in pages:
+        for row in page:
+            if streak == 0 and row.day == today - timedelta(days=1):
+                expected = row.day
+            if row.day != expected:
+                return streak
+            streak += 1
+            expected = row.day - timedelta(days=1)
+    return streak
+
+
+def study_streak(user_id, today):
+    """Consecutive study days ending today, or yesterday while today is still open."""
+    return _streak(_daily_pages(user_id, today), today)
+
+
+def study_summary(user_id, today=None):
+    """Return study_streak, minutes_per_day and weekly_reviews (reviews since Monday, UTC)."""
+    today = today or datetime.utcnow().date()
+    pages = _daily_pages(user_id, today)
+    # The trailing window fits in the streak's first page, so both figures share its query
+    first_page = next(pages)
+    recent = [row for row in first_page if row.day > today - timedelta(days=MINUTES_WINDOW_DAYS)]
+    week_start = today - timedelta(days=today.weekday())
+    return {
+        "study_streak": _streak(chain([first_page], pages), today),
+        "minutes_per_day": round(sum(row.study_time for row in recent) / MINUTES_WINDOW_DAYS, 2),
+        "weekly_reviews": sum(row.reviews for row in recent if row.day >= week_start),
+    }
+
+
+def compact_review_events(retention_days, chunk_size=COMPACTION_CHUNK_SIZE):
+    """Delete raw events older than ``retention_days`` in committed chunks; returns the number deleted."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        expired = (
+            db.select(ReviewEvent.id)
+            .where(ReviewEvent.studied_at < cutoff)
+            .order_by(ReviewEvent.studied_at)
+            .limit(chunk_size)
+        )
+        count = db.session.query(ReviewEvent).filter(ReviewEvent.id.in_(expired)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += count
+        if count < chunk_size:
+            return deleted
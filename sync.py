@@ -0,0 +1,78 @@
+# sync.py
+"""
+Change sequences and tombstones behind GET /sync.
+
+Every write to a user's decks, flashcards or progress stamps the rows it
+touches with the user's next change sequence number. The number is taken
+once per transaction by bumping the user's change_sequences row, which then
+stays locked until commit, so numbers become visible in the order they were
+handed out. A flashcard write stamps its deck as well: changed cards are
+found through the user's changed decks, which keeps every sync lookup an
+index range on (user_id, change_seq) or (deck_id, change_seq). Deletes
+leave a row in sync_tombstones instead.
+"""
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import db
+from models import ChangeSequence, Deck, SyncTombstone
+
+
+def current_change_seq(user_id):
+    seq = db.session.query(ChangeSequence.seq).filter(ChangeSequence.user_id == user_id).scalar()
+    return seq or 0
+
+
+def next_change_seq(user_id):
+    """
+    The change sequence number for this transaction's writes to the user's rows.
+
+    The first call in a transaction bumps the counter; later calls return the
+    same number until the session commits or rolls back.
+    """
+    taken = db.session.info.setdefault("change_seqs", {})
+    if user_id in taken:
+        return taken[user_id]
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(ChangeSequence).values(user_id=user_id, seq=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"], set_={"seq": ChangeSequence.seq + 1}
+        ).returning(ChangeSequence.seq)
+        seq = db.session.execute(statement).scalar()
+    else:
+        updated = (
+            db.session.query(ChangeSequence)
+            .filter(ChangeSequence.user_id == user_id)
+            .update({ChangeSequence.seq: ChangeSequence.seq + 1})
+        )
+        if not updated:
+            db.session.add(ChangeSequence(user_id=user_id, seq=1))
+            db.session.flush()
+        seq = current_change_seq(user_id)
+    taken[user_id] = seq
+    return seq
+
+
+def stamp_decks(user_id, *deck_ids):
+    """Mark the decks changed, so GET /sync looks at their cards."""
+    seq = next_change_seq(user_id)
+    db.session.query(Deck).filter(Deck.id.in_(deck_ids)).update(
+        {Deck.change_seq: seq}, synchronize_session=False
+    )
+    return seq
+
+
+def record_tombstone(user_id, entity, entity_id):
+    """Tell syncing clients that the deck or flashcard is gone (does not commit)."""
+    db.session.add(SyncTombstone(
+        user_id=user_id, entity=entity, entity_id=entity_id, change_seq=next_change_seq(user_id),
+    ))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_change_seqs(session):
+    session.info.pop("change_seqs", None)